@@ -1,5 +1,12 @@
 """
 ASGI config for agrostudies_project project.
+
+Serving through ASGI enables the server-sent events stream at /events/stream/
+(core.views.event_stream), e.g.:
+
+    gunicorn agrostudies_project.asgi:application -k uvicorn_worker.UvicornWorker
+
+Under the WSGI entry point the stream answers 204 and pages fall back to polling.
 """
 
 import os
@@ -116,6 +116,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.notification_count',
+                'core.context_processors.fragment_cache',
             ],
         },
     },
@@ -180,6 +181,12 @@ WHITENOISE_MAX_AGE = 31536000  # Cache static files for 1 year
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hash, measure and size-limit uploads while they stream in (see core/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.HashingMemoryFileUploadHandler',
+    'core.uploads.HashingTemporaryFileUploadHandler',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -265,6 +272,12 @@ CRONJOBS = [
     # Format: ('minute hour day month day_of_week', 'django_command')
     # Run backup at 5:00 PM (17:00) every day
     ('0 17 * * *', 'django.core.management.call_command', ['scheduled_backup']),
+
+    # Reconcile dashboard statistics counters nightly at 3:30 AM
+    ('30 3 * * *', 'django.core.management.call_command', ['rebuild_stats']),
+
+    # Move activity logs past the retention window into backups/ at 4:00 AM
+    ('0 4 * * *', 'django.core.management.call_command', ['archive_activity_logs']),
     
     # Alternative: Run backup every 6 hours for testing (uncomment if needed)
     # ('0 */6 * * *', 'django.core.management.call_command', ['scheduled_backup']),
@@ -307,6 +320,9 @@ RATELIMIT_ENABLE = 'test' not in sys.argv
 # ----- Caching Configuration -----
 REDIS_URL = os.getenv('REDIS_URL', '')
 
+# Bearer token for /metrics/ scrapers (staff sessions can always read it)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # Use Redis if available, otherwise fallback to local memory cache
 if REDIS_URL and not DEBUG:  # Only use Redis in production
     CACHES = {
@@ -315,7 +331,8 @@ if REDIS_URL and not DEBUG:  # Only use Redis in production
             'LOCATION': REDIS_URL,
             'OPTIONS': {
                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-                'SERIALIZER': 'django_redis.serializers.json.JSONSerializer',
+                # msgpack with exact dates and compact RowSets; still reads JSON entries
+                'SERIALIZER': 'core.cache_serializers.CompactSerializer',
                 'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
                 'CONNECTION_POOL_KWARGS': {
                     'max_connections': 50,
@@ -327,6 +344,13 @@ if REDIS_URL and not DEBUG:  # Only use Redis in production
             'TIMEOUT': 300,  # 5 minutes default
         }
     }
+    # {% cache %} fragments (program cards, candidate rows); a separate alias keeps long lists
+    # from evicting the hot entries above. Versioned by commit so a deploy never serves old markup.
+    CACHES['template_fragments'] = {
+        **CACHES['default'],
+        'KEY_PREFIX': 'agrostudies:fragments',
+        'VERSION': os.getenv('RENDER_GIT_COMMIT', '1')[:12],
+    }
     # Session caching (faster than database sessions)
     SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
     SESSION_CACHE_ALIAS = 'default'
@@ -340,7 +364,15 @@ else:
             'OPTIONS': {
                 'MAX_ENTRIES': 1000,
             }
-        }
+        },
+        # {% cache %} fragments: one entry per program card / candidate row
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'agrostudies-fragments',
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000,
+            }
+        },
     }
     # Use database sessions for reliability in dev/non-Redis environments
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'
@@ -352,6 +384,43 @@ CACHE_TTL = {
     'candidates': 300,   # 5 minutes
     'user_data': 900,    # 15 minutes
     'static_content': 3600,  # 1 hour
+    'fragments': 3600,   # {% cache %} blocks keyed on updated_at, so they never go stale
+}
+
+# Hot read paths (core.cache_utils.get_or_compute): per-process LRU in front of the cache above,
+# with single-flight recomputation and stale-while-revalidate.
+HOT_CACHE = {
+    'LOCAL_MAX_ENTRIES': 256,  # entries held in each worker's memory
+    'LOCAL_TTL': 5,            # seconds a worker serves an entry without asking the shared cache
+    'STALE_TTL': 300,          # seconds an expired entry may be served while one worker refreshes it
+    'LOCK_TIMEOUT': 30,        # seconds before an abandoned recompute lock is released
+    'LOCK_WAIT': 2.0,          # seconds a cold miss waits for another worker's result
+    'BETA': 1.0,               # probabilistic early refresh (0 = refresh only at expiry)
+}
+
+# ----- Server-Sent Events (core.events, /events/stream/) -----
+# Streams need the ASGI entry point (agrostudies_project.asgi); under WSGI the page keeps polling.
+EVENTS = {
+    'BACKEND': 'redis' if REDIS_URL and not DEBUG else 'local',  # redis pub/sub reaches every worker
+    'REDIS_URL': REDIS_URL,
+    'HEARTBEAT': 15,           # seconds between keep-alive comments
+    'STREAM_LIFETIME': 300,    # seconds before a stream is closed and the browser reconnects
+    'QUEUE_SIZE': 100,         # undelivered events held per connection
+    'RETRY_MS': 5000,          # browser reconnect delay
+}
+
+# ----- Audit Log Configuration -----
+# ActivityLog rows are buffered per transaction/request and written with bulk_create.
+# 'background' mode hands flushed batches to a writer thread through a bounded queue.
+AUDIT_LOG = {
+    'MODE': os.getenv('AUDIT_LOG_MODE', 'sync'),  # 'sync' or 'background'
+    'BUFFER_SIZE': 500,     # records per bulk_create
+    'QUEUE_SIZE': 100,      # batches held by the background writer
+    'OVERFLOW': os.getenv('AUDIT_LOG_OVERFLOW', 'block'),  # 'block' or 'drop'
+    'BLOCK_TIMEOUT': 0.5,   # seconds before a blocked caller writes inline
+    'RETENTION_DAYS': int(os.getenv('AUDIT_LOG_RETENTION_DAYS', '365')),  # older rows are archived
+    'RECENT_DAYS': 90,      # window the activity-log view reads by default
+    'ARCHIVE_DIR': BASE_DIR / 'backups' / 'activity_logs',  # monthly .jsonl.gz archives
 }
 
 # Admin Site Configuration
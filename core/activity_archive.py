@@ -0,0 +1,174 @@
+"""
+ActivityLog retention and archive storage for AgroStudies.
+
+`archive_logs` moves entries older than the retention window out of the
+ActivityLog table into gzip-compressed JSON Lines files, one per month
+(`activity-YYYY-MM.jsonl.gz`) under AUDIT_LOG['ARCHIVE_DIR']. Rows are
+processed in primary-key chunks: each chunk is appended to its month files and
+then deleted in its own short transaction, so no long-running lock is held.
+
+Re-running after an interruption can append a chunk a second time; readers
+de-duplicate on the log id.
+
+`read_archive` loads one archived month back as unsaved ActivityLog instances
+so the management view can show archives on demand.
+"""
+
+import gzip
+import json
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters
+from .audit import get_config
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+_ARCHIVE_NAME = re.compile(r'^activity-(\d{4}-\d{2})\.jsonl\.gz$')
+
+
+def get_archive_dir():
+    """Directory holding the monthly archive files."""
+    return Path(get_config().get('ARCHIVE_DIR') or Path(settings.BASE_DIR) / 'backups' / 'activity_logs')
+
+
+def archive_path(period, archive_dir=None):
+    return Path(archive_dir or get_archive_dir()) / f'activity-{period}.jsonl.gz'
+
+
+def recent_cutoff(now=None):
+    """Oldest timestamp the activity-log view shows by default."""
+    return (now or timezone.now()) - timedelta(days=get_config()['RECENT_DAYS'])
+
+
+def _record(log):
+    return {
+        'id': log.pk,
+        'timestamp': log.timestamp,
+        'user_id': log.user_id,
+        'username': log.user.username if log.user_id else None,
+        'action_type': log.action_type,
+        'model_name': log.model_name,
+        'object_id': log.object_id,
+        'before_data': log.before_data,
+        'after_data': log.after_data,
+        'ip_address': log.ip_address,
+        'session_key': log.session_key,
+    }
+
+
+def archive_logs(older_than_days=None, chunk_size=1000, dry_run=False, archive_dir=None, now=None):
+    """
+    Move ActivityLog rows older than the retention window into monthly archives.
+
+    Args:
+        older_than_days: Retention window in days (defaults to AUDIT_LOG['RETENTION_DAYS'])
+        chunk_size: Rows written and deleted per transaction
+        dry_run: Only count the rows that would be archived
+        archive_dir: Destination directory (defaults to get_archive_dir())
+        now: Reference time for the cut-off
+
+    Returns:
+        dict: {'archived': n, 'files': {period: rows appended}}
+    """
+    days = get_config()['RETENTION_DAYS'] if older_than_days is None else older_than_days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    old_logs = ActivityLog.objects.filter(timestamp__lt=cutoff)
+    if dry_run:
+        return {'archived': old_logs.count(), 'files': {}}
+
+    directory = Path(archive_dir or get_archive_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    files = defaultdict(int)
+    archived = 0
+    last_pk = 0
+    while True:
+        chunk = list(old_logs.filter(pk__gt=last_pk).select_related('user').order_by('pk')[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        by_period = defaultdict(list)
+        for log in chunk:
+            by_period[counters.format_period(log.timestamp)].append(log)
+        for period, logs in by_period.items():
+            with gzip.open(archive_path(period, directory), 'at', encoding='utf-8') as handle:
+                for log in logs:
+                    handle.write(json.dumps(_record(log), cls=DjangoJSONEncoder) + '\n')
+            files[period] += len(logs)
+
+        with transaction.atomic():
+            # Raw delete: no per-row signals, so the counters are adjusted in one pass
+            ActivityLog.objects.filter(pk__in=[log.pk for log in chunk])._raw_delete(ActivityLog.objects.db)
+            counters.record_bulk_delete(chunk)
+        archived += len(chunk)
+
+    if archived:
+        logger.info("Archived %d activity log(s) older than %s", archived, cutoff)
+    return {'archived': archived, 'files': dict(files)}
+
+
+def list_archive_periods(archive_dir=None):
+    """Archived months ('YYYY-MM'), newest first."""
+    directory = Path(archive_dir or get_archive_dir())
+    if not directory.exists():
+        return []
+    periods = [match.group(1) for match in map(_ARCHIVE_NAME.match, (p.name for p in directory.iterdir())) if match]
+    return sorted(periods, reverse=True)
+
+
+def read_archive(period, search_query='', action_filter='', model_filter='', archive_dir=None):
+    """
+    Load one archived month as unsaved ActivityLog instances, newest first.
+
+    Filters mirror the activity-log view: `search_query` matches username,
+    model name or object id (case-insensitive); the others are exact.
+    """
+    path = archive_path(period, archive_dir)
+    if not _ARCHIVE_NAME.match(path.name) or not path.exists():
+        return []
+
+    needle = search_query.lower()
+    seen = set()
+    logs = []
+    with gzip.open(path, 'rt', encoding='utf-8') as handle:
+        for line in handle:
+            row = json.loads(line)
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            if action_filter and row['action_type'] != action_filter:
+                continue
+            if model_filter and row['model_name'] != model_filter:
+                continue
+            if needle and not any(
+                needle in (row.get(name) or '').lower() for name in ('username', 'model_name', 'object_id')
+            ):
+                continue
+            log = ActivityLog(
+                id=row['id'],
+                timestamp=parse_datetime(row['timestamp']),
+                action_type=row['action_type'],
+                model_name=row['model_name'],
+                object_id=row['object_id'],
+                before_data=row['before_data'],
+                after_data=row['after_data'],
+                ip_address=row['ip_address'],
+                session_key=row['session_key'],
+            )
+            if row['user_id']:
+                log.user = User(pk=row['user_id'], username=row['username'] or '')
+            logs.append(log)
+    logs.sort(key=lambda log: log.timestamp, reverse=True)
+    return logs
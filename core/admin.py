@@ -12,6 +12,8 @@ from pathlib import Path
 import json
 from unfold.admin import ModelAdmin
 from .models import AgricultureProgram, Profile, Registration, University, Candidate, Notification, ActivityLog, UploadedFile
+from .counters import rebuild_counters
+from . import notification_counts
 
 # Configure the default admin site
 admin.site.site_header = "AgroStudies Admin"
@@ -72,10 +74,13 @@ class RegistrationAdmin(ModelAdmin):
 
     def approve_registrations(self, request, queryset):
         queryset.update(status=Registration.APPROVED)
+        # queryset.update() bypasses signals, so resync the registration counters
+        rebuild_counters(['registration'])
     approve_registrations.short_description = "Approve selected registrations"
 
     def reject_registrations(self, request, queryset):
         queryset.update(status=Registration.REJECTED)
+        rebuild_counters(['registration'])
     reject_registrations.short_description = "Reject selected registrations"
 
 @admin.register(University)
@@ -637,13 +642,31 @@ class NotificationAdmin(ModelAdmin):
 
     actions = ['mark_as_read', 'mark_as_unread']
 
+    # Edits here bypass Notification.add_notification, so the cached unread counts are rebuilt
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        notification_counts.reset([obj.user_id, form.initial.get('user')])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        notification_counts.reset(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        notification_counts.reset(user_ids)
+
     def mark_as_read(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(read=True)
+        notification_counts.reset(user_ids)
         self.message_user(request, f"{updated} notification(s) marked as read.", messages.SUCCESS)
     mark_as_read.short_description = "Mark selected as read"
 
     def mark_as_unread(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(read=False)
+        notification_counts.reset(user_ids)
         self.message_user(request, f"{updated} notification(s) marked as unread.", messages.SUCCESS)
     mark_as_unread.short_description = "Mark selected as unread"
 
@@ -0,0 +1,238 @@
+"""
+Resolved application facts for one applicant.
+
+An applicant "owns" the Registrations linked to their user and the Candidates
+they created or that carry their e-mail address. Views used to answer "has this
+user applied (here / anywhere / elsewhere)?" with several exists() and
+values_list() queries each; `ApplicantState` loads every fact with a single
+UNION ALL query instead.
+
+The state is memoised on the request (`for_request`) and cached per user under
+`applicant_state:<user id>` as plain JSON-serialisable rows. The Candidate,
+Registration and User signal handlers in core/cache_signals.py call
+`invalidate_for_*`, both immediately and again after the surrounding
+transaction commits, so a concurrent request cannot re-cache the old state.
+A Candidate write invalidates the owners it had when loaded as well as its
+current ones; a save that changes none of CANDIDATE_STATE_FIELDS invalidates
+nothing and skips the e-mail owner lookup.
+While such an invalidation is still pending, `load` reads the database but
+does not cache the result: those rows may yet be rolled back.
+
+Code that must see uncommitted rows (the re-check inside apply_candidate's
+transaction) calls `ApplicantState.load(user, use_cache=False)`.
+"""
+
+import logging
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q, Value
+
+from .cache_metrics import cache
+from .cache_utils import bump_generation, get_cache_timeout, user_namespace
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_ATTR = '_applicant_state'
+
+REGISTRATION = 'registration'
+CANDIDATE = 'candidate'
+
+
+def cache_key(user_id):
+    return f'applicant_state:{user_id}'
+
+
+def ownership_q(user):
+    """Candidates owned by `user`: created by them or carrying their e-mail address."""
+    condition = Q(created_by_id=user.pk)
+    if user.email:
+        # A blank e-mail would otherwise match every candidate saved without one
+        condition |= Q(email=user.email)
+    return condition
+
+
+class ApplicantState:
+    """Application facts of one user, built from (kind, program_id, id, status) rows."""
+
+    def __init__(self, user_id, rows):
+        self.user_id = user_id
+        self.rows = [tuple(row) for row in rows]
+        self.registrations = {
+            program_id: (pk, status) for kind, program_id, pk, status in self.rows if kind == REGISTRATION
+        }
+        self.candidate_program_ids = frozenset(
+            program_id for kind, program_id, _pk, _status in self.rows if kind == CANDIDATE
+        )
+
+    def __repr__(self):
+        return f'<ApplicantState user={self.user_id} programs={sorted(self.applied_program_ids)}>'
+
+    # -------- Loading ---------
+
+    @classmethod
+    def load(cls, user, use_cache=True):
+        """Resolve the state of `user` with one query (or none when cached)."""
+        key = cache_key(user.pk)
+        if use_cache:
+            try:
+                rows = cache.get(key)
+            except Exception as e:
+                logger.warning(f"Cache get failed for applicant state: {e}")
+                rows = None
+            if rows is not None:
+                return cls(user.pk, rows)
+
+        from .models import Candidate, Registration
+
+        registrations = Registration.objects.filter(user_id=user.pk).values_list(
+            Value(REGISTRATION), 'program_id', 'id', 'status'
+        )
+        candidates = Candidate.objects.filter(ownership_q(user)).values_list(
+            Value(CANDIDATE), 'program_id', 'id', 'status'
+        )
+        rows = [list(row) for row in registrations.union(candidates, all=True)]
+
+        if use_cache and not _invalidation_pending(user.pk):
+            try:
+                cache.set(key, rows, timeout=get_cache_timeout('user_data'))
+            except Exception as e:
+                logger.warning(f"Cache set failed for applicant state: {e}")
+        return cls(user.pk, rows)
+
+    @classmethod
+    def for_request(cls, request):
+        """The current user's state, loaded at most once per request."""
+        state = getattr(request, _REQUEST_ATTR, None)
+        if state is None or state.user_id != request.user.pk:
+            state = cls.load(request.user)
+            setattr(request, _REQUEST_ATTR, state)
+        return state
+
+    # -------- Facts ---------
+
+    @property
+    def registration_program_ids(self):
+        return frozenset(program_id for program_id in self.registrations if program_id is not None)
+
+    @property
+    def applied_program_ids(self):
+        """Programs with a Registration or an owned Candidate."""
+        return self.registration_program_ids | {pid for pid in self.candidate_program_ids if pid is not None}
+
+    @property
+    def has_applied_any(self):
+        return bool(self.rows)
+
+    def has_applied_to(self, program_id):
+        return program_id in self.applied_program_ids
+
+    def has_applied_elsewhere(self, program_id):
+        """Any application not for `program_id` (a Candidate without a program counts)."""
+        return any(pid != program_id for pid in self.registrations) or any(
+            pid != program_id for pid in self.candidate_program_ids
+        )
+
+    def registration_id(self, program_id):
+        """Primary key of the user's Registration for `program_id`, or None."""
+        entry = self.registrations.get(program_id)
+        return entry[0] if entry else None
+
+
+# -------- Invalidation ---------
+
+class _Invalidation:
+    """on_commit callback deleting the cached states of `user_ids`."""
+
+    def __init__(self, user_ids):
+        self.user_ids = frozenset(user_ids)
+
+    def __call__(self):
+        try:
+            cache.delete_many([cache_key(user_id) for user_id in self.user_ids])
+        except Exception as e:
+            logger.warning(f"Cache delete failed for applicant state: {e}")
+
+
+def _invalidation_pending(user_id):
+    """True if the open transaction changed this user's rows and has not committed yet."""
+    if not connection.in_atomic_block:
+        return False
+    # Django drops the callbacks of rolled-back (savepoint) blocks from this list
+    return any(
+        isinstance(entry[1], _Invalidation) and user_id in entry[1].user_ids
+        for entry in connection.run_on_commit
+    )
+
+
+def invalidate(user_ids):
+    """Drop cached states now and once more when the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    delete = _Invalidation(user_ids)
+    delete()
+    transaction.on_commit(delete)
+
+
+# Candidate fields an applicant state is built from
+CANDIDATE_STATE_FIELDS = ('created_by_id', 'email', 'program_id', 'status')
+
+_LOADED_ATTR = '_applicant_state_loaded'
+
+
+def track_candidate(candidate):
+    """Remember the state fields a candidate was loaded with (called from post_init)."""
+    if candidate.pk is None:
+        return
+    # From __dict__ only: a deferred field is left out rather than fetched
+    candidate.__dict__[_LOADED_ATTR] = {
+        name: candidate.__dict__[name] for name in CANDIDATE_STATE_FIELDS if name in candidate.__dict__
+    }
+
+
+def _candidate_owners(candidate, deleted=False):
+    """
+    (creator ids, e-mails) whose states a candidate write changes, before and after it.
+    Empty for a save that changed none of CANDIDATE_STATE_FIELDS.
+    """
+    loaded = candidate.__dict__.get(_LOADED_ATTR) or {}
+    current = {name: getattr(candidate, name) for name in CANDIDATE_STATE_FIELDS}
+    if not deleted:
+        candidate.__dict__[_LOADED_ATTR] = current
+        if loaded == current:
+            return set(), set()
+    return (
+        {current['created_by_id'], loaded.get('created_by_id')},
+        {current['email'], loaded.get('email')},
+    )
+
+
+def _invalidate_owners(created_by_ids, emails):
+    user_ids = set(created_by_ids)
+    emails = {email for email in emails if email}
+    if emails:
+        user_ids.update(User.objects.filter(email__in=emails).values_list('id', flat=True))
+    user_ids.discard(None)
+    invalidate(user_ids)
+    # Their pages show whether they applied; their ETags are built from user:<id>
+    bump_generation(*(user_namespace(user_id) for user_id in user_ids))
+
+
+def invalidate_for_candidate(candidate, deleted=False):
+    """Invalidate the states of the candidate's owners, the previous ones included."""
+    _invalidate_owners(*_candidate_owners(candidate, deleted))
+
+
+def invalidate_for_candidates(candidates):
+    """invalidate_for_candidate for candidates saved together, looking up e-mail owners in one query."""
+    created_by_ids, emails = set(), set()
+    for candidate in candidates:
+        owners, owner_emails = _candidate_owners(candidate)
+        created_by_ids |= owners
+        emails |= owner_emails
+    _invalidate_owners(created_by_ids, emails)
+
+
+def invalidate_for_registration(registration):
+    invalidate([registration.user_id])
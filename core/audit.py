@@ -0,0 +1,478 @@
+"""
+Buffered ActivityLog writer for AgroStudies.
+
+The audit signal handlers in core/signals.py call `record()` instead of
+`ActivityLog.objects.create()`. Records are collected and written with one
+`bulk_create` per unit of work:
+
+* inside a transaction, records are buffered per savepoint and flushed from
+  `transaction.on_commit`, so a rolled back block never leaves audit rows for
+  changes that did not happen;
+* in autocommit mode during a request (see RequestContextMiddleware), records
+  are buffered until the response is ready;
+* anywhere else they are written immediately.
+
+Settings (all optional)::
+
+    AUDIT_LOG = {
+        'MODE': 'sync',          # 'sync' or 'background'
+        'BUFFER_SIZE': 500,      # records per bulk_create / early flush threshold
+        'QUEUE_SIZE': 100,       # batches held by the background writer
+        'OVERFLOW': 'block',     # 'block' (backpressure) or 'drop' when the queue is full
+        'BLOCK_TIMEOUT': 0.5,    # seconds to wait for queue space before writing inline
+        'RETENTION_DAYS': 365,   # archive_activity_logs moves older rows to backups/
+        'RECENT_DAYS': 90,       # window shown by the activity-log view by default
+        'ARCHIVE_DIR': None,     # defaults to BASE_DIR / 'backups' / 'activity_logs'
+    }
+
+In 'background' mode flushed batches are handed to a daemon thread through a
+bounded queue. Counters for queued, written, dropped and blocked records are
+available from `get_metrics()`.
+
+UPDATE records are stored in compact form: `before_data`/`after_data` only hold
+the fields that changed, diffed against the state the instance was loaded with
+(captured at post_init by `track_loaded_state`). `ActivityLog.rollback()`
+rebuilds the full previous state from the current row and later change sets.
+"""
+
+import atexit
+import copy
+import logging
+import queue
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+
+from . import counters
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'sync',
+    'BUFFER_SIZE': 500,
+    'QUEUE_SIZE': 100,
+    'OVERFLOW': 'block',
+    'BLOCK_TIMEOUT': 0.5,
+    'RETENTION_DAYS': 365,
+    'RECENT_DAYS': 90,
+    'ARCHIVE_DIR': None,
+}
+
+_state = threading.local()
+_metrics = defaultdict(int)
+_metrics_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+_STOP = object()
+_LOADED_ATTR = '_audit_loaded_state'
+_field_cache = {}
+
+
+def get_config():
+    """Return the AUDIT_LOG settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'AUDIT_LOG', {})}
+
+
+# -------- Snapshots ---------
+
+def _audit_fields(model):
+    """Return ((key, attname), ...) for the concrete fields of a model, plus mutable attnames."""
+    fields = _field_cache.get(model)
+    if fields is None:
+        keys = []
+        mutable = []
+        for field in model._meta.concrete_fields:
+            # Relations are keyed by field name but hold the raw id value
+            key = field.attname.replace('_id', '') if field.is_relation else field.attname
+            keys.append((key, field.attname))
+            if field.get_internal_type() == 'JSONField':
+                mutable.append(field.attname)
+        fields = _field_cache[model] = (tuple(keys), tuple(mutable))
+    return fields
+
+
+def _snapshot(model, values):
+    """Build an audit snapshot from a mapping of attname -> value (loaded fields only)."""
+    data = {}
+    for key, attname in _audit_fields(model)[0]:
+        if attname not in values:
+            continue  # deferred, never read without a query
+        value = values[attname]
+        # For bytes/files use string representation
+        if hasattr(value, 'name'):
+            value = value.name
+        data[key] = value
+    return data
+
+
+def serialize_instance(instance):
+    """Serialize the loaded concrete field values of an instance to a plain dict.
+    ForeignKey fields are stored as their raw id value.
+    """
+    return _snapshot(type(instance), instance.__dict__)
+
+
+def track_loaded_state(instance):
+    """Remember the field values an instance was loaded with (called from post_init)."""
+    if instance.pk is None:
+        return
+    state = {name: value for name, value in instance.__dict__.items() if not name.startswith('_')}
+    for attname in _audit_fields(type(instance))[1]:
+        if attname in state:
+            state[attname] = copy.deepcopy(state[attname])
+    instance.__dict__[_LOADED_ATTR] = state
+
+
+def ensure_loaded_state(instance, model):
+    """
+    Load the stored row for an instance that was not fetched from the database
+    (e.g. built with an explicit pk), so its next save can still be diffed.
+    """
+    if instance.pk is None or _LOADED_ATTR in instance.__dict__:
+        return
+    existing = model._base_manager.filter(pk=instance.pk).first()
+    if existing is not None:
+        instance.__dict__[_LOADED_ATTR] = existing.__dict__.get(_LOADED_ATTR)
+
+
+def change_set(instance, created, update_fields=None):
+    """
+    Return the (before, after) audit payload for a save and reset the loaded state.
+
+    Creations store the full new snapshot. Updates store only the fields whose
+    value differs from the loaded state; if that state is unknown the full new
+    snapshot is stored with no before data.
+    """
+    model = type(instance)
+    after = serialize_instance(instance)
+    loaded = instance.__dict__.get(_LOADED_ATTR)
+    before = None
+    if not created and loaded is not None:
+        previous = _snapshot(model, loaded)
+        changed = [
+            key for key, value in after.items()
+            if key in previous and previous[key] != value
+            and (update_fields is None or key in update_fields)
+        ]
+        before = {key: previous[key] for key in changed}
+        after = {key: after[key] for key in changed}
+
+    if update_fields is not None and loaded is not None:
+        # Only the saved fields are now persisted; keep the rest as loaded
+        for key, attname in _audit_fields(model)[0]:
+            if key in update_fields and attname in instance.__dict__:
+                loaded[attname] = instance.__dict__[attname]
+    else:
+        track_loaded_state(instance)
+    return before, after
+
+
+def compact_snapshots(before, after):
+    """
+    Reduce full before/after snapshots of an UPDATE to the fields that changed.
+
+    Returns:
+        tuple: (before, after) change sets, or None if the pair is already compact
+    """
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        return None
+    unchanged = [key for key in before if key in after and before[key] == after[key]]
+    if not unchanged:
+        return None
+    changed = [key for key in after if key not in unchanged]
+    return (
+        {key: before[key] for key in changed if key in before},
+        {key: after[key] for key in changed},
+    )
+
+
+# -------- Metrics ---------
+
+def _incr(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+def _observe_depth(depth):
+    with _metrics_lock:
+        _metrics['queue_depth_max'] = max(_metrics['queue_depth_max'], depth)
+
+
+def get_metrics():
+    """
+    Snapshot of the audit pipeline counters.
+
+    Returns:
+        dict: recorded, written, flushes, failed, queued, dropped, blocked,
+              sync_fallbacks, queue_depth, queue_depth_max and the active mode.
+    """
+    with _metrics_lock:
+        snapshot = {
+            name: _metrics[name]
+            for name in ('recorded', 'written', 'flushes', 'failed', 'queued',
+                         'dropped', 'blocked', 'sync_fallbacks', 'queue_depth_max')
+        }
+    snapshot['queue_depth'] = _writer.queue.qsize() if _writer is not None else 0
+    snapshot['mode'] = get_config()['MODE']
+    return snapshot
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# -------- Writing ---------
+
+def write_entries(entries):
+    """
+    Insert unsaved ActivityLog instances with bulk_create and bump their counters.
+
+    Returns:
+        int: Number of records written (0 on failure)
+    """
+    if not entries:
+        return 0
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(entries, batch_size=get_config()['BUFFER_SIZE'])
+            try:
+                # bulk_create sends no post_save, so the counters are bumped here
+                with transaction.atomic():
+                    counters.record_bulk_create(entries)
+            except DatabaseError:
+                logger.exception('Failed to update activity log counters')
+    except Exception:
+        _incr('failed', len(entries))
+        logger.exception('Failed to write %d ActivityLog record(s)', len(entries))
+        return 0
+    _incr('written', len(entries))
+    _incr('flushes')
+    return len(entries)
+
+
+class AuditWriter(threading.Thread):
+    """Daemon thread that drains a bounded queue of ActivityLog batches."""
+
+    def __init__(self, queue_size, batch_size, overflow='block', block_timeout=0.5):
+        super().__init__(name='audit-log-writer', daemon=True)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+    def submit(self, entries):
+        """Queue a batch, applying the overflow policy when the queue is full."""
+        try:
+            self.queue.put_nowait(entries)
+        except queue.Full:
+            if self.overflow == 'drop':
+                _incr('dropped', len(entries))
+                logger.warning('Audit queue full, dropped %d ActivityLog record(s)', len(entries))
+                return
+            _incr('blocked')
+            try:
+                self.queue.put(entries, timeout=self.block_timeout)
+            except queue.Full:
+                # Backpressure: the caller pays for the write instead of growing the queue
+                _incr('sync_fallbacks')
+                write_entries(entries)
+                return
+        _incr('queued', len(entries))
+        _observe_depth(self.queue.qsize())
+
+    def _take_batch(self, first):
+        """Coalesce queued batches behind `first` up to batch_size records."""
+        batch = list(first)
+        stop = False
+        while len(batch) < self.batch_size:
+            try:
+                more = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if more is _STOP:
+                stop = True
+                break
+            batch.extend(more)
+        return batch, stop
+
+    def drain(self):
+        """Write everything currently queued from the calling thread."""
+        written = 0
+        while True:
+            try:
+                first = self.queue.get_nowait()
+            except queue.Empty:
+                return written
+            if first is _STOP:
+                return written
+            batch, stop = self._take_batch(first)
+            written += write_entries(batch)
+            if stop:
+                return written
+
+    def run(self):
+        while True:
+            first = self.queue.get()
+            if first is _STOP:
+                break
+            batch, stop = self._take_batch(first)
+            write_entries(batch)
+            close_old_connections()
+            if stop:
+                break
+
+    def stop(self, timeout=5):
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self.join(timeout)
+
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            config = get_config()
+            _writer = AuditWriter(
+                queue_size=config['QUEUE_SIZE'],
+                batch_size=config['BUFFER_SIZE'],
+                overflow=config['OVERFLOW'],
+                block_timeout=config['BLOCK_TIMEOUT'],
+            )
+            _writer.start()
+        return _writer
+
+
+@atexit.register
+def shutdown():
+    """Stop the background writer, flushing whatever it still holds."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None and writer.is_alive():
+        writer.stop()
+
+
+def dispatch(entries):
+    """Hand a finished batch to the configured writer."""
+    if not entries:
+        return
+    if get_config()['MODE'] == 'background':
+        _get_writer().submit(list(entries))
+    else:
+        write_entries(entries)
+
+
+# -------- Buffering ---------
+
+def _in_transaction(connection):
+    # Atomic blocks opened by TestCase wrap a whole test rather than a unit of
+    # work, so they are treated like autocommit (Django's durable check does the same)
+    return any(not getattr(block, '_from_testcase', False) for block in connection.atomic_blocks)
+
+
+def _transaction_buffer(connection):
+    """Return the buffer for the current savepoint, registering its on_commit flush."""
+    pending = getattr(_state, 'transaction_buffers', None)
+    if pending is None or not connection.run_on_commit:
+        # Nothing left to flush the old buffers: they were committed or rolled back
+        pending = _state.transaction_buffers = {}
+    key = tuple(connection.savepoint_ids)
+    registered = {id(item[1]) for item in connection.run_on_commit}
+
+    entry = pending.get(key)
+    if entry is not None and id(entry[1]) in registered:
+        return entry[0]
+
+    # Buffers whose callbacks were discarded by a rollback are dead
+    for stale_key in [k for k, (_buf, cb) in pending.items() if id(cb) not in registered]:
+        del pending[stale_key]
+
+    buffer = []
+
+    def flush_on_commit():
+        if pending.get(key, (None, None))[1] is flush_on_commit:
+            del pending[key]
+        dispatch(buffer)
+
+    pending[key] = (buffer, flush_on_commit)
+    transaction.on_commit(flush_on_commit, robust=True)
+    return buffer
+
+
+def record(**fields):
+    """Queue one ActivityLog record built from model field values."""
+    entry = ActivityLog(**fields)
+    _incr('recorded')
+    buffer_size = get_config()['BUFFER_SIZE']
+    connection = transaction.get_connection()
+
+    if _in_transaction(connection):
+        buffer = _transaction_buffer(connection)
+        buffer.append(entry)
+        if len(buffer) >= buffer_size:
+            # Still inside the transaction, so these rows roll back with it
+            write_entries(buffer[:])
+            buffer.clear()
+        return entry
+
+    request_buffer = getattr(_state, 'request_buffer', None)
+    if request_buffer is not None:
+        request_buffer.append(entry)
+        if len(request_buffer) >= buffer_size:
+            dispatch(request_buffer[:])
+            request_buffer.clear()
+        return entry
+
+    dispatch([entry])
+    return entry
+
+
+@contextmanager
+def buffered():
+    """Collect autocommit records for the duration of the block and flush them on exit."""
+    previous = getattr(_state, 'request_buffer', None)
+    _state.request_buffer = []
+    try:
+        yield _state.request_buffer
+    finally:
+        entries = _state.request_buffer
+        _state.request_buffer = previous
+        dispatch(entries)
+        if previous is None and not _in_transaction(transaction.get_connection()):
+            _state.transaction_buffers = {}
+
+
+def record_updates(changes, **fields):
+    """
+    Record an UPDATE for each (instance, update_fields) written by bulk_update, which sends
+    no signals, and flush them as one batch. `fields` are the shared ActivityLog values
+    (user, ip_address, session_key).
+    """
+    with buffered():
+        for instance, update_fields in changes:
+            before, after = change_set(instance, False, update_fields)
+            record(
+                action_type=ActivityLog.ACTION_UPDATE,
+                model_name=f"{instance._meta.app_label}.{instance.__class__.__name__}",
+                object_id=str(instance.pk),
+                before_data=before,
+                after_data=after,
+                **fields,
+            )
+
+
+def pending_records():
+    """Number of records buffered by the current thread and not yet written."""
+    count = len(getattr(_state, 'request_buffer', None) or ())
+    registered = {id(item[1]) for item in transaction.get_connection().run_on_commit}
+    for buffer, callback in getattr(_state, 'transaction_buffers', {}).values():
+        if id(callback) in registered:
+            count += len(buffer)
+    return count
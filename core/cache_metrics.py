@@ -0,0 +1,340 @@
+"""
+Cache hit/miss/latency instrumentation.
+
+`cache` is the default Django cache wrapped in `InstrumentedCache`.
+core/cache_utils.py and the other cache helpers use it. Every get, get_many,
+set, set_many and add is recorded per tier and key namespace. The namespace
+is the key up to its first ':' ('programs_list', 'view', 'ns', ...). Recorded
+values are hits, misses, sets, bytes written, and get/set latency histograms.
+The per-process LRU of `get_or_compute` reports its hits and misses as the
+'local' tier.
+
+Bytes written are estimated: the backend serialises the value itself, so
+pickling it again on every write would double the cost. Every
+SIZE_SAMPLE_RATE-th write of a namespace (the first included) is pickled and
+counts for that many writes.
+
+Recording is lock-free. Each thread updates its own counters, and `snapshot()`
+adds them up when read. The counters of finished threads are folded into one
+process total, so short-lived threads do not pile up. Each process also
+publishes its snapshot to the shared
+cache every PUBLISH_INTERVAL seconds. `collect()` merges the published
+snapshots of all workers, which /metrics/ (Prometheus text format), /health/
+and `manage.py cache_stats` report.
+"""
+
+import os
+import pickle
+import socket
+import threading
+import time
+
+from django.core.cache import cache as default_cache
+
+# Latency histogram upper bounds in seconds (the last bucket is +Inf)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+PUBLISH_INTERVAL = 10
+PUBLISH_TTL = 300
+REGISTRY_KEY = 'cache_metrics:processes'
+SIZE_SAMPLE_RATE = 16
+
+_MISSING = object()
+_local = threading.local()
+# (thread, its counters) of the threads that recorded something
+_all_counters = []
+# Counters of finished threads, merged
+_retired = {}
+_all_counters_lock = threading.Lock()
+_last_publish = 0.0
+
+
+def namespace_of(key):
+    return str(key).split(':', 1)[0]
+
+
+def process_id():
+    # Not cached at import: pre-forking servers import before forking
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _new_stats():
+    return {
+        'hits': 0,
+        'misses': 0,
+        'sets': 0,
+        'set_bytes': 0,
+        'get_latency': [0] * (len(BUCKETS) + 1),
+        'get_seconds': 0.0,
+        'set_latency': [0] * (len(BUCKETS) + 1),
+        'set_seconds': 0.0,
+    }
+
+
+def _counters():
+    """This thread's {tier: {namespace: stats}}; registered once so reads can see it."""
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = {}
+        with _all_counters_lock:
+            _fold_finished_threads()
+            _all_counters.append((threading.current_thread(), counters))
+    return counters
+
+
+def _fold_finished_threads():
+    """Merge the counters of threads that have exited into `_retired` (lock held)."""
+    live = []
+    for thread, counters in _all_counters:
+        if thread.is_alive():
+            live.append((thread, counters))
+        else:
+            _merge(_retired, counters)
+    _all_counters[:] = live
+
+
+def _stats(tier, namespace):
+    tier_stats = _counters().setdefault(tier, {})
+    stats = tier_stats.get(namespace)
+    if stats is None:
+        stats = tier_stats[namespace] = _new_stats()
+    return stats
+
+
+def _bucket(seconds):
+    for position, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            return position
+    return len(BUCKETS)
+
+
+# -------- Recording ---------
+
+def record_get(key, hits, misses=0, seconds=None, tier='shared'):
+    stats = _stats(tier, namespace_of(key))
+    stats['hits'] += hits
+    stats['misses'] += misses
+    if seconds is not None:
+        stats['get_latency'][_bucket(seconds)] += 1
+        stats['get_seconds'] += seconds
+    _maybe_publish()
+
+
+def record_set(key, value, seconds, tier='shared'):
+    stats = _stats(tier, namespace_of(key))
+    if stats['sets'] % SIZE_SAMPLE_RATE == 0:
+        stats['set_bytes'] += _size(value) * SIZE_SAMPLE_RATE
+    stats['sets'] += 1
+    stats['set_latency'][_bucket(seconds)] += 1
+    stats['set_seconds'] += seconds
+    _maybe_publish()
+
+
+def _size(value):
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class InstrumentedCache:
+    """Proxy around a Django cache recording reads and writes; other methods pass through."""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def get(self, key, default=None, version=None):
+        started = time.perf_counter()
+        value = self._backend.get(key, _MISSING, version=version)
+        hit = value is not _MISSING
+        record_get(key, int(hit), int(not hit), time.perf_counter() - started)
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        started = time.perf_counter()
+        found = self._backend.get_many(keys, version=version)
+        seconds = time.perf_counter() - started
+        by_namespace = {}
+        for key in keys:
+            hits, misses = by_namespace.get(namespace_of(key), (0, 0))
+            by_namespace[namespace_of(key)] = (hits + 1, misses) if key in found else (hits, misses + 1)
+        for namespace, (hits, misses) in by_namespace.items():
+            # One round trip: its latency is attributed to each namespace read
+            record_get(namespace, hits, misses, seconds)
+        return found
+
+    def set(self, key, value, timeout=_MISSING, version=None):
+        started = time.perf_counter()
+        if timeout is _MISSING:
+            result = self._backend.set(key, value, version=version)
+        else:
+            result = self._backend.set(key, value, timeout=timeout, version=version)
+        record_set(key, value, time.perf_counter() - started)
+        return result
+
+    def add(self, key, value, timeout=_MISSING, version=None):
+        started = time.perf_counter()
+        if timeout is _MISSING:
+            added = self._backend.add(key, value, version=version)
+        else:
+            added = self._backend.add(key, value, timeout=timeout, version=version)
+        if added:
+            record_set(key, value, time.perf_counter() - started)
+        return added
+
+    def set_many(self, data, timeout=_MISSING, version=None):
+        started = time.perf_counter()
+        if timeout is _MISSING:
+            result = self._backend.set_many(data, version=version)
+        else:
+            result = self._backend.set_many(data, timeout=timeout, version=version)
+        seconds = (time.perf_counter() - started) / max(len(data), 1)
+        for key, value in data.items():
+            record_set(key, value, seconds)
+        return result
+
+
+cache = InstrumentedCache(default_cache)
+
+
+# -------- Reading ---------
+
+def _merge(total, snapshot):
+    for tier, namespaces in snapshot.items():
+        for namespace, stats in namespaces.items():
+            merged = total.setdefault(tier, {}).setdefault(namespace, _new_stats())
+            for field, value in stats.items():
+                if isinstance(value, list):
+                    merged[field] = [a + b for a, b in zip(merged[field], value)]
+                else:
+                    merged[field] += value
+    return total
+
+
+def snapshot():
+    """This process's metrics: {tier: {namespace: stats}}"""
+    with _all_counters_lock:
+        _fold_finished_threads()
+        counters = [thread_counters for _thread, thread_counters in _all_counters]
+        total = _merge({}, _retired)
+    for thread_counters in counters:
+        # Another thread may add a namespace meanwhile; copy before iterating
+        _merge(total, {tier: dict(namespaces) for tier, namespaces in list(thread_counters.items())})
+    return total
+
+
+def reset():
+    """Zero this process's counters."""
+    with _all_counters_lock:
+        for _thread, counters in _all_counters:
+            counters.clear()
+        _retired.clear()
+
+
+def _process_key(process):
+    return f'cache_metrics:process:{process}'
+
+
+def publish():
+    """Store this process's snapshot in the shared cache for `collect()`."""
+    global _last_publish
+    _last_publish = time.time()
+    try:
+        current = process_id()
+        default_cache.set(_process_key(current), snapshot(), timeout=PUBLISH_TTL)
+        processes = default_cache.get(REGISTRY_KEY) or []
+        if current not in processes:
+            default_cache.set(REGISTRY_KEY, (processes + [current])[-200:], timeout=None)
+    except Exception:
+        # Metrics must never break a request
+        pass
+
+
+def _maybe_publish():
+    if time.time() - _last_publish >= PUBLISH_INTERVAL:
+        publish()
+
+
+def collect():
+    """
+    Metrics of every worker that published recently, this process's current ones included.
+
+    Returns:
+        dict: {'processes': count, 'tiers': {tier: {namespace: stats}}}
+    """
+    published = {}
+    try:
+        current = process_id()
+        processes = [process for process in default_cache.get(REGISTRY_KEY) or [] if process != current]
+        published = default_cache.get_many([_process_key(process) for process in processes])
+    except Exception:
+        pass
+    total = _merge({}, snapshot())
+    for process_snapshot in published.values():
+        _merge(total, process_snapshot)
+    return {'processes': len(published) + 1, 'tiers': total}
+
+
+def summary(tiers):
+    """Totals per tier: hits, misses, hit_ratio, sets and set_bytes"""
+    result = {}
+    for tier, namespaces in tiers.items():
+        hits = sum(stats['hits'] for stats in namespaces.values())
+        misses = sum(stats['misses'] for stats in namespaces.values())
+        result[tier] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            'sets': sum(stats['sets'] for stats in namespaces.values()),
+            'set_bytes': sum(stats['set_bytes'] for stats in namespaces.values()),
+        }
+    return result
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, labels, counts, total_seconds):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (None,), counts):
+        cumulative += count
+        le = '+Inf' if bound is None else repr(bound)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.append(f'{name}_sum{{{labels}}} {total_seconds}')
+    lines.append(f'{name}_count{{{labels}}} {cumulative}')
+    return lines
+
+
+def prometheus_text(tiers):
+    """Render collected metrics in the Prometheus text exposition format."""
+    lines = [
+        '# HELP agrostudies_cache_hits_total Cache reads that found a value.',
+        '# TYPE agrostudies_cache_hits_total counter',
+        '# HELP agrostudies_cache_misses_total Cache reads that found nothing.',
+        '# TYPE agrostudies_cache_misses_total counter',
+        '# HELP agrostudies_cache_sets_total Cache writes.',
+        '# TYPE agrostudies_cache_sets_total counter',
+        '# HELP agrostudies_cache_set_bytes_total Pickled size of the values written (sampled estimate).',
+        '# TYPE agrostudies_cache_set_bytes_total counter',
+        '# HELP agrostudies_cache_get_seconds Cache read latency.',
+        '# TYPE agrostudies_cache_get_seconds histogram',
+        '# HELP agrostudies_cache_set_seconds Cache write latency.',
+        '# TYPE agrostudies_cache_set_seconds histogram',
+    ]
+    for tier, namespaces in sorted(tiers.items()):
+        for namespace, stats in sorted(namespaces.items()):
+            labels = f'tier="{_label(tier)}",namespace="{_label(namespace)}"'
+            lines.append(f'agrostudies_cache_hits_total{{{labels}}} {stats["hits"]}')
+            lines.append(f'agrostudies_cache_misses_total{{{labels}}} {stats["misses"]}')
+            lines.append(f'agrostudies_cache_sets_total{{{labels}}} {stats["sets"]}')
+            lines.append(f'agrostudies_cache_set_bytes_total{{{labels}}} {stats["set_bytes"]}')
+            if sum(stats['get_latency']):
+                lines += _histogram_lines('agrostudies_cache_get_seconds', labels, stats['get_latency'], stats['get_seconds'])
+            if sum(stats['set_latency']):
+                lines += _histogram_lines('agrostudies_cache_set_seconds', labels, stats['set_latency'], stats['set_seconds'])
+    return '\n'.join(lines) + '\n'
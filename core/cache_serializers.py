@@ -0,0 +1,26 @@
+"""
+django-redis serializers.
+
+`CompactSerializer` stores values with msgpack (see core/cache_rows.py)
+instead of JSON. Its payloads start with a marker byte that JSON text never
+starts with, so entries written by the previous JSONSerializer stay readable
+while they age out.
+"""
+
+import json
+
+from django_redis.serializers.base import BaseSerializer
+
+from .cache_rows import packb, unpackb
+
+MARKER = b'\xc1'  # a byte msgpack never emits and JSON never starts with
+
+
+class CompactSerializer(BaseSerializer):
+    def dumps(self, value):
+        return MARKER + packb(value)
+
+    def loads(self, value):
+        if value[:1] == MARKER:
+            return unpackb(value[1:])
+        return json.loads(value.decode())
@@ -2,10 +2,14 @@
 Cache invalidation signals for automatic cache management
 """
 
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from .models import AgricultureProgram, Candidate, Registration
-from .cache_utils import invalidate_program_cache, invalidate_candidate_cache
+from .models import AgricultureProgram, Candidate, Registration, University
+from .cache_utils import (
+    invalidate_program_cache, invalidate_candidate_cache, invalidate_university_cache, invalidate_user_cache,
+)
+from . import applicant_state
 
 
 @receiver(post_save, sender=AgricultureProgram)
@@ -17,15 +21,59 @@ def invalidate_program_cache_on_change(sender, **kwargs):
 
 @receiver(post_save, sender=Candidate)
 @receiver(post_delete, sender=Candidate)
-def invalidate_candidate_cache_on_change(sender, **kwargs):
-    """Invalidate candidate cache when candidates are modified"""
-    invalidate_candidate_cache()
+def invalidate_candidate_cache_on_change(sender, instance, **kwargs):
+    """Invalidate candidate cache, the candidate's program and its creator when candidates are modified"""
+    invalidate_candidate_cache(program_id=instance.program_id, user_id=instance.created_by_id)
 
 
 @receiver(post_save, sender=Registration)
 @receiver(post_delete, sender=Registration)
-def invalidate_related_cache_on_registration_change(sender, **kwargs):
+def invalidate_related_cache_on_registration_change(sender, instance, **kwargs):
     """Invalidate caches when registrations change"""
     # Registration changes affect both program and candidate data
-    invalidate_program_cache()
-    invalidate_candidate_cache()
+    invalidate_candidate_cache(program_id=instance.program_id, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def invalidate_university_cache_on_change(sender, **kwargs):
+    """Invalidate the cached university choices when universities are modified"""
+    invalidate_university_cache()
+
+
+@receiver(post_init, sender=Candidate)
+def track_candidate_applicant_state(sender, instance, **kwargs):
+    """Remember the candidate's loaded owners, so a save moving it away can invalidate them"""
+    applicant_state.track_candidate(instance)
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_applicant_state_on_candidate_change(sender, instance, signal, **kwargs):
+    """Drop the cached application facts of the candidate's creator and e-mail owner, old and new"""
+    applicant_state.invalidate_for_candidate(instance, deleted=signal is post_delete)
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def invalidate_applicant_state_on_registration_change(sender, instance, **kwargs):
+    """Drop the cached application facts of the registered user"""
+    applicant_state.invalidate_for_registration(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache_on_change(sender, update_fields=None, **kwargs):
+    """Invalidate user totals when accounts are added, removed or change role (not on login)"""
+    if update_fields is not None and not {'is_staff', 'is_active', 'is_superuser'} & set(update_fields):
+        return
+    invalidate_user_cache()
+
+
+@receiver(post_save, sender=User)
+def invalidate_applicant_state_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """A changed e-mail address changes which candidates the user owns"""
+    if created or (update_fields is not None and 'email' not in update_fields):
+        return
+    applicant_state.invalidate([instance.pk])
+    invalidate_user_cache(instance.pk)
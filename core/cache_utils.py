@@ -1,13 +1,84 @@
 """
 Cache utilities for AgroStudies system
 Provides smart caching strategies and cache invalidation
+
+Invalidation is generational: every cached entry belongs to one or more
+namespaces ('programs', 'candidates', 'program:<id>', 'user:<id>') and its key
+embeds the current generation number of each of them. Bumping a namespace is a
+single INCR; every entry cached under the old generation becomes unreachable
+and simply ages out, so nothing has to enumerate or delete keys.
+
+Hot read paths use `get_or_compute`, a two-tier cache: a bounded per-process
+LRU in front of the shared cache, with single-flight recomputation,
+probabilistic early refresh and stale-while-revalidate. Settings (all
+optional)::
+
+    HOT_CACHE = {
+        'LOCAL_MAX_ENTRIES': 256,  # per-process LRU size (0 disables the local tier)
+        'LOCAL_TTL': 5,            # seconds a process serves an entry without asking the shared cache
+        'STALE_TTL': 300,          # seconds an expired entry may still be served while one worker refreshes it
+        'LOCK_TIMEOUT': 30,        # seconds before an abandoned recompute lock is released
+        'LOCK_WAIT': 2.0,          # seconds a cold miss waits for another worker's result
+        'BETA': 1.0,               # early-refresh eagerness (0 disables early refresh)
+    }
+
+Entries worth filling before the first request (after a deploy or a cache
+flush) register a warmer with `@warmable(name)`; `warm_cache()` runs them in
+parallel and reports the time each one took.
 """
 
-from django.core.cache import cache
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
 from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.middleware.csrf import CSRF_TOKEN_LENGTH, _unmask_cipher_token, get_token
+from django.utils.cache import cc_delim_re
+from .cache_metrics import cache, record_get
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import hashlib
 import json
+import logging
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+HOT_CACHE_DEFAULTS = {
+    'LOCAL_MAX_ENTRIES': 256,
+    'LOCAL_TTL': 5,
+    'STALE_TTL': 300,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 2.0,
+    'BETA': 1.0,
+}
+
+PROGRAMS = 'programs'
+CANDIDATES = 'candidates'
+USERS = 'users'
+UNIVERSITIES = 'universities'
+PAGES = 'pages'
+
+# Cached responses (`cache_view_result`)
+CSRF_PLACEHOLDER = '\x00csrf-token\x00'
+CSRF_TOKEN_RE = re.compile(r'(?<![a-zA-Z0-9])[a-zA-Z0-9]{%d}(?![a-zA-Z0-9])' % CSRF_TOKEN_LENGTH)
+UNSHARED_HEADERS = {'set-cookie', 'etag', 'last-modified', 'content-length'}
+
+# Registered warmers: name -> function filling the entry (see `warmable`)
+_warmers = {}
 
 
 def get_cache_timeout(cache_type='default'):
@@ -22,65 +93,487 @@ def make_cache_key(*args, **kwargs):
     return hashlib.md5(key_string.encode()).hexdigest()
 
 
-def cache_view_result(cache_type='default', timeout=None, key_prefix='view'):
+# -------- Namespace generations ---------
+
+def program_namespace(program_id):
+    return f'program:{program_id}'
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+def notifications_namespace(user_id):
+    return f'notifications:{user_id}'
+
+
+def generation_key(namespace):
+    return f'ns:{namespace}:gen'
+
+
+def changed_at_key(namespace):
+    return f'ns:{namespace}:at'
+
+
+def _seed_generation():
+    # Start from the clock rather than 1, so a generation key that was evicted
+    # never comes back with a number that old entries were stored under
+    return time.time_ns() // 1000
+
+
+def get_generations(namespaces):
+    """
+    Current generation of each namespace, read with one get_many.
+
+    Missing counters are created (add() keeps a concurrent writer's value).
+
+    Returns:
+        dict: {namespace: generation}
+    """
+    keys = {generation_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        cache.add(key, _seed_generation(), timeout=None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return {namespace: found.get(key, 0) for key, namespace in keys.items()}
+
+
+def namespaced_key(namespaces, *parts):
+    """
+    Build a cache key that is only reachable while none of `namespaces` is bumped.
+
+    Usage: namespaced_key((PROGRAMS, program_namespace(5)), 'program_detail', 5)
+    """
+    if isinstance(namespaces, str):
+        namespaces = (namespaces,)
+    generations = get_generations(namespaces)
+    stamp = ':'.join(f'{namespace}@{generations[namespace]}' for namespace in namespaces)
+    return ':'.join(str(part) for part in (*parts, stamp))
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every entry cached under `namespaces`.
+
+    The bump is repeated when the surrounding transaction commits, so a request
+    that read the old rows in between cannot leave them cached under the new
+    generation.
+    """
+    namespaces = [namespace for namespace in namespaces if namespace]
+    if not namespaces:
+        return
+
+    def bump():
+        for namespace in namespaces:
+            key = generation_key(namespace)
+            try:
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # Counter evicted or never created: any fresh seed is newer
+                    cache.set(key, _seed_generation(), timeout=None)
+            except Exception as e:
+                logger.warning(f"Cache generation bump failed for {namespace}: {e}")
+        try:
+            now = time.time()
+            cache.set_many({changed_at_key(namespace): now for namespace in namespaces}, timeout=None)
+        except Exception as e:
+            logger.warning(f"Cache change time update failed: {e}")
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_changed_at(namespaces):
+    """
+    Unix time of the latest bump of any of `namespaces` (for Last-Modified).
+
+    Returns None when one of them has no recorded bump, since its last change
+    is then unknown.
     """
-    Decorator to cache view results
-    Usage: @cache_view_result('programs', timeout=600)
+    keys = [changed_at_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        return None
+    return max(found.values())
+
+
+# -------- Two-tier cache ---------
+
+def get_hot_cache_config():
+    """Return the HOT_CACHE settings merged over the defaults."""
+    return {**HOT_CACHE_DEFAULTS, **getattr(settings, 'HOT_CACHE', {})}
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded in-process cache of (value, local expiry) pairs."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LocalLRU(get_hot_cache_config()['LOCAL_MAX_ENTRIES'])
+
+
+class SingleFlightLock:
+    """
+    Non-blocking lock held by the one worker recomputing `key`.
+
+    Redis (django-redis) uses its native lock; LocMemCache is per process, so
+    workers on one host coordinate through a file lock instead. Other backends
+    (and Windows) fall back to cache.add().
+    """
+
+    def __init__(self, key, timeout):
+        self.key = f'lock:{key}'
+        self.timeout = timeout
+        self._lock = None
+        self._file = None
+
+    def acquire(self):
+        try:
+            backend = caches['default']
+            if hasattr(backend, 'lock'):
+                self._lock = backend.lock(self.key, timeout=self.timeout)
+                return self._lock.acquire(blocking=False)
+            if isinstance(backend, LocMemCache) and fcntl is not None:
+                return self._acquire_file()
+            return cache.add(self.key, os.getpid(), timeout=self.timeout)
+        except Exception as e:
+            # Better one extra recompute than none at all
+            logger.warning(f"Cache lock failed for {self.key}: {e}")
+            return True
+
+    def _acquire_file(self):
+        directory = os.path.join(tempfile.gettempdir(), 'agrostudies-cache-locks')
+        os.makedirs(directory, exist_ok=True)
+        name = hashlib.md5(self.key.encode()).hexdigest()
+        self._file = open(os.path.join(directory, f'{name}.lock'), 'a')
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+
+    def release(self):
+        try:
+            if self._lock is not None:
+                self._lock.release()
+            elif self._file is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+                self._file.close()
+            else:
+                cache.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Cache lock release failed for {self.key}: {e}")
+        finally:
+            self._lock = self._file = None
+
+
+def _needs_refresh(entry, now, beta):
+    """
+    Probabilistic early expiration (XFetch): the closer an entry is to expiry
+    and the longer it took to compute, the likelier a reader refreshes it now,
+    so expiries under load are spread out instead of all landing together.
+    """
+    early = entry['delta'] * beta * -math.log(1.0 - random.random()) if beta else 0
+    return now + early >= entry['expires']
+
+
+def _read_shared(key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+def _compute_and_store(key, compute, timeout, config):
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    entry = {'value': value, 'expires': finished + timeout, 'delta': finished - started}
+    try:
+        cache.set(key, entry, timeout=timeout + config['STALE_TTL'])
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+    local_cache.set(key, entry, min(entry['expires'], finished + config['LOCAL_TTL']))
+    return value
+
+
+def get_or_compute(key, compute, timeout=None, cache_type='default', namespaces=()):
+    """
+    Return the cached value of `key`, computing it at most once across workers.
+
+    Lookup order: per-process LRU, then the shared cache. An entry that is due
+    (or, randomly, nearly due) for refresh is recomputed by the one worker that
+    wins the single-flight lock; everyone else keeps serving the stale value
+    until it lands. A cold miss waits up to LOCK_WAIT for the lock holder's
+    result before computing it independently.
+
+    Args:
+        key: Cache key (made namespaced when `namespaces` is given)
+        compute: Zero-argument callable producing a JSON-serialisable value
+        timeout: Freshness in seconds (defaults to CACHE_TTL[cache_type])
+        cache_type: CACHE_TTL entry used when `timeout` is not given
+        namespaces: Namespaces whose bump invalidates the value
+    """
+    config = get_hot_cache_config()
+    timeout = timeout or get_cache_timeout(cache_type)
+    if namespaces:
+        try:
+            key = namespaced_key(namespaces, key)
+        except Exception as e:
+            logger.warning(f"Cache generation lookup failed for {key}: {e}")
+            return compute()
+
+    now = time.time()
+    entry = local_cache.get(key, now)
+    record_get(key, int(entry is not None), int(entry is None), tier='local')
+    if entry is None or _needs_refresh(entry, now, config['BETA']):
+        shared = _read_shared(key)
+        if shared is not None:
+            entry = shared
+            local_cache.set(key, entry, min(entry['expires'], now + config['LOCAL_TTL']))
+    if entry is not None and not _needs_refresh(entry, now, config['BETA']):
+        return entry['value']
+
+    lock = SingleFlightLock(key, config['LOCK_TIMEOUT'])
+    if lock.acquire():
+        try:
+            return _compute_and_store(key, compute, timeout, config)
+        finally:
+            lock.release()
+
+    if entry is not None:
+        # Stale-while-revalidate: another worker is already refreshing it
+        return entry['value']
+
+    deadline = now + config['LOCK_WAIT']
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = _read_shared(key)
+        if entry is not None:
+            return entry['value']
+    logger.warning(f"Gave up waiting for {key} to be computed by another worker")
+    return compute()
+
+
+def request_audience(request):
+    """'guest', 'user' or 'staff': who a response may be shared with"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'guest'
+    return 'staff' if user.is_staff else 'user'
+
+
+def _url_hash(request):
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+
+def _vary_headers(response):
+    """Request headers the response varies on, or None if it cannot be shared"""
+    if not response.has_header('Vary'):
+        return []
+    headers = sorted({header.strip().lower() for header in cc_delim_re.split(response['Vary']) if header.strip()})
+    if '*' in headers:
+        return None
+    # Cookies vary per visitor by definition; the audience stands in for them
+    return [header for header in headers if header != 'cookie']
+
+
+def _response_key(prefix, request, headers):
+    values = [request.META.get('HTTP_' + header.upper().replace('-', '_'), '') for header in headers]
+    return f"{prefix}:{make_cache_key(_url_hash(request), *values)}"
+
+
+def _freeze_response(request, response):
+    """JSON/msgpack-safe copy of `response` without cookies, its CSRF tokens replaced by a placeholder"""
+    content = response.content.decode(response.charset)
+    secret = request.META.get('CSRF_COOKIE')
+    if secret:
+        # Each {% csrf_token %} is a masked copy of the visitor's secret
+        content = CSRF_TOKEN_RE.sub(
+            lambda match: CSRF_PLACEHOLDER if _unmask_cipher_token(match.group()) == secret else match.group(),
+            content,
+        )
+    return {
+        'status': response.status_code,
+        'headers': [[name, value] for name, value in response.items() if name.lower() not in UNSHARED_HEADERS],
+        'content': content,
+    }
+
+
+def _thaw_response(request, frozen):
+    content = frozen['content']
+    if CSRF_PLACEHOLDER in content:
+        # A fresh token for this visitor (also makes CsrfViewMiddleware set their cookie)
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, status=frozen['status'])
+    for name, value in frozen['headers']:
+        response[name] = value
+    return response
+
+
+def _is_shareable(request, response):
+    if request.method != 'GET' or response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies or 'private' in response.get('Cache-Control', '') or 'no-store' in response.get('Cache-Control', ''):
+        return False
+    session = getattr(request, 'session', None)
+    return not (session is not None and session.modified)
+
+
+def cache_view_result(cache_type='default', timeout=None, key_prefix='view', namespaces=(), audiences=('guest',),
+                      key_func=None):
+    """
+    Decorator caching a view's responses per audience
+    Usage: @cache_view_result('programs', timeout=600, namespaces=(PROGRAMS, 'program:{pk}'))
+
+    Responses are shared by every visitor of one audience (see
+    `request_audience`), so only list audiences whose pages carry nothing
+    personal - with the username in the navbar, that means guests only. The
+    key covers the audience, the full URL and the request headers named in
+    the response's Vary header. Cookies are never stored, and CSRF tokens are
+    swapped for a fresh one of each visitor. GET 200 responses are stored
+    unless they set cookies, touch the session or say private/no-store; a
+    request with pending flash messages bypasses the cache.
+
+    `namespaces` may use the view's keyword arguments as format fields; the
+    cached responses are dropped whenever one of them (or PAGES) is bumped.
+    `key_func(request, **kwargs)` may add a value the response depends on
+    that no write bumps (e.g. the current date).
     """
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            # Skip caching for authenticated users with personalized data
-            if request.user.is_authenticated and not request.user.is_staff:
+            audience = request_audience(request)
+            if request.method not in ('GET', 'HEAD') or audience not in audiences or len(get_messages(request)):
                 return view_func(request, *args, **kwargs)
-            
-            # Create cache key
-            cache_key = f"{key_prefix}:{make_cache_key(request.path, request.GET.urlencode())}"
-            
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result:
-                return cached_result
-            
-            # Execute view and cache result
-            result = view_func(request, *args, **kwargs)
+
             cache_timeout = timeout or get_cache_timeout(cache_type)
-            cache.set(cache_key, result, timeout=cache_timeout)
-            
-            return result
+            try:
+                parts = [key_prefix, audience]
+                if key_func is not None:
+                    parts.append(key_func(request, **kwargs))
+                prefix = namespaced_key([PAGES] + [namespace.format(**kwargs) for namespace in namespaces], *parts)
+                headers = cache.get(f"{prefix}:vary:{_url_hash(request)}")
+                frozen = cache.get(_response_key(prefix, request, headers)) if headers is not None else None
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed for {request.path}: {e}")
+                return view_func(request, *args, **kwargs)
+            if frozen is not None:
+                return _thaw_response(request, frozen)
+
+            response = view_func(request, *args, **kwargs)
+
+            def store(response):
+                headers = _vary_headers(response)
+                if headers is None or not _is_shareable(request, response):
+                    return
+                try:
+                    cache.set(f"{prefix}:vary:{_url_hash(request)}", headers, timeout=cache_timeout)
+                    cache.set(_response_key(prefix, request, headers), _freeze_response(request, response), timeout=cache_timeout)
+                except Exception as e:
+                    logger.warning(f"Response cache store failed for {request.path}: {e}")
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
         return wrapper
     return decorator
 
 
-def invalidate_program_cache():
-    """Invalidate all program-related cache entries"""
-    cache_patterns = [
-        'programs_list',
-        'program_detail',
-        'program_stats'
-    ]
-    
-    # Directly delete known keys
-    for pattern in cache_patterns:
-        cache.delete(f"{pattern}:all")  # Delete main list key
-        cache.delete(f"{pattern}:stats")  # Delete stats key
-
-
-def invalidate_candidate_cache():
-    """Invalidate all candidate-related cache entries"""
-    cache_patterns = [
-        'candidate_list',
-        'candidate_detail',
-        'candidate_stats'
-    ]
-    
-    # Directly delete known keys
-    for pattern in cache_patterns:
-        cache.delete(f"{pattern}:all")  # Delete main list key
-        cache.delete(f"{pattern}:stats")  # Delete stats key
+def invalidate_page_cache():
+    """Drop every cached response (e.g. after a deploy changed the templates)"""
+    bump_generation(PAGES)
 
 
-def get_or_set_stats(cache_key, stats_function, timeout=None):
+def invalidate_program_cache(program_id=None):
+    """
+    Invalidate program-related cache entries
+
+    With `program_id` only entries cached under program_namespace(program_id)
+    go. Without it, entries cached under PROGRAMS go: a per-program entry is
+    included only if it lists PROGRAMS among its namespaces too, as
+    program_detail does. Bumping PROGRAMS never touches an entry cached under
+    'program:<id>' alone.
+    """
+    if program_id is None:
+        bump_generation(PROGRAMS)
+    else:
+        bump_generation(program_namespace(program_id))
+
+
+def invalidate_candidate_cache(program_id=None, user_id=None):
+    """Invalidate candidate lists and stats, plus the given program's and user's entries"""
+    bump_generation(
+        CANDIDATES,
+        program_namespace(program_id) if program_id is not None else None,
+        user_namespace(user_id) if user_id is not None else None,
+    )
+
+
+def invalidate_candidates_cache(program_ids=(), user_ids=()):
+    """invalidate_candidate_cache for many candidates at once (a single generation bump)"""
+    bump_generation(
+        CANDIDATES,
+        *(program_namespace(program_id) for program_id in set(program_ids) if program_id is not None),
+        *(user_namespace(user_id) for user_id in set(user_ids) if user_id is not None),
+    )
+
+
+def invalidate_user_cache(user_id=None):
+    """Invalidate entries cached for one user, or user lists and totals without `user_id`"""
+    bump_generation(USERS if user_id is None else user_namespace(user_id))
+
+
+def invalidate_university_cache():
+    """Invalidate the university choices shown by the forms"""
+    bump_generation(UNIVERSITIES)
+
+
+def get_or_set_stats(cache_key, stats_function, timeout=None, namespaces=()):
     """
     Get statistics from cache or compute and cache them
     
@@ -88,39 +581,70 @@ def get_or_set_stats(cache_key, stats_function, timeout=None):
         cache_key: Cache key for the stats
         stats_function: Function that computes the stats
         timeout: Cache timeout (defaults to stats timeout)
+        namespaces: Namespaces whose bump invalidates the stats
     """
-    cached_stats = cache.get(cache_key)
-    if cached_stats is not None:
-        return cached_stats
-    
-    # Compute stats
-    stats = stats_function()
-    
-    # Cache for 15 minutes by default
-    cache_timeout = timeout or get_cache_timeout('default')
-    cache.set(cache_key, stats, timeout=cache_timeout)
-    
-    return stats
+    # Single-flight, stale-while-revalidate recompute (see get_or_compute)
+    return get_or_compute(cache_key, stats_function, timeout=timeout, namespaces=namespaces)
 
 
-def warm_cache():
+def warmable(name):
+    """
+    Register a zero-argument function as the warmer of the cache entry `name`.
+
+    The function must fill the entry the same way the read path does (normally
+    by being the read path, i.e. calling `get_or_compute`), so its payload has
+    to be JSON-serialisable like anything else stored in the shared cache.
+    """
+    def decorator(func):
+        _warmers[name] = func
+        return func
+    return decorator
+
+
+def get_warmers():
+    """Registered warmers by name"""
+    # The modules owning the entries register their warmers on import
+    from . import forms, stats, views  # noqa: F401
+    return dict(_warmers)
+
+
+def _run_warmer(name, func):
+    started = time.perf_counter()
+    error = None
+    try:
+        func()
+    except Exception as e:
+        logger.warning(f"Cache warmer {name} failed: {e}")
+        error = str(e)
+    finally:
+        # Worker threads open their own database connections
+        connections.close_all()
+    return {'name': name, 'seconds': time.perf_counter() - started, 'error': error}
+
+
+def warm_cache(names=None, workers=4):
     """
     Warm up the cache with frequently accessed data
     Should be called after deployments or cache flushes
+
+    Args:
+        names: Warmers to run (defaults to every registered one)
+        workers: Number of warmers run concurrently
+
+    Returns:
+        list: One {'name', 'seconds', 'error'} dict per warmer, in registry order
     """
-    from .models import AgricultureProgram, Candidate
-    
-    # Warm up program list cache
-    programs = list(AgricultureProgram.objects.select_related().all().order_by('-start_date')[:20])
-    cache.set('programs_list:all', programs, timeout=get_cache_timeout('programs'))
-    
-    # Warm up basic stats
-    stats = {
-        'total_programs': AgricultureProgram.objects.count(),
-        'total_candidates': Candidate.objects.count(),
-        'active_programs': AgricultureProgram.objects.filter(start_date__gte=timezone.now().date()).count(),
-    }
-    cache.set('system_stats', stats, timeout=get_cache_timeout('default'))
+    warmers = get_warmers()
+    if names:
+        unknown = set(names) - set(warmers)
+        if unknown:
+            raise ValueError(f"Unknown cache warmer(s): {', '.join(sorted(unknown))}")
+        warmers = {name: func for name, func in warmers.items() if name in names}
+    if not warmers:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(warmers)))) as executor:
+        return list(executor.map(lambda item: _run_warmer(*item), warmers.items()))
 
 
 # Cache decorators for models
@@ -149,13 +673,7 @@ def smart_cache_key(request, *args, **kwargs):
     key_parts = []
     
     # Add user type
-    if request.user.is_authenticated:
-        if request.user.is_staff:
-            key_parts.append('staff')
-        else:
-            key_parts.append('user')
-    else:
-        key_parts.append('guest')
+    key_parts.append(request_audience(request))
     
     # Add request parameters
     key_parts.extend(args)
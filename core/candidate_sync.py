@@ -0,0 +1,167 @@
+"""
+Profile -> Candidate synchronisation.
+
+An applicant's candidate applications mirror their profile. Saving the
+profile form used to re-save every candidate two or three times: the view
+copied the identity fields and saved, `validate_application` saved again,
+and the Profile post_save handler saved once more to copy the documents.
+Each save re-ran the audit, counter, search index, blob reference, file
+tracking and cache invalidation signals.
+
+`sync_candidates_from_profile` replaces that loop. It reads the candidates
+once, assigns the profile values and re-evaluates the application in memory,
+then writes every changed candidate with a single `bulk_update`. The signal
+work is done once for the whole batch:
+
+- counters, blob references and the SQLite search index are adjusted with
+  their bulk helpers;
+- the per-candidate audit diffs are written with one bulk insert;
+- candidate caches and applicant states are invalidated once.
+
+File tracking is skipped: the synced documents are the profile's own,
+already registered when the profile was saved.
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import applicant_state, audit, counters, search, storage
+from .applicant_state import ownership_q
+from .cache_utils import invalidate_candidates_cache
+from .middleware import get_request_ip, get_request_session_key, get_request_user
+from .models import Candidate
+
+logger = logging.getLogger(__name__)
+
+# Candidate field -> User attribute
+USER_FIELDS = {
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email',
+}
+
+# Candidate fields copied as-is from the Profile field of the same name
+PROFILE_FIELDS = (
+    'middle_initial', 'phone_number', 'address', 'date_of_birth', 'gender',
+    'country_of_birth', 'nationality', 'religion', 'father_name', 'mother_name',
+    'passport_number', 'passport_issue_date', 'passport_expiry_date', 'place_of_issue',
+    'university', 'highest_education_level', 'field_of_study', 'graduation_year',
+    'specialization', 'secondary_specialization', 'year_graduated', 'shoes_size',
+    'shirt_size', 'health_condition', 'health_remarks', 'smokes',
+)
+
+NOT_NULL_FIELDS = frozenset(
+    field_name for field_name in PROFILE_FIELDS if not Candidate._meta.get_field(field_name).null
+)
+
+DOCUMENT_FIELDS = tuple(storage.BLOB_FIELDS['Candidate'])
+
+VALIDATION_FIELDS = ('status', 'missing_documents_note', 'document_deadline')
+
+
+def _value(candidate, field_name):
+    value = getattr(candidate, field_name)
+    # FieldFiles compare by name
+    return (value.name or None) if field_name in DOCUMENT_FIELDS else value
+
+
+def _sync_documents(candidate, profile, own_candidate):
+    """
+    Copy document names from the profile. The applicant's own candidates follow the
+    profile exactly (removals included); candidates others created only get a new photo.
+    """
+    fields = DOCUMENT_FIELDS if own_candidate else ('profile_image',)
+    for field_name in fields:
+        name = getattr(profile, field_name).name or None
+        if name or own_candidate:
+            # Assign the name, not the FieldFile: that would be rebound to this candidate
+            setattr(candidate, field_name, name)
+
+
+def sync_candidates_from_profile(profile, documents_only=False):
+    """
+    Bring the candidates of `profile.user` in line with the profile.
+
+    Args:
+        profile: The saved Profile
+        documents_only: Copy documents to the candidates the user created, without
+            the identity fields or re-validation (the Profile post_save path)
+
+    Returns:
+        list: The candidates that changed
+    """
+    user = profile.user
+    if documents_only:
+        candidates = Candidate.objects.filter(created_by_id=user.pk)
+    else:
+        candidates = Candidate.objects.filter(ownership_q(user)).select_related('program')
+    candidates = list(candidates)
+    if not candidates:
+        return []
+
+    changed = []
+    changed_fields = set()
+    for candidate in candidates:
+        tracked = DOCUMENT_FIELDS if documents_only else (
+            tuple(USER_FIELDS) + PROFILE_FIELDS + DOCUMENT_FIELDS + VALIDATION_FIELDS
+        )
+        before = {field_name: _value(candidate, field_name) for field_name in tracked}
+        own_candidate = candidate.created_by_id == user.pk
+        if not documents_only:
+            for field_name, attr in USER_FIELDS.items():
+                setattr(candidate, field_name, getattr(user, attr))
+            for field_name in PROFILE_FIELDS:
+                value = getattr(profile, field_name)
+                if value is None and field_name in NOT_NULL_FIELDS:
+                    # Not filled in on the profile yet: keep what the candidate has
+                    continue
+                setattr(candidate, field_name, value)
+        _sync_documents(candidate, profile, own_candidate)
+        if not documents_only:
+            # Trigger automatic validation and potential approval
+            candidate.evaluate_application()
+        fields = {field_name for field_name in tracked if _value(candidate, field_name) != before[field_name]}
+        if fields:
+            candidate._synced_fields = fields
+            changed.append(candidate)
+            changed_fields |= fields
+    if not changed:
+        return []
+
+    now = timezone.now()
+    for candidate in changed:
+        candidate.updated_at = now
+    update_fields = sorted(changed_fields) + ['updated_at']
+    with transaction.atomic():
+        Candidate.objects.bulk_update(changed, update_fields)
+        # What the Candidate post_save handlers would have done, once for the batch
+        counters.record_bulk_update(changed)
+        storage.record_bulk_save(changed)
+        if changed_fields & set(search.SEARCH_SPECS['candidate'][1]):
+            search.index_instances(changed)
+    _record_audit(changed)
+    invalidate_candidates_cache(
+        program_ids=[candidate.program_id for candidate in changed],
+        user_ids=[candidate.created_by_id for candidate in changed],
+    )
+    applicant_state.invalidate_for_candidates(changed)
+    logger.info(f"Synced profile {profile.pk} to {len(changed)} candidate(s)")
+    return changed
+
+
+def _record_audit(candidates):
+    """One UPDATE diff per candidate, written with a single bulk insert."""
+    user = get_request_user()
+    if user and not user.is_authenticated:
+        user = None
+    try:
+        audit.record_updates(
+            [(candidate, candidate._synced_fields | {'updated_at'}) for candidate in candidates],
+            user=user,
+            ip_address=get_request_ip(),
+            session_key=get_request_session_key(),
+        )
+    except Exception:
+        logger.exception('Failed to write ActivityLog for synced candidates')
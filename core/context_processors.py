@@ -1,12 +1,20 @@
-from .models import Notification
+from . import notification_counts
+from .cache_utils import get_cache_timeout
 
 def notification_count(request):
     """Context processor to add unread notification count"""
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(user=request.user, read=False).count()
+        unread_count = notification_counts.get_count(request.user.pk)
         return {
             'unread_notifications_count': unread_count
         }
     return {
         'unread_notifications_count': 0
-    } 
\ No newline at end of file
+    }
+
+
+def fragment_cache(request):
+    """Timeout for {% cache fragment_ttl ... %} blocks (program cards, candidate rows)"""
+    return {
+        'fragment_ttl': get_cache_timeout('fragments')
+    }
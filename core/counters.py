@@ -0,0 +1,301 @@
+"""
+Incrementally maintained statistics counters for AgroStudies.
+
+Each tracked model maps to an entity name and a function that derives the
+counter status (and optionally a monthly period) from an instance's field
+values. The signal handlers in core/signals.py call `track_instance_state`,
+`record_save` and `record_delete`; the UPDATEs run on the same connection as
+the triggering save, so they commit or roll back together with it.
+
+Bulk operations that bypass signals (queryset.update(), raw SQL) can make the
+counters drift; `rebuild_counters` (exposed as `manage.py rebuild_stats`)
+recomputes them in primary-key chunks and reconciles the stored rows.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_STATE_ATTR = '_stats_counter_key'
+
+
+def _user_status(values):
+    role = 'staff' if values['is_staff'] else 'member'
+    state = 'active' if values['is_active'] else 'inactive'
+    return f"{role}:{state}"
+
+
+def _program_status(values):
+    return 'featured' if values['is_featured'] else 'standard'
+
+
+# entity -> (model label, fields the status depends on, status function, period field)
+COUNTER_SPECS = {
+    'user': ('auth.User', ('is_staff', 'is_active'), _user_status, None),
+    'program': ('core.AgricultureProgram', ('is_featured',), _program_status, None),
+    'registration': ('core.Registration', ('status',), lambda values: values['status'], None),
+    'candidate': ('core.Candidate', ('status',), lambda values: values['status'], 'created_at'),
+    'activitylog': ('core.ActivityLog', ('action_type',), lambda values: values['action_type'], 'timestamp'),
+}
+
+_ENTITY_BY_LABEL = {spec[0]: entity for entity, spec in COUNTER_SPECS.items()}
+
+
+def entity_for(instance):
+    """Return the counter entity name for a model instance, or None if untracked."""
+    label = f"{instance._meta.app_label}.{instance.__class__.__name__}"
+    return _ENTITY_BY_LABEL.get(label)
+
+
+def format_period(value):
+    """Format a datetime as the 'YYYY-MM' period bucket used by counters."""
+    if value is None:
+        return ''
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def counter_key(entity, instance):
+    """
+    Compute the (status, period) counter key for an instance.
+
+    Reads loaded values from instance.__dict__ only, so deferred fields never
+    trigger a query. Returns None if a needed field is not loaded.
+    """
+    _label, fields, status_func, period_field = COUNTER_SPECS[entity]
+    loaded = instance.__dict__
+    needed = fields + ((period_field,) if period_field else ())
+    if any(name not in loaded for name in needed):
+        return None
+    status = status_func({name: loaded[name] for name in fields})
+    period = format_period(loaded[period_field]) if period_field else ''
+    return status, period
+
+
+def track_instance_state(instance):
+    """Remember the counter key of an instance as loaded (called from post_init)."""
+    entity = entity_for(instance)
+    if entity is None:
+        return
+    key = counter_key(entity, instance) if instance.pk is not None else None
+    instance.__dict__[_STATE_ATTR] = key
+
+
+def bump(entity, status, period='', delta=1):
+    """Atomically add `delta` to a single counter row, creating it if needed."""
+    from .models import StatsCounter
+
+    if not delta:
+        return
+    lookup = {'entity': entity, 'status': status, 'period': period}
+    updated = StatsCounter.objects.filter(**lookup).update(count=F('count') + delta)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            StatsCounter.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the row between our UPDATE and INSERT
+        StatsCounter.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def record_save(instance, created):
+    """Adjust counters after an instance was saved."""
+    entity = entity_for(instance)
+    if entity is None:
+        return
+    new_key = counter_key(entity, instance)
+    old_key = instance.__dict__.get(_STATE_ATTR)
+    if created:
+        if new_key is not None:
+            bump(entity, *new_key, delta=1)
+    elif old_key is not None and new_key is not None and old_key != new_key:
+        bump(entity, *old_key, delta=-1)
+        bump(entity, *new_key, delta=1)
+    instance.__dict__[_STATE_ATTR] = new_key
+
+
+def record_delete(instance):
+    """Adjust counters after an instance was deleted."""
+    entity = entity_for(instance)
+    if entity is None:
+        return
+    key = instance.__dict__.get(_STATE_ATTR) or counter_key(entity, instance)
+    if key is not None:
+        bump(entity, *key, delta=-1)
+    instance.__dict__[_STATE_ATTR] = None
+
+
+def _bulk_bump(instances, sign):
+    deltas = defaultdict(int)
+    for instance in instances:
+        entity = entity_for(instance)
+        if entity is None:
+            continue
+        key = counter_key(entity, instance)
+        if key is not None:
+            deltas[(entity,) + key] += sign
+        instance.__dict__[_STATE_ATTR] = key if sign > 0 else None
+    for (entity, status, period), delta in deltas.items():
+        bump(entity, status, period, delta=delta)
+
+
+def record_bulk_create(instances):
+    """Adjust counters for instances inserted with bulk_create (which sends no signals)."""
+    _bulk_bump(instances, 1)
+
+
+def record_bulk_delete(instances):
+    """Adjust counters for instances removed by a raw delete (which sends no signals)."""
+    _bulk_bump(instances, -1)
+
+
+def record_bulk_update(instances):
+    """Adjust counters for instances written with bulk_update: one bump per changed counter row."""
+    deltas = defaultdict(int)
+    for instance in instances:
+        entity = entity_for(instance)
+        if entity is None:
+            continue
+        new_key = counter_key(entity, instance)
+        old_key = instance.__dict__.get(_STATE_ATTR)
+        if old_key is not None and new_key is not None and old_key != new_key:
+            deltas[(entity,) + old_key] -= 1
+            deltas[(entity,) + new_key] += 1
+        instance.__dict__[_STATE_ATTR] = new_key
+    for (entity, status, period), delta in deltas.items():
+        bump(entity, status, period, delta=delta)
+
+
+# -------- Reads ---------
+
+def get_counter_rows(entities):
+    """
+    Load every counter row for the given entities with a single query.
+
+    Returns:
+        dict: {entity: {(status, period): count}}
+    """
+    from .models import StatsCounter
+
+    rows = {entity: {} for entity in entities}
+    for entity, status, period, count in StatsCounter.objects.filter(
+        entity__in=list(entities)
+    ).values_list('entity', 'status', 'period', 'count'):
+        rows[entity][(status, period)] = count
+    return rows
+
+
+def totals_by_status(entity_rows):
+    """Collapse {(status, period): count} rows into {status: count}."""
+    totals = defaultdict(int)
+    for (status, _period), count in entity_rows.items():
+        totals[status] += count
+    return dict(totals)
+
+
+def get_status_counts(entity):
+    """Return {status: count} for one entity."""
+    return totals_by_status(get_counter_rows([entity])[entity])
+
+
+def user_counts():
+    """Total/active/inactive/staff user counts from the 'user' counters."""
+    totals = get_status_counts('user')
+    counts = {'total': 0, 'active': 0, 'inactive': 0, 'staff': 0}
+    for status, count in totals.items():
+        role, state = status.split(':', 1)
+        counts['total'] += count
+        counts[state] += count
+        if role == 'staff':
+            counts['staff'] += count
+    return counts
+
+
+# -------- Rebuild / reconciliation ---------
+
+def _compute_entity_counts(model, entity, chunk_size):
+    """Recompute {(status, period): count} for one entity, scanning pk ranges in chunks."""
+    _label, fields, status_func, period_field = COUNTER_SPECS[entity]
+    counts = defaultdict(int)
+
+    bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return counts
+
+    group_by = list(fields)
+    annotations = {}
+    if period_field:
+        annotations = {'_year': ExtractYear(period_field), '_month': ExtractMonth(period_field)}
+        group_by += ['_year', '_month']
+
+    start = bounds['low']
+    while start <= bounds['high']:
+        end = start + chunk_size
+        rows = model.objects.filter(pk__gte=start, pk__lt=end).annotate(**annotations).values(
+            *group_by
+        ).annotate(_count=Count('pk')).order_by()
+        for row in rows:
+            period = f"{row['_year']:04d}-{row['_month']:02d}" if period_field else ''
+            counts[(status_func(row), period)] += row['_count']
+        start = end
+    return counts
+
+
+def rebuild_counters(entities=None, chunk_size=5000, dry_run=False, get_model=None):
+    """
+    Recompute counters from the source tables and reconcile stored rows.
+
+    Args:
+        entities: Iterable of entity names (defaults to all tracked entities)
+        chunk_size: Number of primary keys aggregated per query
+        dry_run: Report drift without writing
+        get_model: Model resolver (defaults to django.apps.apps.get_model; migrations pass
+                   their historical registry)
+
+    Returns:
+        dict: {entity: {'rows': n, 'drift': [(status, period, stored, actual), ...]}}
+    """
+    if get_model is None:
+        from django.apps import apps
+        get_model = apps.get_model
+    StatsCounter = get_model('core', 'StatsCounter')
+
+    report = {}
+    for entity in entities or COUNTER_SPECS:
+        label = COUNTER_SPECS[entity][0]
+        model = get_model(*label.split('.'))
+        actual = _compute_entity_counts(model, entity, chunk_size)
+
+        with transaction.atomic():
+            stored = {
+                (row.status, row.period): row
+                for row in StatsCounter.objects.select_for_update().filter(entity=entity)
+            }
+            drift = []
+            for key in set(stored) | set(actual):
+                stored_count = stored[key].count if key in stored else 0
+                if stored_count != actual.get(key, 0):
+                    drift.append((key[0], key[1], stored_count, actual.get(key, 0)))
+
+            if not dry_run:
+                for status, period, _stored, count in drift:
+                    if (status, period) in stored:
+                        if count:
+                            StatsCounter.objects.filter(pk=stored[(status, period)].pk).update(count=count)
+                        else:
+                            StatsCounter.objects.filter(pk=stored[(status, period)].pk).delete()
+                    else:
+                        StatsCounter.objects.create(entity=entity, status=status, period=period, count=count)
+
+        if drift:
+            logger.info("Stats counters for %s drifted on %d row(s)", entity, len(drift))
+        report[entity] = {'rows': len(actual), 'drift': sorted(drift)}
+    return report
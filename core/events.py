@@ -0,0 +1,268 @@
+"""
+Server-sent events for notifications and application status.
+
+Pages used to poll /api/notifications/ every 60 seconds and
+/api/user-applications/ every 30 seconds per open tab. Instead, producers call
+`publish(user_ids, event, data)` and every open /events/stream/ connection of
+those users (core.views.event_stream, served under ASGI) receives the event:
+
+* 'notification'  - from Notification.add_notification / notify_many
+* 'application'   - from the registration and candidate status views
+* 'resync'        - sent when a slow connection fell behind; the page refetches
+
+Delivery goes through a broker chosen by settings::
+
+    EVENTS = {
+        'BACKEND': 'local',        # 'local' (this process only) or 'redis' (all workers)
+        'REDIS_URL': '',           # pub/sub connection for the 'redis' backend
+        'HEARTBEAT': 15,           # seconds between keep-alive comments
+        'STREAM_LIFETIME': 300,    # seconds before the server ends a stream (the browser reconnects)
+        'QUEUE_SIZE': 100,         # undelivered events held per connection
+        'RETRY_MS': 5000,          # reconnect delay sent to the browser
+    }
+
+With 'redis' every process runs one listener thread subscribed to a single
+channel and hands messages to its local subscribers. Events are published
+after the surrounding transaction commits, so rolled back changes are never
+announced.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'local',
+    'REDIS_URL': '',
+    'HEARTBEAT': 15,
+    'STREAM_LIFETIME': 300,
+    'QUEUE_SIZE': 100,
+    'RETRY_MS': 5000,
+}
+
+CHANNEL = 'agrostudies:events'
+
+NOTIFICATION = 'notification'
+APPLICATION = 'application'
+RESYNC = 'resync'
+
+_subscribers = defaultdict(set)
+_subscribers_lock = threading.Lock()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_config():
+    """Return the EVENTS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'EVENTS', {})}
+
+
+# -------- Subscribers ---------
+
+class Subscription:
+    """One open stream: an asyncio queue bound to the event loop that serves it."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        """Queue `message` from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The loop has shut down; close() will follow
+            pass
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Drop the backlog and let the page refetch what it missed
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'user_id': self.user_id, 'event': RESYNC, 'data': {}})
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        with _subscribers_lock:
+            subscriptions = _subscribers.get(self.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(self)
+                if not subscriptions:
+                    del _subscribers[self.user_id]
+
+
+def subscribe(user_id):
+    """Register a stream for `user_id`; must be called from the serving event loop."""
+    subscription = Subscription(user_id, get_config()['QUEUE_SIZE'])
+    with _subscribers_lock:
+        _subscribers[user_id].add(subscription)
+    get_backend().start()
+    return subscription
+
+
+def has_subscribers(user_id):
+    return bool(_subscribers.get(user_id))
+
+
+def dispatch(message):
+    """Hand a message to this process's subscribers of its user."""
+    with _subscribers_lock:
+        subscriptions = list(_subscribers.get(message['user_id'], ()))
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+# -------- Backends ---------
+
+class LocalBackend:
+    """Deliver within this process only."""
+
+    listens_everywhere = False
+
+    def start(self):
+        pass
+
+    def send(self, message):
+        dispatch(message)
+
+
+class RedisBackend:
+    """Deliver through Redis pub/sub so streams on any worker receive the event."""
+
+    listens_everywhere = True
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events-listener', daemon=True)
+                self._listener.start()
+
+    def send(self, message):
+        self.client.publish(CHANNEL, json.dumps(message, cls=DjangoJSONEncoder))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for item in pubsub.listen():
+                    if item.get('type') == 'message':
+                        dispatch(json.loads(item['data']))
+            except Exception as e:
+                logger.warning(f"Event listener lost its Redis connection: {e}")
+                time.sleep(1)
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            config = get_config()
+            if config['BACKEND'] == 'redis' and redis is not None and config['REDIS_URL']:
+                _backend = RedisBackend(config['REDIS_URL'])
+            else:
+                if config['BACKEND'] == 'redis':
+                    logger.warning("EVENTS backend 'redis' is not usable here; events stay in-process")
+                _backend = LocalBackend()
+        return _backend
+
+
+# -------- Publishing ---------
+
+def publish(user_ids, event, data=None):
+    """
+    Send `event` to every open stream of `user_ids` once the transaction commits.
+
+    Args:
+        user_ids: A user id or an iterable of them
+        event: Event name (NOTIFICATION, APPLICATION, ...)
+        data: JSON-serialisable payload, or a callable taking the user id that
+              builds it at send time (e.g. to include the committed unread count)
+    """
+    if isinstance(user_ids, int):
+        user_ids = [user_ids]
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def send():
+        backend = get_backend()
+        for user_id in user_ids:
+            if not backend.listens_everywhere and not has_subscribers(user_id):
+                continue
+            try:
+                payload = data(user_id) if callable(data) else data
+                backend.send({'user_id': user_id, 'event': event, 'data': payload or {}})
+            except Exception as e:
+                logger.warning(f"Publishing {event} event failed for user {user_id}: {e}")
+
+    transaction.on_commit(send)
+
+
+def notification_payload(notification):
+    """Builder for NOTIFICATION events, evaluated after commit."""
+    def build(user_id):
+        from . import notification_counts
+
+        return {
+            'id': notification.pk,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'link': notification.link,
+            'unread_count': notification_counts.get_count(user_id),
+        }
+    return build
+
+
+# -------- Streaming ---------
+
+def format_event(message):
+    data = json.dumps(message['data'], cls=DjangoJSONEncoder)
+    return f"event: {message['event']}\ndata: {data}\n\n"
+
+
+async def stream(subscription):
+    """
+    Async iterator of SSE frames for one subscription.
+
+    Ends after STREAM_LIFETIME so sessions are re-checked on reconnect; the
+    subscription is released however the stream stops (including disconnects).
+    """
+    config = get_config()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config['STREAM_LIFETIME']
+    try:
+        yield f"retry: {config['RETRY_MS']}\n\n"
+        while loop.time() < deadline:
+            try:
+                message = await subscription.get(min(config['HEARTBEAT'], max(deadline - loop.time(), 0)))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_event(message)
+    finally:
+        subscription.close()
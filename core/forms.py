@@ -14,12 +14,76 @@ from django.utils import timezone
 
 from .models import Profile, Registration, Candidate, University, UploadedFile
 
+from .cache_rows import RowSet
+
+from .cache_utils import UNIVERSITIES, get_or_compute, warmable
+
+from .uploads import MAX_DOCUMENT_SIZE, MAX_IMAGE_SIZE
+
 import os
 
 
 
 
 
+@warmable('universities')
+
+def university_names():
+
+    """Names of all universities (the value of every university picker), through the hot cache"""
+
+    rows = get_or_compute(
+
+        'universities:rows',
+
+        lambda: RowSet.from_queryset(University.objects.order_by('name'), 'name'),
+
+        cache_type='static_content',
+
+        namespaces=(UNIVERSITIES,),
+
+    )
+
+    return rows.column('name')
+
+
+
+
+
+class UniversityChoiceIterator(forms.models.ModelChoiceIterator):
+
+    """Options from the cached university names instead of a query per rendered form"""
+
+    def __iter__(self):
+
+        if self.field.empty_label is not None:
+
+            yield ('', self.field.empty_label)
+
+        for name in university_names():
+
+            yield (name, name)
+
+
+
+    def __len__(self):
+
+        return len(university_names()) + (self.field.empty_label is not None)
+
+
+
+
+
+class UniversityChoiceField(forms.ModelChoiceField):
+
+    """University picker keyed by name; submitted values are still validated against the table"""
+
+    iterator = UniversityChoiceIterator
+
+
+
+
+
 class UserRegisterForm(UserCreationForm):
 
     email = forms.EmailField()
@@ -176,7 +240,7 @@ class UserUpdateForm(forms.ModelForm):
 
 class ProfileUpdateForm(forms.ModelForm):
 
-    university = forms.ModelChoiceField(
+    university = UniversityChoiceField(
 
         queryset=University.objects.all(),
 
@@ -436,7 +500,7 @@ class ProfileUpdateForm(forms.ModelForm):
 
             # Check file size (max 2MB)
 
-            if profile_image.size > 2 * 1024 * 1024:
+            if profile_image.size > MAX_IMAGE_SIZE:
 
                 raise ValidationError("Image size should not exceed 2MB")
 
@@ -812,7 +876,7 @@ def validate_file_size(value):
 
         
 
-    if filesize > 5 * 1024 * 1024:  # 5MB
+    if filesize > MAX_DOCUMENT_SIZE:
 
         raise ValidationError("The maximum file size that can be uploaded is 5MB")
 
@@ -1062,7 +1126,7 @@ class CandidateForm(forms.ModelForm):
 
     """Form for adding/editing candidate information."""
 
-    university = forms.ModelChoiceField(
+    university = UniversityChoiceField(
 
         queryset=University.objects.all(),
 
@@ -1718,7 +1782,7 @@ class ComprehensiveRegisterForm(UserCreationForm):
 
     
 
-    university = forms.ModelChoiceField(
+    university = UniversityChoiceField(
 
         queryset=University.objects.all(),
 
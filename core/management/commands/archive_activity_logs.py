@@ -0,0 +1,58 @@
+"""
+Management command to move old activity logs into compressed monthly archives
+Usage: python manage.py archive_activity_logs [--days 365] [--chunk-size 1000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from core.activity_archive import archive_logs, get_archive_dir
+
+
+class Command(BaseCommand):
+    help = 'Archive activity logs older than the retention window to backups/ and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help="Retention window in days (defaults to AUDIT_LOG['RETENTION_DAYS'])",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows archived and deleted per transaction',
+        )
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default=None,
+            help='Archive directory (defaults to backups/activity_logs)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the rows that would be archived without moving them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        result = archive_logs(
+            older_than_days=options['days'],
+            chunk_size=max(1, options['chunk_size']),
+            dry_run=dry_run,
+            archive_dir=options['output_dir'],
+        )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"{result['archived']} activity log(s) would be archived"))
+            return
+
+        for period, rows in sorted(result['files'].items()):
+            self.stdout.write(f"  activity-{period}.jsonl.gz: +{rows}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['archived']} activity log(s) to {options['output_dir'] or get_archive_dir()}"
+        ))
@@ -0,0 +1,61 @@
+"""
+Management command to report cache hits, misses, writes and latency per key namespace
+Usage: python manage.py cache_stats [--tier shared] [--json]
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+from core import cache_metrics
+
+
+class Command(BaseCommand):
+    help = 'Report cache hit/miss/latency metrics collected by the running workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tier',
+            choices=['shared', 'local'],
+            help='Only report this tier (shared cache or per-process LRU)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw metrics as JSON',
+        )
+
+    def handle(self, *args, **options):
+        collected = cache_metrics.collect()
+        tiers = collected['tiers']
+        if options['tier']:
+            tiers = {tier: namespaces for tier, namespaces in tiers.items() if tier == options['tier']}
+
+        if options['json']:
+            self.stdout.write(json.dumps({'processes': collected['processes'], 'tiers': tiers}, indent=2))
+            return
+
+        if not any(tiers.values()):
+            self.stdout.write(self.style.WARNING('No cache activity recorded yet'))
+            return
+
+        self.stdout.write(f"Metrics from {collected['processes']} process(es)")
+        header = f"{'namespace':<28} {'hits':>9} {'misses':>9} {'ratio':>7} {'sets':>8} {'KiB set':>9} {'avg get ms':>11}"
+        for tier, namespaces in sorted(tiers.items()):
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{tier} tier'))
+            self.stdout.write(header)
+            for namespace, stats in sorted(namespaces.items(), key=lambda item: -(item[1]['hits'] + item[1]['misses'])):
+                reads = stats['hits'] + stats['misses']
+                ratio = f"{stats['hits'] / reads:.1%}" if reads else '-'
+                timed_gets = sum(stats['get_latency'])
+                average = f"{stats['get_seconds'] / timed_gets * 1000:.2f}" if timed_gets else '-'
+                self.stdout.write(
+                    f"{namespace[:28]:<28} {stats['hits']:>9} {stats['misses']:>9} {ratio:>7} "
+                    f"{stats['sets']:>8} {stats['set_bytes'] / 1024:>9.1f} {average:>11}"
+                )
+
+        for tier, totals in cache_metrics.summary(tiers).items():
+            ratio = f"{totals['hit_ratio']:.1%}" if totals['hit_ratio'] is not None else '-'
+            self.stdout.write(self.style.SUCCESS(
+                f"{tier}: {totals['hits']} hits, {totals['misses']} misses ({ratio}), {totals['sets']} sets"
+            ))
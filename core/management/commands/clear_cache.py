@@ -4,8 +4,8 @@ Usage: python manage.py clear_cache
 """
 
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
-from core.cache_utils import invalidate_program_cache, invalidate_candidate_cache
+from django.core.cache import cache, caches
+from core.cache_utils import invalidate_program_cache, invalidate_candidate_cache, invalidate_page_cache
 
 
 class Command(BaseCommand):
@@ -14,7 +14,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
             '--type',
-            choices=['all', 'programs', 'candidates'],
+            choices=['all', 'programs', 'candidates', 'pages'],
             default='all',
             help='Type of cache to clear',
         )
@@ -25,6 +25,7 @@ class Command(BaseCommand):
         if cache_type == 'all':
             self.stdout.write('Clearing all cache...')
             cache.clear()
+            caches['template_fragments'].clear()
             self.stdout.write(
                 self.style.SUCCESS('Successfully cleared all cache')
             )
@@ -40,3 +41,9 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.SUCCESS('Successfully cleared candidate cache')
             )
+        elif cache_type == 'pages':
+            self.stdout.write('Clearing cached pages...')
+            invalidate_page_cache()
+            self.stdout.write(
+                self.style.SUCCESS('Successfully cleared cached pages')
+            )
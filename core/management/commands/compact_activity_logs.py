@@ -0,0 +1,60 @@
+"""
+Management command to convert full-snapshot UPDATE activity logs to change sets
+Usage: python manage.py compact_activity_logs [--batch-size 1000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from core.audit import compact_snapshots
+from core.models import ActivityLog
+
+
+class Command(BaseCommand):
+    help = 'Rewrite UPDATE activity logs so before/after data only hold the changed fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of log rows read and updated per batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the rows that would be compacted without changing them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = max(1, options['batch_size'])
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        scanned = 0
+        compacted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                ActivityLog.objects.filter(action_type=ActivityLog.ACTION_UPDATE, pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'before_data', 'after_data')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            changed = []
+            for log in batch:
+                compact = compact_snapshots(log.before_data, log.after_data)
+                if compact is not None:
+                    log.before_data, log.after_data = compact
+                    changed.append(log)
+            compacted += len(changed)
+            if changed and not dry_run:
+                ActivityLog.objects.bulk_update(changed, ['before_data', 'after_data'])
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{compacted} of {scanned} UPDATE log(s) would be compacted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} of {scanned} UPDATE log(s)'))
@@ -0,0 +1,37 @@
+"""
+Management command to move documents into the content-addressed blob store and reconcile references
+Usage: python manage.py dedupe_media [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from core.storage import reconcile_blobs
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate applicant documents into blobs/ and recount blob references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without moving or deleting files',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        report = reconcile_blobs(dry_run=dry_run)
+
+        for name in report['missing']:
+            self.stdout.write(self.style.WARNING(f'Missing: {name} (referenced but not in storage)'))
+        for name, stored, actual in report['drifted']:
+            self.stdout.write(f"  {name}: stored={stored if stored is not None else '-'} actual={actual}")
+
+        verb = 'would be' if dry_run else 'were'
+        self.stdout.write(f"{len(report['migrated'])} file(s) {verb} moved into the blob store")
+        self.stdout.write(f"{len(report['drifted'])} reference count(s) {verb} corrected")
+        self.stdout.write(f"{len(report['deleted'])} unreferenced blob(s) {verb} deleted")
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS('Blob store reconciled'))
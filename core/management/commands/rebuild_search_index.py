@@ -0,0 +1,36 @@
+"""
+Management command to repopulate the text search index
+Usage: python manage.py rebuild_search_index [--entity candidate]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from core.search import SEARCH_SPECS, backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Repopulate the SQLite FTS5 search tables after bulk changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            choices=sorted(SEARCH_SPECS),
+            help='Entity to rebuild (repeatable, defaults to all)',
+        )
+
+    def handle(self, *args, **options):
+        kind = backend()
+        if kind == 'postgresql':
+            self.stdout.write(self.style.SUCCESS('PostgreSQL maintains the search indexes itself; nothing to rebuild'))
+            return
+        if kind is None:
+            self.stdout.write(self.style.WARNING(
+                f'No search index on {connection.vendor}; run migrate (SQLite needs FTS5 support)'
+            ))
+            return
+
+        report = rebuild_index(entities=options['entity'])
+        for entity, rows in report.items():
+            self.stdout.write(f'{entity}: {rows} row(s) indexed')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
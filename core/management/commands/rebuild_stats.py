@@ -0,0 +1,58 @@
+"""
+Management command to recompute the StatsCounter table and reconcile drift
+Usage: python manage.py rebuild_stats [--entity candidate] [--chunk-size 5000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from core.counters import COUNTER_SPECS, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard statistics counters from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            choices=sorted(COUNTER_SPECS),
+            help='Entity to rebuild (repeatable, defaults to all)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of primary keys aggregated per query',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without changing the counters',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        report = rebuild_counters(
+            entities=options['entity'],
+            chunk_size=max(1, options['chunk_size']),
+            dry_run=dry_run,
+        )
+
+        total_drift = 0
+        for entity, result in report.items():
+            drift = result['drift']
+            total_drift += len(drift)
+            self.stdout.write(f"{entity}: {result['rows']} counter row(s), {len(drift)} drifted")
+            for status, period, stored, actual in drift:
+                self.stdout.write(
+                    f"  {status or '*'} {period or 'all-time'}: stored={stored} actual={actual}"
+                )
+
+        if total_drift == 0:
+            self.stdout.write(self.style.SUCCESS('All counters are in sync'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f'{total_drift} counter row(s) would be corrected'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {total_drift} counter row(s)'))
@@ -185,21 +185,20 @@ class Command(BaseCommand):
         
         # Notify admins
         admin_users = User.objects.filter(is_staff=True)
-        for admin in admin_users:
-            if overall_success:
-                Notification.add_notification(
-                    user=admin,
-                    message=f"Backup restored successfully from {timestamp}. Duration: {duration:.2f}s",
-                    notification_type=Notification.SUCCESS,
-                    link="/admin/core/activitylog/"
-                )
-            else:
-                Notification.add_notification(
-                    user=admin,
-                    message=f"Backup restore from {timestamp} had errors: {'; '.join(results['errors'])}",
-                    notification_type=Notification.ERROR,
-                    link="/admin/core/activitylog/"
-                )
+        if overall_success:
+            Notification.notify_many(
+                admin_users,
+                message=f"Backup restored successfully from {timestamp}. Duration: {duration:.2f}s",
+                notification_type=Notification.SUCCESS,
+                link="/admin/core/activitylog/"
+            )
+        else:
+            Notification.notify_many(
+                admin_users,
+                message=f"Backup restore from {timestamp} had errors: {'; '.join(results['errors'])}",
+                notification_type=Notification.ERROR,
+                link="/admin/core/activitylog/"
+            )
         
         self.stdout.write('\n' + '='*60)
         if overall_success:
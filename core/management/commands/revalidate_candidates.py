@@ -0,0 +1,58 @@
+"""
+Management command to re-validate candidate applications in bulk after a rule change
+Usage: python manage.py revalidate_candidates [--program ID] [--chunk-size 2000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import AgricultureProgram, Candidate
+from core.validation import revalidate
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluate candidate completeness and store the statuses that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--program',
+            type=int,
+            help='Only re-validate the candidates of this program ID',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of candidates read and written per query',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing it',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        queryset = Candidate.objects.all()
+        if options['program'] is not None:
+            if not AgricultureProgram.objects.filter(pk=options['program']).exists():
+                raise CommandError(f"Program {options['program']} does not exist")
+            queryset = queryset.filter(program_id=options['program'])
+
+        report = revalidate(queryset, chunk_size=max(1, options['chunk_size']), dry_run=dry_run)
+
+        seconds = report['seconds']
+        rate = report['checked'] / seconds if seconds else 0
+        self.stdout.write(
+            f"Checked {report['checked']} candidate(s) in {seconds:.2f}s ({rate:,.0f} candidates/s)"
+        )
+        for (old, new), count in sorted(report['transitions'].items()):
+            self.stdout.write(f"  {old} -> {new}: {count}")
+
+        if report['changed'] == 0:
+            self.stdout.write(self.style.SUCCESS('All candidate statuses are up to date'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f"{report['changed']} candidate(s) would be updated"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Updated {report['changed']} candidate(s)"))
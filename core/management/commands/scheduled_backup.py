@@ -130,13 +130,12 @@ class Command(BaseCommand):
             ))
             logger.info(f'Scheduled backup completed successfully in {duration:.2f} seconds')
             
-            for admin in admin_users:
-                Notification.add_notification(
-                    user=admin,
-                    message=f"Automatic backup completed successfully at {end_time.strftime('%Y-%m-%d %H:%M:%S')}. Duration: {duration:.2f}s. Manifest: {manifest_file.name}",
-                    notification_type=Notification.SUCCESS,
-                    link="/admin/core/activitylog/"
-                )
+            Notification.notify_many(
+                admin_users,
+                message=f"Automatic backup completed successfully at {end_time.strftime('%Y-%m-%d %H:%M:%S')}. Duration: {duration:.2f}s. Manifest: {manifest_file.name}",
+                notification_type=Notification.SUCCESS,
+                link="/admin/core/activitylog/"
+            )
         else:
             error_summary = '; '.join(results['errors']) if results['errors'] else 'Unknown error'
             self.stderr.write(self.style.ERROR(
@@ -144,13 +143,12 @@ class Command(BaseCommand):
             ))
             logger.error(f'Scheduled backup completed with errors: {error_summary}')
             
-            for admin in admin_users:
-                Notification.add_notification(
-                    user=admin,
-                    message=f"Automatic backup had issues at {end_time.strftime('%Y-%m-%d %H:%M:%S')}. Errors: {error_summary}",
-                    notification_type=Notification.WARNING if (db_ok or media_ok) else Notification.ERROR,
-                    link="/admin/core/activitylog/"
-                )
+            Notification.notify_many(
+                admin_users,
+                message=f"Automatic backup had issues at {end_time.strftime('%Y-%m-%d %H:%M:%S')}. Errors: {error_summary}",
+                notification_type=Notification.WARNING if (db_ok or media_ok) else Notification.ERROR,
+                link="/admin/core/activitylog/"
+            )
         
         # Log to ActivityLog
         ActivityLog.objects.create(
@@ -1,11 +1,11 @@
 """
 Management command to warm up the cache with frequently accessed data
-Usage: python manage.py warm_cache
+Usage: python manage.py warm_cache [--only program_list] [--workers 4] [--clear-first]
 """
 
 from django.core.management.base import BaseCommand
 from django.core.cache import cache
-from core.cache_utils import warm_cache
+from core.cache_utils import get_warmers, warm_cache
 
 
 class Command(BaseCommand):
@@ -17,6 +17,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear cache before warming',
         )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=sorted(get_warmers()),
+            help='Entry to warm (repeatable, defaults to all)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of entries warmed concurrently',
+        )
 
     def handle(self, *args, **options):
         if options['clear_first']:
@@ -24,13 +36,24 @@ class Command(BaseCommand):
             cache.clear()
 
         self.stdout.write('Warming up cache...')
-        
-        try:
-            warm_cache()
+
+        report = warm_cache(names=options['only'], workers=max(1, options['workers']))
+
+        failed = 0
+        for entry in report:
+            line = f"  {entry['name']}: {entry['seconds'] * 1000:.1f} ms"
+            if entry['error']:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"{line} - failed: {entry['error']}"))
+            else:
+                self.stdout.write(line)
+
+        total = sum(entry['seconds'] for entry in report)
+        if failed:
             self.stdout.write(
-                self.style.SUCCESS('Successfully warmed up cache')
+                self.style.ERROR(f'{failed} of {len(report)} cache entries failed to warm')
             )
-        except Exception as e:
+        else:
             self.stdout.write(
-                self.style.ERROR(f'Error warming cache: {e}')
+                self.style.SUCCESS(f'Successfully warmed {len(report)} cache entries ({total * 1000:.1f} ms of work)')
             )
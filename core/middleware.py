@@ -31,6 +31,7 @@ def get_request_session_key():
 class RequestContextMiddleware(MiddlewareMixin):
     """Capture client IP, session key, user, and request duration.
     Exposes them via thread-local helpers for signals/handlers to consume.
+    Audit records written during the request are buffered and flushed in one batch.
     """
 
     header_candidates = (
@@ -49,6 +50,13 @@ class RequestContextMiddleware(MiddlewareMixin):
                 return val
         return None
 
+    def __call__(self, request):
+        if self.async_mode:
+            return super().__call__(request)
+        from . import audit  # imported lazily: core.audit needs the app registry
+        with audit.buffered():
+            return super().__call__(request)
+
     def process_request(self, request):
         request._rt_start = time.perf_counter()
         ip = self._client_ip(request)
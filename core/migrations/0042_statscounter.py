@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    from core.counters import rebuild_counters
+    rebuild_counters(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_remove_profile_job_experience'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=50)),
+                ('status', models.CharField(blank=True, default='', max_length=50)),
+                ('period', models.CharField(blank=True, default='', max_length=7)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entity'], name='core_statsc_entity_de72cd_idx')],
+                'unique_together': {('entity', 'status', 'period')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Time-bucketed index for ActivityLog on PostgreSQL.
+#
+# Declarative monthly partitioning would need the partition key in the primary
+# key, which Django models cannot express; a BRIN index gives the retention job
+# and the recent-window view cheap range scans over the append-only timestamp
+# column instead, while old months live in the archive files.
+
+from django.db import migrations
+
+INDEX_NAME = 'core_activitylog_ts_brin'
+
+
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('core', 'ActivityLog')._meta.db_table
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON {schema_editor.quote_name(table)} '
+        f'USING brin ("timestamp") WITH (pages_per_range = 32)'
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0042_statscounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -0,0 +1,29 @@
+# Text search indexes for candidates, programs and users (see core/search.py).
+#
+# PostgreSQL gets GIN indexes on the source tables (a tsvector expression plus
+# pg_trgm for the substring fallback); SQLite gets FTS5 shadow tables that the
+# signal handlers keep current. Other databases keep the plain icontains scan.
+
+from django.db import migrations
+
+
+def install_search(apps, schema_editor):
+    from core.search import install
+    install(schema_editor, get_model=apps.get_model)
+
+
+def uninstall_search(apps, schema_editor):
+    from core.search import uninstall
+    uninstall(schema_editor, get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0043_activitylog_timestamp_brin'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:07
+
+import django.db.models.functions.datetime
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0044_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-created_at', '-id'], name='cand_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='cand_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['gender', '-created_at', '-id'], name='cand_gender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['nationality', '-created_at', '-id'], name='cand_nation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['country_of_birth', '-created_at', '-id'], name='cand_country_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['specialization', '-created_at', '-id'], name='cand_spec_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['first_name', 'last_name', 'id'], name='cand_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['created_by', '-created_at'], name='cand_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['email', 'id'], name='cand_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='cand_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(django.db.models.functions.datetime.TruncDate('created_at'), name='cand_created_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0045_candidate_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='storage_mtime',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:25
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_uploadedfile_storage_mtime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='academic_certificate',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_certificates/', verbose_name='Academic Certificate'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/', verbose_name='Diploma'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='license_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_licenses/', verbose_name='License Scan'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='passport_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='passports/', verbose_name='Passport Scan'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_images/', verbose_name='Profile Image'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', verbose_name='Transcript of Records (TOR)'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='academic_certificate',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='academic_certificates/', verbose_name='Academic Certificate'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/', verbose_name='Diploma'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='license_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='licenses/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='passport_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='passport_scans/', verbose_name='Passport Scan'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.document_storage, upload_to='profile_images/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', verbose_name='Transcript of Records (TOR)'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', verbose_name='Transcript of Records (TOR)'),
+        ),
+    ]
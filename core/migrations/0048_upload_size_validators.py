@@ -0,0 +1,130 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:30
+
+import core.storage
+import core.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0047_content_addressed_documents'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='academic_certificate',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_certificates/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Academic Certificate'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Diploma'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='license_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_licenses/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='License Scan'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='passport_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='passports/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Passport Scan'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.document_storage, upload_to='candidate_images/', validators=[core.uploads.MaxUploadSizeValidator(2097152)], verbose_name='Profile Image'),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Transcript of Records (TOR)'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='academic_certificate',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='academic_certificates/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Academic Certificate'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Diploma'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='license_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='licenses/', validators=[core.uploads.MaxUploadSizeValidator(5242880)]),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='passport_scan',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='passport_scans/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Passport Scan'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.document_storage, upload_to='profile_images/', validators=[core.uploads.MaxUploadSizeValidator(2097152)]),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Transcript of Records (TOR)'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='diploma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/diploma/', validators=[core.uploads.MaxUploadSizeValidator(5242880)]),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='good_moral',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/moral/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Good Moral Character'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='nbi_clearance',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/nbi/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NBI Clearance'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='nc2_tesda',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tesda/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='NC2 from TESDA'),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='tor',
+            field=models.FileField(blank=True, null=True, storage=core.storage.document_storage, upload_to='documents/tor/', validators=[core.uploads.MaxUploadSizeValidator(5242880)], verbose_name='Transcript of Records (TOR)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0048_upload_size_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedblob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
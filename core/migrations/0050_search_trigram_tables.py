@@ -0,0 +1,27 @@
+# Trigram FTS5 tables for the substring half of the SQLite search (see core/search.py).
+#
+# install() is idempotent: on SQLite it adds the missing core_search_<entity>_trigram
+# tables and repopulates the shadow tables; PostgreSQL already has its pg_trgm indexes.
+
+from django.db import migrations
+
+
+def install_search(apps, schema_editor):
+    from core.search import install
+    install(schema_editor, get_model=apps.get_model)
+
+
+def uninstall_trigram(apps, schema_editor):
+    from core.search import uninstall_trigram
+    uninstall_trigram(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_stored_blob_claims'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_trigram),
+    ]
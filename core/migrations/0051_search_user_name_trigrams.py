@@ -0,0 +1,31 @@
+# pg_trgm indexes on auth_user.first_name/last_name: the PostgreSQL substring search
+# only reads trigram-indexed columns (see core/search.py).
+#
+# install() is idempotent: it creates the missing indexes on PostgreSQL and
+# repopulates the shadow tables on SQLite.
+
+from django.db import migrations
+
+
+def install_search(apps, schema_editor):
+    from core.search import install
+    install(schema_editor, get_model=apps.get_model)
+
+
+def drop_name_trigrams(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from core.search import shadow_table
+    for name in ('first_name', 'last_name'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {shadow_table("user")}_{name}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_search_trigram_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, drop_name_trigrams),
+    ]
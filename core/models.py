@@ -1,5 +1,7 @@
 from django.db import models, transaction
 
+from django.db.models.functions import TruncDate, Upper
+
 from django.contrib.auth.models import User
 
 from django.apps import apps
@@ -12,6 +14,10 @@ import hashlib
 
 import os
 
+from .storage import document_storage
+
+from .uploads import size_validators
+
 
 
 
@@ -30,7 +36,7 @@ class Profile(models.Model):
 
     verification_token = models.CharField(max_length=100, blank=True, null=True)
 
-    profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_image = models.ImageField(upload_to='profile_images/', storage=document_storage, validators=size_validators('profile_image'), blank=True, null=True)
 
     phone_number = models.CharField(max_length=20, blank=True, null=True)
 
@@ -66,7 +72,7 @@ class Profile(models.Model):
 
     has_international_license = models.BooleanField(default=False)
 
-    license_scan = models.FileField(upload_to='licenses/', blank=True, null=True)
+    license_scan = models.FileField(upload_to='licenses/', storage=document_storage, validators=size_validators('license_scan'), blank=True, null=True)
 
     
 
@@ -162,23 +168,23 @@ class Profile(models.Model):
 
     
 
-    passport_scan = models.FileField(upload_to='passport_scans/', blank=True, null=True, verbose_name="Passport Scan")
+    passport_scan = models.FileField(upload_to='passport_scans/', storage=document_storage, validators=size_validators('passport_scan'), blank=True, null=True, verbose_name="Passport Scan")
 
-    academic_certificate = models.FileField(upload_to='academic_certificates/', blank=True, null=True, verbose_name="Academic Certificate")
+    academic_certificate = models.FileField(upload_to='academic_certificates/', storage=document_storage, validators=size_validators('academic_certificate'), blank=True, null=True, verbose_name="Academic Certificate")
 
 
 
     # Additional required documents for registration
 
-    tor = models.FileField(upload_to='documents/tor/', blank=True, null=True, verbose_name="Transcript of Records (TOR)")
+    tor = models.FileField(upload_to='documents/tor/', storage=document_storage, validators=size_validators('tor'), blank=True, null=True, verbose_name="Transcript of Records (TOR)")
 
-    nc2_tesda = models.FileField(upload_to='documents/tesda/', blank=True, null=True, verbose_name="NC2 from TESDA")
+    nc2_tesda = models.FileField(upload_to='documents/tesda/', storage=document_storage, validators=size_validators('nc2_tesda'), blank=True, null=True, verbose_name="NC2 from TESDA")
 
-    diploma = models.FileField(upload_to='documents/diploma/', blank=True, null=True, verbose_name="Diploma")
+    diploma = models.FileField(upload_to='documents/diploma/', storage=document_storage, validators=size_validators('diploma'), blank=True, null=True, verbose_name="Diploma")
 
-    good_moral = models.FileField(upload_to='documents/moral/', blank=True, null=True, verbose_name="Good Moral Character")
+    good_moral = models.FileField(upload_to='documents/moral/', storage=document_storage, validators=size_validators('good_moral'), blank=True, null=True, verbose_name="Good Moral Character")
 
-    nbi_clearance = models.FileField(upload_to='documents/nbi/', blank=True, null=True, verbose_name="NBI Clearance")
+    nbi_clearance = models.FileField(upload_to='documents/nbi/', storage=document_storage, validators=size_validators('nbi_clearance'), blank=True, null=True, verbose_name="NBI Clearance")
 
     
 
@@ -444,15 +450,15 @@ class Registration(models.Model):
 
     # Required documents (matching the Candidate model fields)
 
-    tor = models.FileField(upload_to='documents/tor/', blank=True, null=True, verbose_name="Transcript of Records (TOR)")
+    tor = models.FileField(upload_to='documents/tor/', storage=document_storage, validators=size_validators('tor'), blank=True, null=True, verbose_name="Transcript of Records (TOR)")
 
-    nc2_tesda = models.FileField(upload_to='documents/tesda/', blank=True, null=True, verbose_name="NC2 from TESDA")
+    nc2_tesda = models.FileField(upload_to='documents/tesda/', storage=document_storage, validators=size_validators('nc2_tesda'), blank=True, null=True, verbose_name="NC2 from TESDA")
 
-    diploma = models.FileField(upload_to='documents/diploma/', blank=True, null=True)
+    diploma = models.FileField(upload_to='documents/diploma/', storage=document_storage, validators=size_validators('diploma'), blank=True, null=True)
 
-    good_moral = models.FileField(upload_to='documents/moral/', blank=True, null=True, verbose_name="Good Moral Character")
+    good_moral = models.FileField(upload_to='documents/moral/', storage=document_storage, validators=size_validators('good_moral'), blank=True, null=True, verbose_name="Good Moral Character")
 
-    nbi_clearance = models.FileField(upload_to='documents/nbi/', blank=True, null=True, verbose_name="NBI Clearance")
+    nbi_clearance = models.FileField(upload_to='documents/nbi/', storage=document_storage, validators=size_validators('nbi_clearance'), blank=True, null=True, verbose_name="NBI Clearance")
 
     
 
@@ -722,23 +728,23 @@ class Candidate(models.Model):
 
     # Files
 
-    profile_image = models.ImageField(upload_to='candidate_images/', blank=True, null=True, verbose_name="Profile Image")
+    profile_image = models.ImageField(upload_to='candidate_images/', storage=document_storage, validators=size_validators('profile_image'), blank=True, null=True, verbose_name="Profile Image")
 
-    license_scan = models.FileField(upload_to='candidate_licenses/', blank=True, null=True, verbose_name="License Scan")
+    license_scan = models.FileField(upload_to='candidate_licenses/', storage=document_storage, validators=size_validators('license_scan'), blank=True, null=True, verbose_name="License Scan")
 
-    passport_scan = models.FileField(upload_to='passports/', blank=True, null=True, verbose_name="Passport Scan")
+    passport_scan = models.FileField(upload_to='passports/', storage=document_storage, validators=size_validators('passport_scan'), blank=True, null=True, verbose_name="Passport Scan")
 
-    academic_certificate = models.FileField(upload_to='candidate_certificates/', blank=True, null=True, verbose_name="Academic Certificate")
+    academic_certificate = models.FileField(upload_to='candidate_certificates/', storage=document_storage, validators=size_validators('academic_certificate'), blank=True, null=True, verbose_name="Academic Certificate")
 
-    tor = models.FileField(upload_to='documents/tor/', blank=True, null=True, verbose_name="Transcript of Records (TOR)")
+    tor = models.FileField(upload_to='documents/tor/', storage=document_storage, validators=size_validators('tor'), blank=True, null=True, verbose_name="Transcript of Records (TOR)")
 
-    nc2_tesda = models.FileField(upload_to='documents/tesda/', blank=True, null=True, verbose_name="NC2 from TESDA")
+    nc2_tesda = models.FileField(upload_to='documents/tesda/', storage=document_storage, validators=size_validators('nc2_tesda'), blank=True, null=True, verbose_name="NC2 from TESDA")
 
-    diploma = models.FileField(upload_to='documents/diploma/', blank=True, null=True, verbose_name="Diploma")
+    diploma = models.FileField(upload_to='documents/diploma/', storage=document_storage, validators=size_validators('diploma'), blank=True, null=True, verbose_name="Diploma")
 
-    good_moral = models.FileField(upload_to='documents/moral/', blank=True, null=True, verbose_name="Good Moral Character")
+    good_moral = models.FileField(upload_to='documents/moral/', storage=document_storage, validators=size_validators('good_moral'), blank=True, null=True, verbose_name="Good Moral Character")
 
-    nbi_clearance = models.FileField(upload_to='documents/nbi/', blank=True, null=True, verbose_name="NBI Clearance")
+    nbi_clearance = models.FileField(upload_to='documents/nbi/', storage=document_storage, validators=size_validators('nbi_clearance'), blank=True, null=True, verbose_name="NBI Clearance")
 
     
 
@@ -782,183 +788,213 @@ class Candidate(models.Model):
 
         # unique_together = ('passport_number', 'university')
 
-        pass
+        indexes = [
+
+            # Default list order and keyset pagination (created_at, id)
+
+            models.Index(fields=['-created_at', '-id'], name='cand_created_idx'),
+
+            # candidate_list filters (and the matching sorts), each followed by the default order
+
+            models.Index(fields=['status', '-created_at', '-id'], name='cand_status_created_idx'),
+
+            models.Index(fields=['gender', '-created_at', '-id'], name='cand_gender_created_idx'),
+
+            models.Index(fields=['nationality', '-created_at', '-id'], name='cand_nation_created_idx'),
+
+            models.Index(fields=['country_of_birth', '-created_at', '-id'], name='cand_country_created_idx'),
+
+            models.Index(fields=['specialization', '-created_at', '-id'], name='cand_spec_created_idx'),
+
+            models.Index(fields=['first_name', 'last_name', 'id'], name='cand_name_idx'),
+
+            # Ownership checks: Q(created_by=user) | Q(email=user.email)
+
+            models.Index(fields=['created_by', '-created_at'], name='cand_owner_created_idx'),
+
+            models.Index(fields=['email', 'id'], name='cand_email_idx'),
+
+            # email__iexact compiles to UPPER("email") = UPPER(%s)
+
+            models.Index(Upper('email'), name='cand_email_upper_idx'),
+
+            # created_at__date range filters; the expression embeds TIME_ZONE, so
+
+            # changing TIME_ZONE needs this index rebuilt to keep matching
+
+            models.Index(TruncDate('created_at'), name='cand_created_date_idx'),
+
+        ]
 
     
 
-    def validate_application(self, deadline_days=7):
+    # Completeness rules (field, label), shared by evaluate_application and core/validation.py
 
-        """
+    REQUIRED_DOCUMENTS = [
 
-        Validate the application for completeness before farm assignment.
+        ('passport_scan', "Passport Scan"),
 
-        Returns tuple: (is_valid, missing_items_list)
+        ('tor', "Transcript of Records (TOR)"),
 
-        
+        ('diploma', "Diploma"),
 
-        Criteria:
+        ('good_moral', "Good Moral Character Certificate"),
 
-        1. If all DOCUMENTS and required FIELDS are complete, status = APPROVED.
+        ('nbi_clearance', "NBI Clearance"),
 
-        2. If all required DOCUMENTS are complete but FIELDS are missing, status = VALIDATED.
+        ('profile_image', "Profile Photograph"),
 
-        3. If required DOCUMENTS are missing, status = MISSING_DOCS and document_deadline is set.
+    ]
 
-        """
+    LICENSE_DOCUMENT = ('license_scan', "Driver's License (Required for this program)")
 
-        from django.utils import timezone
+    REQUIRED_FIELDS = [
 
-        from datetime import timedelta
+        ('first_name', "First Name"),
 
-        
+        ('last_name', "Last Name"),
 
-        missing_docs = []
+        ('email', "Email Address"),
 
-        missing_fields = []
+        ('phone_number', "Phone Number"),
 
-        
+        ('address', "Home Address"),
 
-        # 1. Check Required Documents
+        ('date_of_birth', "Date of Birth"),
 
-        if not self.passport_scan:
+        ('gender', "Gender / Sex"),
 
-            missing_docs.append("Passport Scan")
+        ('nationality', "Nationality"),
 
-        if not self.tor:
+        ('health_condition', "Health Condition"),
 
-            missing_docs.append("Transcript of Records (TOR)")
+        ('shirt_size', "Shirt Size"),
 
-        if not self.diploma:
+        ('shoes_size', "Shoes Size"),
 
-            missing_docs.append("Diploma")
+        ('university', "University"),
 
-        if not self.good_moral:
+        ('field_of_study', "Course / Field of Study"),
 
-            missing_docs.append("Good Moral Character Certificate")
+        ('specialization', "Primary Specialization"),
 
-        if not self.nbi_clearance:
+        ('graduation_year', "Graduation Year"),
 
-            missing_docs.append("NBI Clearance")
+        ('passport_number', "Passport Number"),
 
-        if not self.profile_image:
+        ('passport_issue_date', "Passport Issue Date"),
 
-            missing_docs.append("Profile Photograph")
+        ('passport_expiry_date', "Passport Expiry Date"),
 
-            
+        ('place_of_issue', "Passport Place of Issue"),
 
-        # Check if program requires license
+    ]
 
-        if self.program and self.program.requires_license and not self.license_scan:
+    
 
-            missing_docs.append("Driver's License (Required for this program)")
+    def validate_application(self, deadline_days=7):
 
-            
+        """
 
-        # 2. Check Required Personal Fields
+        Validate the application for completeness before farm assignment and save the result.
 
-        personal_required = {
+        Returns tuple: (is_valid, missing_items_list)
 
-            'first_name': "First Name",
+        """
 
-            'last_name': "Last Name",
+        previous = (self.status, self.missing_documents_note, self.document_deadline)
 
-            'email': "Email Address",
+        result = self.evaluate_application(deadline_days=deadline_days)
 
-            'phone_number': "Phone Number",
+        # Unchanged outcomes (e.g. the edit page re-validating on every GET) are not saved again
 
-            'address': "Home Address",
+        if self.pk is None or (self.status, self.missing_documents_note, self.document_deadline) != previous:
 
-            'date_of_birth': "Date of Birth",
+            self.save()
 
-            'gender': "Gender / Sex",
+        return result
 
-            'nationality': "Nationality",
 
-            'health_condition': "Health Condition",
 
-            'shirt_size': "Shirt Size",
+    def evaluate_application(self, deadline_days=7):
 
-            'shoes_size': "Shoes Size",
+        """
 
-            'university': "University",
+        Set status, missing_documents_note and document_deadline from the application's
 
-            'field_of_study': "Course / Field of Study",
+        completeness without saving (bulk callers write many candidates at once).
 
-            'specialization': "Primary Specialization",
+        Returns tuple: (is_valid, missing_items_list)
 
-            'graduation_year': "Graduation Year",
 
-            'passport_number': "Passport Number",
 
-            'passport_issue_date': "Passport Issue Date",
+        Criteria:
 
-            'passport_expiry_date': "Passport Expiry Date",
+        1. If all DOCUMENTS and required FIELDS are complete, status = APPROVED.
 
-            'place_of_issue': "Passport Place of Issue"
+        2. If all required DOCUMENTS are complete but FIELDS are missing, status = VALIDATED.
 
-        }
+        3. If required DOCUMENTS are missing, status = MISSING_DOCS and document_deadline is set.
 
-        
+        """
 
-        for field, label in personal_required.items():
+        missing_docs = [label for field, label in self.REQUIRED_DOCUMENTS if not getattr(self, field)]
 
-            value = getattr(self, field)
+        # Check if program requires license
 
-            if not value:
+        license_field, license_label = self.LICENSE_DOCUMENT
 
-                missing_fields.append(label)
+        if self.program and self.program.requires_license and not getattr(self, license_field):
 
-        
+            missing_docs.append(license_label)
 
-        docs_complete = len(missing_docs) == 0
+        missing_fields = [label for field, label in self.REQUIRED_FIELDS if not getattr(self, field)]
 
-        fields_complete = len(missing_fields) == 0
+        self.status, self.missing_documents_note, self.document_deadline = self.application_outcome(
 
-        is_fully_complete = docs_complete and fields_complete
+            missing_docs, missing_fields, self.document_deadline, deadline_days
 
-        
+        )
 
-        # Decide status based on completeness
+        return not missing_docs and not missing_fields, missing_docs + missing_fields
 
-        if is_fully_complete:
 
-            # Full completion: Auto-Approve!
 
-            self.status = self.APPROVED
+    @classmethod
 
-            self.missing_documents_note = ""
+    def application_outcome(cls, missing_docs, missing_fields, document_deadline, deadline_days=7, now=None):
 
-            self.document_deadline = None
+        """
 
-        elif docs_complete:
+        Return (status, missing_documents_note, document_deadline) for an application
 
-            # Documents are done but fields are missing: VALIDATED
+        missing the given documents and fields (labels).
 
-            self.status = self.VALIDATED
+        """
 
-            self.missing_documents_note = "Required fields missing: " + ", ".join(missing_fields)
+        from django.utils import timezone
 
-            self.document_deadline = None
+        from datetime import timedelta
 
-        else:
+        if not missing_docs and not missing_fields:
 
-            # Documents are missing: MISSING_DOCS
+            # Full completion: Auto-Approve!
 
-            self.status = self.MISSING_DOCS
+            return cls.APPROVED, "", None
 
-            all_missing = missing_docs + missing_fields
+        if not missing_docs:
 
-            self.missing_documents_note = "Missing: " + ", ".join(all_missing)
+            # Documents are done but fields are missing: VALIDATED
 
-            if not self.document_deadline:  # Only set deadline if not already set
+            return cls.VALIDATED, "Required fields missing: " + ", ".join(missing_fields), None
 
-                self.document_deadline = timezone.now() + timedelta(days=deadline_days)
+        # Documents are missing: MISSING_DOCS
 
-        
+        if not document_deadline:  # Only set deadline if not already set
 
-        self.save()
+            document_deadline = (now or timezone.now()) + timedelta(days=deadline_days)
 
-        return is_fully_complete, missing_docs + missing_fields
+        return cls.MISSING_DOCS, "Missing: " + ", ".join(missing_docs + missing_fields), document_deadline
 
     
 
@@ -1064,7 +1100,9 @@ class Notification(models.Model):
 
         """Utility method to create a notification"""
 
-        return cls.objects.create(
+        from . import events, notification_counts
+
+        notification = cls.objects.create(
 
             user=user,
 
@@ -1076,6 +1114,38 @@ class Notification(models.Model):
 
         )
 
+        notification_counts.increment(notification.user_id)
+
+        events.publish(notification.user_id, events.NOTIFICATION, events.notification_payload(notification))
+
+        return notification
+
+
+
+    @classmethod
+
+    def notify_many(cls, users, message, notification_type=INFO, link=None):
+
+        """Send the same notification to several users with one insert"""
+
+        from . import events, notification_counts
+
+        notifications = cls.objects.bulk_create([
+
+            cls(user=user, message=message, notification_type=notification_type, link=link)
+
+            for user in users
+
+        ])
+
+        notification_counts.increment([notification.user_id for notification in notifications])
+
+        for notification in notifications:
+
+            events.publish(notification.user_id, events.NOTIFICATION, events.notification_payload(notification))
+
+        return notifications
+
 
 
     @classmethod
@@ -1088,9 +1158,19 @@ class Notification(models.Model):
 
         from django.utils import timezone
 
+        from . import notification_counts
+
         cutoff_date = timezone.now() - timedelta(days=days)
 
-        return cls.objects.filter(user=user, created_at__lt=cutoff_date).delete()
+        result = cls.objects.filter(user=user, created_at__lt=cutoff_date).delete()
+
+        if result[0]:
+
+            # Some of them may have been unread
+
+            notification_counts.reset(user.pk)
+
+        return result
 
 
 
@@ -1194,9 +1274,65 @@ class ActivityLog(models.Model):
 
 
 
+    def previous_state(self):
+
+        """Reconstruct the full field snapshot the target object had before this entry.
+
+        UPDATE entries only store the fields that changed, so the current row is
+
+        rewound through every later UPDATE entry and then through this one.
+
+        Returns None if the object no longer exists.
+
+        """
+
+        Model = self.model_from_label(self.model_name)
+
+        if not Model or not self.object_id:
+
+            return None
+
+        instance = Model.objects.filter(pk=self.object_id).first()
+
+        if instance is None:
+
+            return None
+
+        return self._rewind(instance)
+
+
+
+    def _rewind(self, instance):
+
+        from .audit import serialize_instance
+
+
+
+        state = serialize_instance(instance)
+
+        later = ActivityLog.objects.filter(
+
+            model_name=self.model_name,
+
+            object_id=self.object_id,
+
+            action_type=self.ACTION_UPDATE,
+
+            pk__gt=self.pk,
+
+        ).order_by('-pk').values_list('before_data', flat=True)
+
+        for before in list(later) + [self.before_data]:
+
+            state.update(before or {})
+
+        return state
+
+
+
     def rollback(self):
 
-        """Rollback the target object to the 'before_data' snapshot.
+        """Rollback the target object to the state it had before this entry.
 
         Returns the saved instance or None if not possible.
 
@@ -1214,7 +1350,15 @@ class ActivityLog(models.Model):
 
                 instance = Model.objects.get(pk=self.object_id)
 
-                for field, value in self.before_data.items():
+                if self.action_type == self.ACTION_UPDATE:
+
+                    state = self._rewind(instance)
+
+                else:
+
+                    state = self.before_data
+
+                for field, value in state.items():
 
                     # Only assign concrete editable fields
 
@@ -1224,7 +1368,9 @@ class ActivityLog(models.Model):
 
                         if getattr(f, 'editable', True):
 
-                            setattr(instance, field, value)
+                            # Relations are stored as their raw id value
+
+                            setattr(instance, f.attname, value)
 
                     except Exception:
 
@@ -1296,6 +1442,12 @@ class UploadedFile(models.Model):
 
     file_hash = models.CharField(max_length=64, db_index=True, help_text="SHA-256 hash of file content")
 
+    # Storage modification time when file_hash was computed: with file_path and file_size it tells
+
+    # whether the stored file changed without reading it
+
+    storage_mtime = models.DateTimeField(blank=True, null=True)
+
     mime_type = models.CharField(max_length=100, blank=True, null=True)
 
     
@@ -1352,7 +1504,13 @@ class UploadedFile(models.Model):
 
     def calculate_file_hash(file_obj):
 
-        """Calculate SHA-256 hash of a file object."""
+        """Calculate SHA-256 hash of a file object (reusing the digest computed during upload)."""
+
+        precomputed = getattr(file_obj, 'sha256', None)
+
+        if precomputed:
+
+            return precomputed
 
         hasher = hashlib.sha256()
 
@@ -1386,6 +1544,46 @@ class UploadedFile(models.Model):
 
     
 
+    @staticmethod
+
+    def storage_stamp(file_obj):
+
+        """(storage name, size, modified time) of a stored file from a stat, or None if unavailable."""
+
+        storage = getattr(file_obj, 'storage', None)
+
+        name = getattr(file_obj, 'name', None)
+
+        if storage is None or not name:
+
+            return None
+
+        try:
+
+            return name, storage.size(name), storage.get_modified_time(name)
+
+        except (OSError, NotImplementedError):
+
+            return None
+
+    
+
+    def matches_stamp(self, stamp):
+
+        """True if `stamp` (see storage_stamp) is the file this record's hash was computed from."""
+
+        return (
+
+            stamp is not None
+
+            and self.storage_mtime is not None
+
+            and (self.file_path, self.file_size, self.storage_mtime) == stamp
+
+        )
+
+    
+
     @classmethod
 
     def check_duplicate_upload(cls, user, document_type, file_obj):
@@ -1472,33 +1670,35 @@ class UploadedFile(models.Model):
 
         """
 
-        if hasattr(file_obj, 'seek'):
-
-            file_obj.seek(0)
+        # Rewinds the file before and after reading it (and does not read it at all if the
 
-            
+        # upload handler already hashed it)
 
         file_hash = cls.calculate_file_hash(file_obj)
 
         
 
-        if hasattr(file_obj, 'seek'):
-
-            file_obj.seek(0)
-
-            
-
         file_name = getattr(file_obj, 'name', 'unknown')
 
         file_size = getattr(file_obj, 'size', 0)
 
         file_path = getattr(file_obj, 'name', '')
 
+        # Stamp the hash with the stored file's size/mtime so unchanged files are not read again
+
+        stamp = cls.storage_stamp(file_obj)
+
+        storage_mtime = stamp[2] if stamp else None
+
+        if stamp:
+
+            file_size = stamp[1]
+
         
 
         # Get MIME type if available
 
-        mime_type = getattr(file_obj, 'content_type', None)
+        mime_type = getattr(file_obj, 'sniffed_content_type', None) or getattr(file_obj, 'content_type', None)
 
         
 
@@ -1534,6 +1734,8 @@ class UploadedFile(models.Model):
 
                 'file_size': file_size,
 
+                'storage_mtime': storage_mtime,
+
                 'mime_type': mime_type,
 
                 'model_name': model_name,
@@ -1558,6 +1760,8 @@ class UploadedFile(models.Model):
 
             uploaded_file.file_size = file_size
 
+            uploaded_file.storage_mtime = storage_mtime
+
             uploaded_file.mime_type = mime_type
 
             uploaded_file.model_name = model_name
@@ -1618,3 +1822,84 @@ class UploadedFile(models.Model):
 
         return count
 
+
+
+
+
+class StoredBlob(models.Model):
+
+    """Reference count of a document stored once in the content-addressed store (core/storage.py).
+
+
+
+    `refcount` is the number of Profile/Registration/Candidate document fields naming the
+
+    blob, maintained by signals; the blob is deleted when it drops to zero.
+
+    `claimed_at` marks a blob just stored or reused by an upload whose row has not been
+
+    saved yet, so a release committing in between does not delete it.
+
+    `manage.py dedupe_media` recounts the references and reconciles any drift.
+
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+
+    refcount = models.PositiveIntegerField(default=0)
+
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+
+    def __str__(self):  # pragma: no cover
+
+        return f"{self.name} ({self.refcount} references)"
+
+
+
+
+
+class StatsCounter(models.Model):
+
+    """Denormalised counter row keyed by (entity, status, period).
+
+
+
+    Maintained incrementally by the post_save/post_delete signals so staff
+
+    dashboards can read totals without scanning the source tables.
+
+    `manage.py rebuild_stats` recomputes the rows and reconciles any drift.
+
+    """
+
+    entity = models.CharField(max_length=50)
+
+    status = models.CharField(max_length=50, blank=True, default='')
+
+    # '' for all-time counters, 'YYYY-MM' for monthly buckets
+
+    period = models.CharField(max_length=7, blank=True, default='')
+
+    count = models.BigIntegerField(default=0)
+
+
+
+    class Meta:
+
+        unique_together = [['entity', 'status', 'period']]
+
+        indexes = [
+
+            models.Index(fields=['entity']),
+
+        ]
+
+
+
+    def __str__(self):  # pragma: no cover
+
+        return f"{self.entity}[{self.status or '*'}:{self.period or 'all'}] = {self.count}"
@@ -0,0 +1,180 @@
+"""
+Cached unread-notification counters.
+
+The `notification_count` context processor needs the current user's unread
+count on every rendered page. Instead of a COUNT per page, each user's count
+is kept in the cache under `unread_notifications:<user id>`:
+
+* `Notification.add_notification` / `notify_many` increment it;
+* the read / delete views decrement it, or set it to 0 when everything goes;
+* a missing counter is rebuilt lazily with one COUNT (`get_count`) or one
+  grouped COUNT for many users (`get_many`).
+
+Adjustments are exact INCR/DECR calls in autocommit mode. Inside a transaction
+the outcome is not known yet, so the counter is dropped instead (now and again
+on commit) and readers in the meantime count from the database without caching
+the result; a rollback therefore never leaves a wrong count behind. Writes that
+bypass these helpers (e.g. admin bulk actions) call `reset`. The cache timeout
+(CACHE_TTL['user_data']) bounds any remaining drift.
+
+Since every write goes through this module, it also bumps the user's
+`notifications:<id>` cache namespace, which versions the notification
+responses for conditional GETs (core/conditional.py).
+"""
+
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .cache_metrics import cache
+from .cache_utils import bump_generation, get_cache_timeout, notifications_namespace
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(user_id):
+    return f'unread_notifications:{user_id}'
+
+
+def _user_ids(user_ids):
+    if isinstance(user_ids, int):
+        user_ids = [user_ids]
+    return {user_id for user_id in user_ids if user_id is not None}
+
+
+class _Reset:
+    """on_commit callback dropping the counters of `user_ids`."""
+
+    def __init__(self, user_ids):
+        self.user_ids = frozenset(user_ids)
+
+    def __call__(self):
+        try:
+            cache.delete_many([cache_key(user_id) for user_id in self.user_ids])
+        except Exception as e:
+            logger.warning(f"Cache delete failed for unread counters: {e}")
+
+
+def _reset_pending(user_id):
+    """True if the open transaction changed this user's notifications and has not committed yet."""
+    if not connection.in_atomic_block:
+        return False
+    return any(
+        isinstance(entry[1], _Reset) and user_id in entry[1].user_ids
+        for entry in connection.run_on_commit
+    )
+
+
+def _count_unread(user_ids):
+    from .models import Notification
+
+    rows = (
+        Notification.objects.filter(user_id__in=user_ids, read=False)
+        .values('user_id')
+        .annotate(unread=Count('id'))
+        .order_by()
+    )
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update((row['user_id'], row['unread']) for row in rows)
+    return counts
+
+
+# -------- Reading ---------
+
+def get_many(user_ids):
+    """
+    Unread counts for several users: one get_many, plus one grouped COUNT for the misses.
+
+    Returns:
+        dict: {user_id: unread count}
+    """
+    user_ids = _user_ids(user_ids)
+    if not user_ids:
+        return {}
+    keys = {cache_key(user_id): user_id for user_id in user_ids}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"Cache get failed for unread counters: {e}")
+        found = {}
+    counts = {keys[key]: value for key, value in found.items()}
+
+    missing = [user_id for user_id in user_ids if user_id not in counts]
+    if missing:
+        rebuilt = _count_unread(missing)
+        counts.update(rebuilt)
+        cacheable = {cache_key(user_id): count for user_id, count in rebuilt.items() if not _reset_pending(user_id)}
+        if cacheable:
+            try:
+                cache.set_many(cacheable, timeout=get_cache_timeout('user_data'))
+            except Exception as e:
+                logger.warning(f"Cache set failed for unread counters: {e}")
+    return counts
+
+
+def get_count(user_id):
+    """Unread notification count of one user."""
+    return get_many([user_id]).get(user_id, 0)
+
+
+# -------- Writing ---------
+
+def touch(user_ids):
+    """Record a change that leaves the unread counts as they are (e.g. a read notification was deleted)."""
+    bump_generation(*(notifications_namespace(user_id) for user_id in _user_ids(user_ids)))
+
+
+def reset(user_ids):
+    """Drop the counters; the next read rebuilds them."""
+    user_ids = _user_ids(user_ids)
+    if not user_ids:
+        return
+    touch(user_ids)
+    drop = _Reset(user_ids)
+    drop()
+    if connection.in_atomic_block:
+        transaction.on_commit(drop)
+
+
+def adjust(user_ids, delta):
+    """Add `delta` (negative to decrement) to each cached counter."""
+    user_ids = _user_ids(user_ids)
+    if not user_ids or not delta:
+        return
+    if connection.in_atomic_block:
+        reset(user_ids)
+        return
+    touch(user_ids)
+    for user_id in user_ids:
+        key = cache_key(user_id)
+        try:
+            value = cache.incr(key, delta)
+        except ValueError:
+            # Not cached: the next read counts it
+            continue
+        except Exception as e:
+            logger.warning(f"Cache incr failed for {key}: {e}")
+            continue
+        if value < 0:
+            cache.delete(key)
+
+
+def increment(user_ids, amount=1):
+    adjust(user_ids, amount)
+
+
+def decrement(user_ids, amount=1):
+    adjust(user_ids, -amount)
+
+
+def set_count(user_id, value):
+    """Store a known count, e.g. 0 after every notification of the user was deleted."""
+    if connection.in_atomic_block:
+        reset(user_id)
+        return
+    touch([user_id])
+    try:
+        cache.set(cache_key(user_id), value, timeout=get_cache_timeout('user_data'))
+    except Exception as e:
+        logger.warning(f"Cache set failed for unread counter: {e}")
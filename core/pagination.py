@@ -0,0 +1,266 @@
+"""
+Keyset (cursor) pagination for the large staff lists.
+
+Django's Paginator pages with COUNT(*) plus LIMIT/OFFSET, so deep pages scan
+and discard every earlier row. KeysetPaginator instead remembers the sort key
+of the last row shown and asks for rows strictly after it, which costs the same
+on page 1 and page 10,000 when the ordering is backed by an index.
+
+Cursors are opaque signed tokens; a tampered or stale token falls back to the
+first page, like Paginator.get_page() does for bad page numbers. The total
+shown next to the list can come from PostgreSQL's planner estimate instead of
+an exact COUNT(*).
+
+Usage:
+    paginator = KeysetPaginator(queryset, 50, ordering=('-timestamp', '-id'))
+    page_obj = paginator.get_page(request.GET.get('cursor'), params=request.GET)
+"""
+
+import datetime
+import decimal
+import json
+import math
+import uuid
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+CURSOR_PARAM = 'cursor'
+_SALT = 'core.pagination.cursor'
+
+
+def _encode_value(value):
+    # Full-precision isoformat: DjangoJSONEncoder drops microseconds, which
+    # would make the seek skip or repeat rows sharing a millisecond
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator; iterable like django.core.paginator.Page."""
+
+    def __init__(self, object_list, paginator, offset, has_next, has_previous, params=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.params = params
+
+    def __repr__(self):
+        return f'<KeysetPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def number(self):
+        return self.offset // self.paginator.per_page + 1
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.make_cursor(self.object_list[-1], 'next', self.offset + len(self.object_list))
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.make_cursor(
+            self.object_list[0], 'previous', max(self.offset - self.paginator.per_page, 0)
+        )
+
+    def _query(self, cursor):
+        params = self.params.copy() if self.params is not None else None
+        if params is None:
+            return f'{CURSOR_PARAM}={cursor}' if cursor else ''
+        for name in (CURSOR_PARAM, 'page'):
+            params.pop(name, None)
+        if cursor:
+            params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        """Query string (without '?') for the next page, keeping the other GET filters."""
+        return self._query(self.next_cursor)
+
+    @property
+    def previous_query(self):
+        # Going back to the first row lands on the cursor-less first page
+        return self._query(self.previous_cursor if self.offset > self.paginator.per_page else None)
+
+    @property
+    def first_query(self):
+        return self._query(None)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by sort key instead of offset.
+
+    Args:
+        queryset: Rows to paginate (its own ordering is replaced)
+        per_page: Rows per page
+        ordering: Field names, '-' prefixed for descending; should end with a
+                  unique field (e.g. '-id') so ties are stable
+        estimate_count: Use the PostgreSQL planner estimate for `count` when it
+                        is above `estimate_threshold` rows
+    """
+
+    estimate_threshold = 10000
+
+    def __init__(self, queryset, per_page, ordering=('-id',), estimate_count=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        if not any(name in ('id', 'pk') for name, _desc in self.keys):
+            self.keys.append(('id', self.keys[-1][1] if self.keys else True))
+        self.estimate_count = estimate_count
+        self._count_is_estimate = False
+        self._nulls_largest = connections[queryset.db].features.nulls_order_largest
+        model = queryset.model
+        self._fields = {
+            name: model._meta.pk if name == 'pk' else model._meta.get_field(name) for name, _desc in self.keys
+        }
+
+    # -------- Ordering ---------
+
+    def _order_by(self, reverse=False):
+        # No explicit NULLS FIRST/LAST: the backend's natural placement lets a plain
+        # b-tree index serve the ordering in both directions
+        return [F(name).desc() if desc != reverse else F(name).asc() for name, desc in self.keys]
+
+    def _nulls_at_end(self, name, desc):
+        """Whether NULLs of this key come after every value in the forward order."""
+        return self._fields[name].null and self._nulls_largest != desc
+
+    def _beyond(self, name, desc, value, forward):
+        """Rows strictly after (forward) or before `value` in the column's sort order."""
+        nulls_at_end = self._nulls_at_end(name, desc)
+        if value is None:
+            # Past the trailing NULLs there is nothing; before leading NULLs neither
+            if nulls_at_end == forward:
+                return None
+            return Q(**{f'{name}__isnull': False})
+        lookup = 'lt' if desc == forward else 'gt'
+        condition = Q(**{f'{name}__{lookup}': value})
+        if self._fields[name].null and nulls_at_end == forward:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def _seek(self, values, forward):
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (name, desc), value in zip(self.keys, values):
+            beyond = self._beyond(name, desc, value, forward)
+            if beyond is not None:
+                condition |= prefix & beyond
+            prefix &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+
+    # -------- Cursors ---------
+
+    def make_cursor(self, obj, direction, offset):
+        values = [_encode_value(getattr(obj, name)) for name, _desc in self.keys]
+        payload = json.dumps({'v': values, 'd': direction, 'n': offset})
+        return signing.dumps(payload, salt=_SALT, compress=True)
+
+    def _decode(self, cursor):
+        try:
+            payload = json.loads(signing.loads(cursor, salt=_SALT))
+            if len(payload['v']) != len(self.keys) or payload['d'] not in ('next', 'previous'):
+                return None
+            values = [
+                None if raw is None else self._fields[name].to_python(raw)
+                for (name, _desc), raw in zip(self.keys, payload['v'])
+            ]
+            return values, payload['d'], max(int(payload['n']), 0)
+        except (signing.BadSignature, ValidationError, ValueError, KeyError, TypeError):
+            return None
+
+    # -------- Pages ---------
+
+    def get_page(self, cursor=None, params=None):
+        """Return the page after/before `cursor` (the first page if it is missing or invalid)."""
+        decoded = self._decode(cursor) if cursor else None
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self._order_by())[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, 0, len(rows) > self.per_page, False, params)
+
+        values, direction, offset = decoded
+        if direction == 'next':
+            rows = list(self.queryset.filter(self._seek(values, True)).order_by(*self._order_by())[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, offset, len(rows) > self.per_page, True, params)
+
+        rows = list(
+            self.queryset.filter(self._seek(values, False)).order_by(*self._order_by(reverse=True))[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(rows, self, offset if has_previous else 0, True, has_previous, params)
+
+    # -------- Totals ---------
+
+    @cached_property
+    def count(self):
+        if self.estimate_count:
+            estimate = estimate_count(self.queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self._count_is_estimate = True
+                return estimate
+        return self.queryset.count()
+
+    @property
+    def count_is_estimate(self):
+        """True when `count` is the planner estimate rather than an exact COUNT(*)."""
+        self.count
+        return self._count_is_estimate
+
+    @property
+    def num_pages(self):
+        return max(math.ceil(self.count / self.per_page), 1)
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset on PostgreSQL (None on other databases).
+
+    Much cheaper than COUNT(*) on large tables; accuracy depends on how recently
+    the table was ANALYZEd.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        return None
@@ -0,0 +1,395 @@
+"""
+Indexed text search for candidates, programs and users.
+
+`filter_queryset` replaces the `field__icontains` OR-chains of the list views.
+Leading-wildcard LIKE cannot use a b-tree index, so each searchable entity gets
+a real text index instead:
+
+- PostgreSQL: a GIN index over `to_tsvector('simple', ...)` of the entity's
+  fields, queried with prefix terms (`jo:* & smi:*`) and ranked with ts_rank;
+  pg_trgm GIN indexes make the substring match (`ILIKE '%x%'`) indexable too.
+  The substring match only covers the trigram-indexed columns (not
+  program descriptions, which are found by word prefix). Both indexes live on
+  the source table, so PostgreSQL keeps them current.
+- SQLite (local development): FTS5 shadow tables per entity (rowid = primary
+  key): `core_search_<entity>` for the full-text match, ranked with bm25, and
+  `core_search_<entity>_trigram` (trigram tokenizer) for the substring match.
+  The signal handlers in core/signals.py call `index_instance` /
+  `remove_instance`; `manage.py rebuild_search_index` repopulates them after
+  bulk changes.
+
+Full-text terms only match word prefixes, so the search also takes the
+substring match: a fragment from the middle of a word or e-mail address
+("son" in "Johnson") still finds its rows. The two are combined as a UNION of
+id subqueries, each answered from its own index; ORing a LIKE into the outer
+WHERE would make the planner scan the table. Full-text hits rank first. On
+SQLite, substrings shorter than three characters have no trigram to look up
+and scan the table as before.
+"""
+
+import logging
+import re
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# entity -> (model label, full-text fields, fields with a trigram index on PostgreSQL)
+SEARCH_SPECS = {
+    'candidate': ('core.Candidate', ('first_name', 'last_name', 'email'), ('first_name', 'last_name', 'email')),
+    'program': ('core.AgricultureProgram', ('title', 'description'), ('title',)),
+    'user': (
+        'auth.User', ('username', 'email', 'first_name', 'last_name'), ('username', 'email', 'first_name', 'last_name'),
+    ),
+}
+
+_ENTITY_BY_LABEL = {spec[0]: entity for entity, spec in SEARCH_SPECS.items()}
+
+# Extra terms only narrow the match; cap them so a pasted paragraph stays cheap
+MAX_TERMS = 8
+
+# Shortest substring the trigram tables can look up
+MIN_TRIGRAM_QUERY = 3
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+_shadow_tables = {}
+
+
+def entity_for(model):
+    """Return the search entity name for a model class or instance, or None if unindexed."""
+    label = f"{model._meta.app_label}.{model._meta.object_name}"
+    return _ENTITY_BY_LABEL.get(label)
+
+
+def shadow_table(entity):
+    return f'core_search_{entity}'
+
+
+def trigram_table(entity):
+    return f'core_search_{entity}_trigram'
+
+
+def _sqlite_tables(entity, using='default'):
+    """The entity's FTS5 tables present on the database (the trigram one needs SQLite 3.34)."""
+    tables = [shadow_table(entity)]
+    if trigram_table(entity) in _shadow_tables.get(using, ()):
+        tables.append(trigram_table(entity))
+    return tables
+
+
+def terms(query):
+    """Split user input into lower-cased word terms."""
+    return [term.lower() for term in _TERM.findall(query or '')][:MAX_TERMS]
+
+
+def _model(entity, get_model=None):
+    if get_model is None:
+        from django.apps import apps
+        get_model = apps.get_model
+    return get_model(*SEARCH_SPECS[entity][0].split('.'))
+
+
+def backend(using='default'):
+    """'postgresql', 'sqlite' (FTS5 shadow tables present) or None (substring search only)."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor != 'sqlite':
+        return None
+    if using not in _shadow_tables:
+        try:
+            tables = set(connection.introspection.table_names())
+        except DatabaseError:
+            return None
+        _shadow_tables[using] = {
+            table for entity in SEARCH_SPECS for table in (shadow_table(entity), trigram_table(entity))
+            if table in tables
+        }
+    present = _shadow_tables[using]
+    return 'sqlite' if all(shadow_table(entity) in present for entity in SEARCH_SPECS) else None
+
+
+# -------- Index DDL ---------
+
+def _vector_sql(connection, fields, table=None):
+    prefix = f'{connection.ops.quote_name(table)}.' if table else ''
+    columns = " || ' ' || ".join(f"coalesce({prefix}{connection.ops.quote_name(name)}, '')" for name in fields)
+    return f"to_tsvector('simple', {columns})"
+
+
+def install(schema_editor, get_model=None):
+    """Create the search indexes (or FTS5 tables) for every entity and populate them."""
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        _install_postgresql(schema_editor, get_model)
+    elif connection.vendor == 'sqlite':
+        _install_sqlite(schema_editor, get_model)
+    _shadow_tables.pop(connection.alias, None)
+
+
+def uninstall(schema_editor, get_model=None):
+    connection = schema_editor.connection
+    for entity, (_label, _fields, trigram_fields) in SEARCH_SPECS.items():
+        if connection.vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {shadow_table(entity)}_fts')
+            for name in trigram_fields:
+                schema_editor.execute(f'DROP INDEX IF EXISTS {shadow_table(entity)}_{name}_trgm')
+        elif connection.vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {shadow_table(entity)}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {trigram_table(entity)}')
+    _shadow_tables.pop(connection.alias, None)
+
+
+def uninstall_trigram(schema_editor):
+    """Drop the SQLite trigram tables only; substring search goes back to scanning."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    for entity in SEARCH_SPECS:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {trigram_table(entity)}')
+    _shadow_tables.pop(connection.alias, None)
+
+
+def _install_postgresql(schema_editor, get_model):
+    connection = schema_editor.connection
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        trigram = True
+    except DatabaseError:
+        # Needs CREATE privilege on the database; the full-text indexes still work without it
+        logger.warning("pg_trgm is not available; substring search fallback will not be indexed")
+        trigram = False
+
+    for entity, (_label, fields, trigram_fields) in SEARCH_SPECS.items():
+        table = connection.ops.quote_name(_model(entity, get_model)._meta.db_table)
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {shadow_table(entity)}_fts ON {table} '
+            f'USING gin (({_vector_sql(connection, fields)}))'
+        )
+        if trigram:
+            for name in trigram_fields:
+                schema_editor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {shadow_table(entity)}_{name}_trgm ON {table} '
+                    f'USING gin ({connection.ops.quote_name(name)} gin_trgm_ops)'
+                )
+
+
+def _install_sqlite(schema_editor, get_model):
+    for entity, (_label, fields, _trigram) in SEARCH_SPECS.items():
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {shadow_table(entity)} "
+                f"USING fts5({', '.join(fields)}, tokenize='unicode61', prefix='2 3')"
+            )
+        except DatabaseError:
+            # SQLite built without FTS5: backend() reports None and search uses icontains
+            logger.warning("SQLite FTS5 is not available; text search will scan tables")
+            return
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {trigram_table(entity)} "
+                f"USING fts5({', '.join(fields)}, tokenize='trigram')"
+            )
+        except DatabaseError:
+            logger.warning("SQLite is older than 3.34 (no trigram tokenizer); substring search will scan tables")
+    _shadow_tables.pop(schema_editor.connection.alias, None)
+    rebuild_index(get_model=get_model, using=schema_editor.connection.alias)
+
+
+# -------- Shadow table maintenance (SQLite) ---------
+
+def index_instance(instance, update_fields=None):
+    """Refresh the FTS5 rows for a saved instance (a no-op where the index is on the table)."""
+    entity = entity_for(instance)
+    using = instance._state.db or 'default'
+    if entity is None or backend(using) != 'sqlite':
+        return
+    fields = SEARCH_SPECS[entity][1]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        # e.g. User.last_login on every login
+        return
+    values = [getattr(instance, name) or '' for name in fields]
+    with connections[using].cursor() as cursor:
+        for table in _sqlite_tables(entity, using):
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES (%s{', %s' * len(fields)})",
+                [instance.pk, *values],
+            )
+
+
+def index_instances(instances):
+    """Refresh the FTS5 rows of instances written together (one DELETE and one INSERT batch)."""
+    instances = [instance for instance in instances if entity_for(instance) is not None]
+    if not instances:
+        return
+    entity = entity_for(instances[0])
+    using = instances[0]._state.db or 'default'
+    if backend(using) != 'sqlite':
+        return
+    fields = SEARCH_SPECS[entity][1]
+    rows = [[instance.pk, *(getattr(instance, name) or '' for name in fields)] for instance in instances]
+    with connections[using].cursor() as cursor:
+        for table in _sqlite_tables(entity, using):
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(instances))})",
+                [instance.pk for instance in instances],
+            )
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES (%s{', %s' * len(fields)})",
+                rows,
+            )
+
+
+def remove_instance(instance):
+    """Drop the FTS5 rows of a deleted instance."""
+    entity = entity_for(instance)
+    using = instance._state.db or 'default'
+    if entity is None or backend(using) != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        for table in _sqlite_tables(entity, using):
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+
+
+def rebuild_index(entities=None, get_model=None, using='default'):
+    """
+    Repopulate the FTS5 shadow tables from the source tables.
+
+    PostgreSQL indexes are maintained by the database and need no rebuild.
+
+    Returns:
+        dict: {entity: rows indexed} (empty when there is nothing to rebuild)
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or backend(using) != 'sqlite':
+        return {}
+    report = {}
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for entity in entities or SEARCH_SPECS:
+            fields = SEARCH_SPECS[entity][1]
+            model = _model(entity, get_model)
+            columns = ', '.join(f"coalesce({connection.ops.quote_name(name)}, '')" for name in fields)
+            for table in _sqlite_tables(entity, using):
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(
+                    f"INSERT INTO {table} (rowid, {', '.join(fields)}) "
+                    f"SELECT {connection.ops.quote_name(model._meta.pk.column)}, {columns} "
+                    f"FROM {connection.ops.quote_name(model._meta.db_table)}"
+                )
+            report[entity] = cursor.rowcount
+    return report
+
+
+# -------- Queries ---------
+
+def _match(entity, kind, query_terms, model, connection):
+    """(id subquery, rank expression) for the full-text match of `query_terms`."""
+    fields = SEARCH_SPECS[entity][1]
+    db_table = model._meta.db_table
+    pk = f'{connection.ops.quote_name(db_table)}.{connection.ops.quote_name(model._meta.pk.column)}'
+    if kind == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in query_terms)
+        ids = RawSQL(
+            f"SELECT {connection.ops.quote_name(model._meta.pk.column)} "
+            f"FROM {connection.ops.quote_name(db_table)} "
+            f"WHERE {_vector_sql(connection, fields)} @@ to_tsquery('simple', %s)",
+            [tsquery],
+        )
+        rank = RawSQL(
+            f"ts_rank({_vector_sql(connection, fields, db_table)}, to_tsquery('simple', %s))",
+            [tsquery],
+            output_field=FloatField(),
+        )
+        return ids, rank
+
+    table = shadow_table(entity)
+    match = ' '.join(f'"{term}"*' for term in query_terms)
+    ids = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+    # bm25() is lower-is-better; negate it so both backends rank descending
+    rank = RawSQL(
+        f'SELECT -bm25({table}) FROM {table} WHERE {table} MATCH %s AND rowid = {pk}',
+        [match],
+        output_field=FloatField(),
+    )
+    return ids, rank
+
+
+def substring_filter(entity, query):
+    """The icontains OR-chain over the entity's fields, for databases without a text index."""
+    condition = Q()
+    for name in SEARCH_SPECS[entity][1]:
+        condition |= Q(**{f'{name}__icontains': query})
+    return condition
+
+
+def _substring_ids(entity, kind, query, model, connection):
+    """
+    Id subquery for the substring match, or None where only a scan can answer it
+    (SQLite without the trigram table, or a query shorter than a trigram).
+    """
+    if kind == 'postgresql':
+        # Only the pg_trgm-indexed columns: one unindexed ILIKE would scan the table
+        columns = SEARCH_SPECS[entity][2]
+        pattern = f'%{connection.ops.prep_for_like_query(query)}%'
+        condition = ' OR '.join(f'{connection.ops.quote_name(name)} ILIKE %s' for name in columns)
+        return RawSQL(
+            f"SELECT {connection.ops.quote_name(model._meta.pk.column)} "
+            f"FROM {connection.ops.quote_name(model._meta.db_table)} WHERE {condition}",
+            [pattern] * len(columns),
+        )
+    if len(query) < MIN_TRIGRAM_QUERY or trigram_table(entity) not in _sqlite_tables(entity, connection.alias):
+        return None
+    table = trigram_table(entity)
+    # One quoted phrase: trigram FTS5 matches it as a case-insensitive substring of any column
+    phrase = '"' + query.replace('"', '""') + '"'
+    return RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [phrase])
+
+
+def _union(*subqueries):
+    """One id subquery returning the rows of all of `subqueries`; each keeps its own index."""
+    return RawSQL(
+        ' UNION '.join(subquery.sql for subquery in subqueries),
+        [param for subquery in subqueries for param in subquery.params],
+    )
+
+
+def filter_queryset(queryset, query, rank=False):
+    """
+    Restrict `queryset` to rows matching the search text.
+
+    Args:
+        queryset: Queryset of a model listed in SEARCH_SPECS
+        query: Raw user input
+        rank: Annotate `search_rank` (higher is better) and order by it; only
+              for top-level querysets, not ones used as a subquery
+
+    Returns:
+        QuerySet: The filtered queryset (unchanged if `query` is blank)
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    entity = entity_for(queryset.model)
+    query_terms = terms(query)
+    kind = backend(queryset.db)
+    if entity is None or kind is None or not query_terms:
+        return queryset.filter(substring_filter(entity, query)) if entity else queryset
+
+    connection = connections[queryset.db]
+    ids, rank_expression = _match(entity, kind, query_terms, queryset.model, connection)
+    substring_ids = _substring_ids(entity, kind, query, queryset.model, connection)
+    if substring_ids is None:
+        queryset = queryset.filter(Q(pk__in=ids) | substring_filter(entity, query))
+    else:
+        queryset = queryset.filter(pk__in=_union(ids, substring_ids))
+    if rank:
+        # Substring-only hits have no (SQLite) or a zero (PostgreSQL) rank and come last
+        queryset = queryset.annotate(search_rank=rank_expression).order_by(
+            F('search_rank').desc(nulls_last=True), *queryset.query.order_by
+        )
+    return queryset
@@ -1,14 +1,14 @@
 import logging
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, post_init
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.dispatch import receiver
-from django.forms.models import model_to_dict
 from django.apps import apps
 from django.db import connection
-from .models import Profile, ActivityLog, Registration, Candidate
+from .models import Profile, ActivityLog, Registration, Candidate, AgricultureProgram, StatsCounter
+from . import audit, candidate_sync, counters, search, storage
 from .middleware import get_request_user, get_request_ip, get_request_session_key
-from .utils.file_tracker import register_model_files
+from .utils.file_tracker import register_model_files, remember_upload_digests
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +21,10 @@ def create_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 # -------- Generic CRUD auditing ---------
-_pre_save_cache = {}
 _activitylog_table_exists = None
+_statscounter_table_exists = None
+# Models never audited: the log itself and the derived counter rows
+_AUDIT_EXCLUDED_LABELS = {'core.ActivityLog', 'core.StatsCounter'}
 
 
 def _activitylog_ready():
@@ -35,67 +37,46 @@ def _activitylog_ready():
             _activitylog_table_exists = False
     return _activitylog_table_exists
 
+def _statscounter_ready():
+    global _statscounter_table_exists
+    if _statscounter_table_exists is None:
+        try:
+            tables = set(connection.introspection.table_names())
+            _statscounter_table_exists = StatsCounter._meta.db_table in tables
+        except Exception:
+            _statscounter_table_exists = False
+    return _statscounter_table_exists
+
 def _model_label(instance):
     return f"{instance._meta.app_label}.{instance.__class__.__name__}"
 
-def _serialize_instance(instance):
-    """Serialize model instance to a plain dict of editable concrete field values.
-    ForeignKey fields will be stored as their raw id value.
-    """
-    data = {}
-    for field in instance._meta.get_fields():
-        if not getattr(field, 'concrete', False):
-            continue
-        if getattr(field, 'many_to_many', False) or getattr(field, 'one_to_many', False):
-            continue  # skip relations that need separate queries
-        if hasattr(field, 'attname'):
-            name = field.attname.replace('_id', '') if field.is_relation else field.attname
-        else:
-            name = field.name
-        try:
-            val = getattr(instance, field.attname if hasattr(field, 'attname') else field.name)
-        except Exception:
-            continue
-        # For bytes/files use string representation
-        if hasattr(val, 'name'):
-            val = val.name
-        data[name] = val
-    return data
+def _is_audited(instance):
+    # Only audit our app models, never ActivityLog itself (recursion) or derived rows
+    return (
+        hasattr(instance, '_meta')
+        and instance._meta.app_label == 'core'
+        and _model_label(instance) not in _AUDIT_EXCLUDED_LABELS
+    )
+
+@receiver(post_init)
+def track_audit_state(sender, instance, **kwargs):
+    """Remember loaded field values so the next save can be logged as a diff."""
+    if _is_audited(instance):
+        audit.track_loaded_state(instance)
 
 @receiver(pre_save)
 def log_pre_save(sender, instance, **kwargs):
-    # Only track project models, skip Django internal apps
-    if not hasattr(instance, '_meta'):
-        return
-    label = _model_label(instance)
-    # Avoid logging ActivityLog itself to prevent recursion
-    if label == 'core.ActivityLog':
-        return
-    # Only audit our app models
-    if instance._meta.app_label != 'core':
+    if not _is_audited(instance):
         return
-    if instance.pk:
-        # Existing -> capture before snapshot
-        try:
-            existing = sender.objects.get(pk=instance.pk)
-            _pre_save_cache[(label, instance.pk)] = _serialize_instance(existing)
-        except sender.DoesNotExist:
-            _pre_save_cache[(label, instance.pk)] = None
-    else:
-        _pre_save_cache[(label, None)] = None
+    # Instances built with an explicit pk were never loaded; fetch their row once
+    audit.ensure_loaded_state(instance, sender)
 
 @receiver(post_save)
-def log_post_save(sender, instance, created, **kwargs):
-    if not hasattr(instance, '_meta'):
+def log_post_save(sender, instance, created, update_fields=None, **kwargs):
+    if not _is_audited(instance):
         return
     label = _model_label(instance)
-    if label == 'core.ActivityLog':
-        return
-    if instance._meta.app_label != 'core':
-        return
-    after = _serialize_instance(instance)
-    key = (label, instance.pk if not created else None)
-    before = _pre_save_cache.pop(key, None)
+    before, after = audit.change_set(instance, created, update_fields)
     action = ActivityLog.ACTION_CREATE if created else ActivityLog.ACTION_UPDATE
     if not _activitylog_ready():
         return
@@ -103,7 +84,7 @@ def log_post_save(sender, instance, created, **kwargs):
     if user and not user.is_authenticated:
         user = None
     try:
-        ActivityLog.objects.create(
+        audit.record(
             user=user,
             action_type=action,
             model_name=label,
@@ -118,21 +99,17 @@ def log_post_save(sender, instance, created, **kwargs):
 
 @receiver(pre_delete)
 def log_pre_delete(sender, instance, **kwargs):
-    if not hasattr(instance, '_meta'):
+    if not _is_audited(instance):
         return
     label = _model_label(instance)
-    if label == 'core.ActivityLog':
-        return
-    if instance._meta.app_label != 'core':
-        return
-    before = _serialize_instance(instance)
+    before = audit.serialize_instance(instance)
     if not _activitylog_ready():
         return
     user = get_request_user()
     if user and not user.is_authenticated:
         user = None
     try:
-        ActivityLog.objects.create(
+        audit.record(
             user=user,
             action_type=ActivityLog.ACTION_DELETE,
             model_name=label,
@@ -145,11 +122,99 @@ def log_pre_delete(sender, instance, **kwargs):
     except Exception:
         logger.exception('Failed to write ActivityLog (DELETE) for %s', label)
 
+# -------- Statistics counters ---------
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=AgricultureProgram)
+@receiver(post_init, sender=Registration)
+@receiver(post_init, sender=Candidate)
+@receiver(post_init, sender=ActivityLog)
+def track_counter_state(sender, instance, **kwargs):
+    """Remember the loaded status/period so later saves can move the counter."""
+    counters.track_instance_state(instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=AgricultureProgram)
+@receiver(post_save, sender=Registration)
+@receiver(post_save, sender=Candidate)
+@receiver(post_save, sender=ActivityLog)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not _statscounter_ready():
+        return
+    try:
+        counters.record_save(instance, created)
+    except Exception:
+        logger.exception('Failed to update stats counters for %s', _model_label(instance))
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=AgricultureProgram)
+@receiver(post_delete, sender=Registration)
+@receiver(post_delete, sender=Candidate)
+@receiver(post_delete, sender=ActivityLog)
+def update_counters_on_delete(sender, instance, **kwargs):
+    if not _statscounter_ready():
+        return
+    try:
+        counters.record_delete(instance)
+    except Exception:
+        logger.exception('Failed to update stats counters (DELETE) for %s', _model_label(instance))
+
+# -------- Blob references ---------
+
+@receiver(post_init, sender=Profile)
+@receiver(post_init, sender=Registration)
+@receiver(post_init, sender=Candidate)
+def track_blob_names(sender, instance, **kwargs):
+    """Remember the loaded document names so saves can move blob references."""
+    storage.track_instance_names(instance)
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Registration)
+@receiver(post_save, sender=Candidate)
+def track_blob_references(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    try:
+        storage.record_save(instance, update_fields)
+    except Exception:
+        logger.exception('Failed to update blob references for %s', _model_label(instance))
+
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=Registration)
+@receiver(post_delete, sender=Candidate)
+def release_blob_references(sender, instance, **kwargs):
+    try:
+        storage.record_delete(instance)
+    except Exception:
+        logger.exception('Failed to release blob references (DELETE) for %s', _model_label(instance))
+
+# -------- Search index ---------
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=AgricultureProgram)
+@receiver(post_save, sender=Candidate)
+def update_search_index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    try:
+        search.index_instance(instance, update_fields=update_fields)
+    except Exception:
+        logger.exception('Failed to update search index for %s', _model_label(instance))
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=AgricultureProgram)
+@receiver(post_delete, sender=Candidate)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    try:
+        search.remove_instance(instance)
+    except Exception:
+        logger.exception('Failed to update search index (DELETE) for %s', _model_label(instance))
+
 # -------- Auth auditing ---------
 
 @receiver(user_logged_in)
 def on_user_logged_in(sender, request, user, **kwargs):
-    ActivityLog.objects.create(
+    audit.record(
         user=user,
         action_type=ActivityLog.ACTION_LOGIN,
         model_name='auth.User',
@@ -162,7 +227,7 @@ def on_user_logged_in(sender, request, user, **kwargs):
 
 @receiver(user_logged_out)
 def on_user_logged_out(sender, request, user, **kwargs):
-    ActivityLog.objects.create(
+    audit.record(
         user=user,
         action_type=ActivityLog.ACTION_LOGOUT,
         model_name='auth.User',
@@ -176,7 +241,7 @@ def on_user_logged_out(sender, request, user, **kwargs):
 @receiver(user_login_failed)
 def on_user_login_failed(sender, credentials, request, **kwargs):
     username = credentials.get('username') if isinstance(credentials, dict) else ''
-    ActivityLog.objects.create(
+    audit.record(
         user=None,
         action_type=ActivityLog.ACTION_FAILED_LOGIN,
         model_name='auth.User',
@@ -201,100 +266,28 @@ def save_profile(sender, instance, **kwargs):
 
 # -------- File Upload Tracking ---------
 
+@receiver(pre_save, sender=Profile)
+@receiver(pre_save, sender=Registration)
+@receiver(pre_save, sender=Candidate)
+def keep_upload_digests(sender, instance, **kwargs):
+    """
+    Carry the SHA-256 computed by the upload handler past the save, which swaps each
+    upload for a FieldFile of the stored copy, so registering the file does not re-read it.
+    """
+    remember_upload_digests(instance, sender.__name__)
+
+
 @receiver(post_save, sender=Profile)
 def track_profile_files(sender, instance, created, **kwargs):
     """
     Automatically register file uploads from Profile model to UploadedFile tracking system.
-    Only registers NEW or CHANGED files by comparing file hash.
+    Profiles are re-saved on every User save (logins included), so unchanged files are
+    recognised from their stored size/mtime and never re-read; new or replaced files are
+    hashed once.
     """
     if instance.user and instance.pk:
         try:
-            from core.models import UploadedFile
-            
-            document_fields = [
-                'profile_image', 'license_scan', 'passport_scan', 'academic_certificate',
-                'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
-            ]
-            
-            # Quick check: does this profile have ANY files at all?
-            has_any_file = False
-            for field_name in document_fields:
-                current_file = getattr(instance, field_name, None)
-                if current_file and hasattr(current_file, 'name') and current_file.name:
-                    has_any_file = True
-                    break
-            
-            if not has_any_file:
-                return
-            
-            # Track which files we process to avoid duplicate processing
-            for field_name in document_fields:
-                current_file = getattr(instance, field_name, None)
-                
-                # Only process if there's a file
-                if current_file and hasattr(current_file, 'name') and current_file.name:
-                    try:
-                        # Calculate hash of current file
-                        # Use its current open state if possible, otherwise open carefully
-                        is_opened = hasattr(current_file, 'file') and current_file.file is not None
-                        
-                        try:
-                            if not is_opened:
-                                current_file.open('rb')
-                            else:
-                                current_file.seek(0)
-                                
-                            current_hash = UploadedFile.calculate_file_hash(current_file)
-                            current_file.seek(0) # Always reset pointer after reading
-                        finally:
-                            if not is_opened:
-                                current_file.close()
-
-                        # Get existing record for this field
-                        existing_record = UploadedFile.objects.filter(
-                            user=instance.user,
-                            document_type=field_name,
-                            is_active=True
-                        ).first()
-                        
-                        # Check if this file is different from what we have recorded
-                        should_register = False
-                        
-                        if not existing_record:
-                            # No existing record - this is a new upload
-                            should_register = True
-                        elif existing_record.file_hash != current_hash:
-                            # Hash changed - user replaced the file
-                            should_register = True
-                            # Deactivate the old record since it's being replaced
-                            existing_record.is_active = False
-                            existing_record.save()
-                        # else: Same file, same field - don't re-register
-                        
-                        if should_register:
-                            # Register with UploadedFile
-                            is_opened = hasattr(current_file, 'file') and current_file.file is not None
-                            try:
-                                if not is_opened:
-                                    current_file.open('rb')
-                                else:
-                                    current_file.seek(0)
-                                    
-                                UploadedFile.register_upload(
-                                    user=instance.user,
-                                    document_type=field_name,
-                                    file_obj=current_file,
-                                    model_name='Profile',
-                                    model_id=instance.pk
-                                )
-                                current_file.seek(0) # Reset after registration
-                            finally:
-                                if not is_opened:
-                                    current_file.close()
-                            
-                    except Exception as file_error:
-                        logger.warning(f"Error processing file {field_name} for profile {instance.pk}: {str(file_error)}")
-                        
+            register_model_files(instance, instance.user, 'Profile')
         except Exception as e:
             logger.error(f"Error tracking Profile files for user {instance.user.username}: {str(e)}")
 
@@ -304,59 +297,13 @@ def sync_profile_documents_to_candidates(sender, instance, created, **kwargs):
     """
     Automatically sync documents from Profile to all associated Candidate records.
     When user updates their profile documents, all their candidate applications get updated.
+    The profile view sets `_defer_candidate_sync` and runs the full sync itself, once.
     """
-    if not instance.user or not instance.pk:
+    if not instance.user or not instance.pk or getattr(instance, '_defer_candidate_sync', False):
         return
     
     try:
-        # Find all candidates created by this user
-        candidates = Candidate.objects.filter(created_by=instance.user)
-        
-        if not candidates.exists():
-            return
-        
-        # Document field mapping: Profile field -> Candidate field
-        document_mapping = {
-            'profile_image': 'profile_image',
-            'license_scan': 'license_scan',
-            'passport_scan': 'passport_scan',
-            'academic_certificate': 'academic_certificate',
-            'tor': 'tor',
-            'nc2_tesda': 'nc2_tesda',
-            'diploma': 'diploma',
-            'good_moral': 'good_moral',
-            'nbi_clearance': 'nbi_clearance',
-        }
-        
-        # Update each candidate
-        updated_count = 0
-        for candidate in candidates:
-            updated = False
-            
-            for profile_field, candidate_field in document_mapping.items():
-                profile_file = getattr(instance, profile_field, None)
-                current_candidate_file = getattr(candidate, candidate_field, None)
-                
-                # Sync the file (copy reference from profile to candidate)
-                if profile_file and hasattr(profile_file, 'name') and profile_file.name:
-                    # Profile has a file - copy it to candidate
-                    if not current_candidate_file or current_candidate_file.name != profile_file.name:
-                        setattr(candidate, candidate_field, profile_file)
-                        updated = True
-                        logger.info(f"Synced {profile_field} from profile to candidate {candidate.pk}")
-                elif not profile_file and current_candidate_file:
-                    # Profile file was removed - remove from candidate too
-                    setattr(candidate, candidate_field, None)
-                    updated = True
-                    logger.info(f"Removed {candidate_field} from candidate {candidate.pk} (removed from profile)")
-            
-            if updated:
-                candidate.save()
-                updated_count += 1
-        
-        if updated_count > 0:
-            logger.info(f"Synced documents from profile {instance.pk} to {updated_count} candidate(s)")
-    
+        candidate_sync.sync_candidates_from_profile(instance, documents_only=True)
     except Exception as e:
         logger.error(f"Error syncing Profile documents to Candidates for user {instance.user.username}: {str(e)}")
 
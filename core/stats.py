@@ -0,0 +1,197 @@
+"""
+Dashboard statistics engine for AgroStudies.
+
+Every figure shown on the staff dashboard, the exported analytics report and the
+Unfold admin dashboard is computed here from the maintained StatsCounter rows
+(see core/counters.py) plus a handful of grouped aggregate queries, instead of
+one COUNT per status and per month.
+
+The result is a plain dict of ints, lists and dicts so it can be cached or
+serialised as JSON without any conversion.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .cache_utils import CANDIDATES, PROGRAMS, USERS, get_or_compute, warmable
+from .counters import get_counter_rows, totals_by_status
+from .models import AgricultureProgram, Candidate, Registration
+
+
+def _sorted_counts(counts, key_name, reverse_key=False, limit=None):
+    """Turn a {key: count} mapping into a list of {key_name: key, 'count': n} dicts."""
+    if reverse_key:
+        items = sorted(counts.items(), key=lambda item: item[0], reverse=True)
+    else:
+        items = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    rows = [{key_name: key, 'count': count} for key, count in items]
+    return rows[:limit] if limit else rows
+
+
+def _candidate_status_stats(candidate_rows, current_year):
+    """Status totals, applicants per year and monthly applications from counter rows."""
+    status_counts = {status: 0 for status, _ in Candidate.STATUS_CHOICES}
+    per_year = defaultdict(int)
+    monthly = [0] * 12
+
+    for (status, period), count in candidate_rows.items():
+        status_counts[status] = status_counts.get(status, 0) + count
+        if not period:
+            continue
+        year, month = (int(part) for part in period.split('-'))
+        per_year[year] += count
+        if year == current_year:
+            monthly[month - 1] += count
+
+    return status_counts, per_year, monthly
+
+
+def _approved_timeline_stats(current_year):
+    """Deployed per year and monthly approvals, bucketed on updated_at (one query)."""
+    per_year = defaultdict(int)
+    monthly = [0] * 12
+
+    rows = Candidate.objects.filter(status=Candidate.APPROVED).annotate(
+        year=ExtractYear('updated_at'),
+        month=ExtractMonth('updated_at'),
+    ).values('year', 'month').annotate(count=Count('id')).order_by()
+
+    for row in rows:
+        per_year[row['year']] += row['count']
+        if row['year'] == current_year:
+            monthly[row['month'] - 1] += row['count']
+
+    return per_year, monthly
+
+
+def _approved_program_stats():
+    """Deployed per program and per farm location (one query)."""
+    per_program = defaultdict(int)
+    per_farm = defaultdict(int)
+
+    rows = Candidate.objects.filter(
+        status=Candidate.APPROVED, program__isnull=False
+    ).values('program__title', 'program__location', 'program__country').annotate(
+        count=Count('id')
+    ).order_by()
+
+    for row in rows:
+        per_program[row['program__title']] += row['count']
+        per_farm[(row['program__location'], row['program__country'])] += row['count']
+
+    deployed_per_program = _sorted_counts(per_program, 'program__title', limit=10)
+    deployed_per_farm = [
+        {'program__location': location, 'program__country': country, 'count': count}
+        for (location, country), count in sorted(per_farm.items(), key=lambda item: item[1], reverse=True)
+    ][:10]
+    return deployed_per_program, deployed_per_farm
+
+
+def _approved_demographic_stats():
+    """Deployed per university (SUC) and per sex (one query)."""
+    per_suc = defaultdict(int)
+    per_sex = defaultdict(int)
+
+    rows = Candidate.objects.filter(status=Candidate.APPROVED).values(
+        'university', 'gender'
+    ).annotate(count=Count('id')).order_by()
+
+    for row in rows:
+        if row['university']:
+            per_suc[row['university']] += row['count']
+        per_sex[row['gender']] += row['count']
+
+    return _sorted_counts(per_suc, 'university', limit=10), _sorted_counts(per_sex, 'gender')
+
+
+def compute_dashboard_stats(now=None):
+    """
+    Compute every dashboard figure with a fixed number of queries.
+
+    Args:
+        now: Reference datetime (defaults to timezone.now()), used for the
+             current year and the active-program cut-off.
+
+    Returns:
+        dict: JSON-serialisable snapshot of dashboard statistics.
+    """
+    now = now or timezone.now()
+    current_year = now.year
+
+    counter_rows = get_counter_rows(['user', 'program', 'registration', 'candidate'])
+    status_counts, applicants_per_year, monthly_applications = _candidate_status_stats(
+        counter_rows['candidate'], current_year
+    )
+    deployed_per_year, monthly_approved = _approved_timeline_stats(current_year)
+    deployed_per_program, deployed_per_farm = _approved_program_stats()
+    deployed_per_suc, deployed_per_sex = _approved_demographic_stats()
+
+    user_totals = totals_by_status(counter_rows['user'])
+    staff_count = sum(count for status, count in user_totals.items() if status.startswith('staff:'))
+    total_users = sum(user_totals.values())
+    registration_totals = totals_by_status(counter_rows['registration'])
+    # "Active" depends on the current time, so it cannot be a maintained counter
+    active_programs = AgricultureProgram.objects.filter(
+        Q(registration_deadline__gte=now) |
+        Q(registration_deadline__isnull=True, start_date__gte=now.date())
+    ).count()
+
+    approved = status_counts[Candidate.APPROVED]
+    rejected = status_counts[Candidate.REJECTED]
+    total_processed = approved + rejected
+    approval_rate = round((approved / total_processed * 100) if total_processed > 0 else 0)
+
+    return {
+        'generated_at': now.isoformat(),
+        'current_year': current_year,
+        # Users
+        'total_users': total_users,
+        'staff_count': staff_count,
+        'non_staff_users': total_users - staff_count,
+        # Programs
+        'total_programs': sum(totals_by_status(counter_rows['program']).values()),
+        'active_programs': active_programs,
+        # Registrations
+        'total_registrations': sum(registration_totals.values()),
+        'pending_registrations': registration_totals.get(Registration.PENDING, 0),
+        'approved_registrations': registration_totals.get(Registration.APPROVED, 0),
+        'rejected_registrations': registration_totals.get(Registration.REJECTED, 0),
+        # Candidates
+        'total_candidates': sum(status_counts.values()),
+        'candidate_status_counts': status_counts,
+        'draft_count': status_counts[Candidate.DRAFT],
+        'missing_docs_count': status_counts[Candidate.MISSING_DOCS],
+        'validated_count': status_counts[Candidate.VALIDATED],
+        'approved_candidates': approved,
+        'rejected_candidates': rejected,
+        'pending_applications': status_counts[Candidate.MISSING_DOCS] + status_counts[Candidate.VALIDATED],
+        'total_processed': total_processed,
+        'total_approved_decisions': approved,
+        'approval_rate': approval_rate,
+        # Charts
+        'monthly_applications': monthly_applications,
+        'monthly_approved': monthly_approved,
+        # Reports
+        'applicants_per_year': _sorted_counts(applicants_per_year, 'year', reverse_key=True),
+        'deployed_per_year': _sorted_counts(deployed_per_year, 'year', reverse_key=True),
+        'deployed_per_program': deployed_per_program,
+        'deployed_per_farm': deployed_per_farm,
+        'deployed_per_suc': deployed_per_suc,
+        'deployed_per_sex': deployed_per_sex,
+        'total_deployed': approved,
+    }
+
+
+@warmable('dashboard_stats')
+def cached_dashboard_stats():
+    """
+    The dashboard snapshot through the two-tier hot cache.
+
+    Program, candidate, registration and account changes bump the namespaces
+    it is stored under; the "active programs" figure is time dependent and may
+    lag by up to CACHE_TTL['default'].
+    """
+    return get_or_compute('dashboard_stats', compute_dashboard_stats, namespaces=(PROGRAMS, CANDIDATES, USERS))
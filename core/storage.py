@@ -0,0 +1,419 @@
+"""
+Content-addressed, deduplicated storage for applicant documents.
+
+ContentAddressedStorage stores each distinct file once, under its SHA-256:
+blobs/<2 hex>/<sha256><ext>. The upload_to directory and the file name are
+ignored. Files go to whatever storages['default'] is: FileSystemStorage
+under MEDIA_ROOT locally, or an S3 storage from django-storages when
+STORAGES['default'] points there. The same scan saved as a profile TOR, a
+registration TOR and a candidate passport is one blob. Copying a document
+from a profile to a candidate copies the name, never the bytes.
+
+A blob lives as long as some row references it. StoredBlob.refcount counts
+the document fields of Profile, Registration and Candidate rows that name
+it. Signals in core/signals.py maintain the count on save and delete (see
+`track_blob_references`). The blob is deleted once its count reaches zero.
+An upload claims its blob (StoredBlob.claimed_at) before the file write is
+skipped or done, and the reference the row adds clears the claim. Deletion
+leaves freshly claimed blobs alone and removes the file while it holds the
+row, so an upload racing a release never ends up naming a deleted file.
+Bulk updates bypass the signals; `manage.py dedupe_media` recounts from the
+rows, deletes unreferenced blobs and moves pre-existing files into the
+store.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import Storage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs/'
+BLOB_NAME_RE = re.compile(r'^blobs/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$')
+
+# How long an upload's claim protects an unreferenced blob; a claim outlives its
+# reference only when the row save failed, dedupe_media cleans those up
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+# Document fields stored in the blob store, per model
+BLOB_FIELDS = {
+    'Profile': [
+        'profile_image', 'license_scan', 'passport_scan', 'academic_certificate',
+        'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance',
+    ],
+    'Registration': ['tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'],
+    'Candidate': [
+        'profile_image', 'license_scan', 'passport_scan', 'academic_certificate',
+        'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance',
+    ],
+}
+
+
+def blob_hash(name):
+    """The SHA-256 a blob name was derived from, or None for any other name"""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group('sha256') if match else None
+
+
+def blob_name(sha256, original_name):
+    ext = os.path.splitext(original_name or '')[1].lower()
+    if not re.fullmatch(r'\.[a-z0-9]{1,8}', ext):
+        ext = ''
+    return f'{BLOB_PREFIX}{sha256[:2]}/{sha256}{ext}'
+
+
+def _content_hash(content):
+    # Uploads hashed by core.uploads carry their digest
+    precomputed = getattr(content, 'sha256', None)
+    if precomputed:
+        return precomputed
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+@deconstructible(path='core.storage.ContentAddressedStorage')
+class ContentAddressedStorage(Storage):
+    """Stores each distinct content once under blobs/, delegating I/O to `backing` (default storage)."""
+
+    def __init__(self, backing_alias='default'):
+        self.backing_alias = backing_alias
+
+    @property
+    def backing(self):
+        return storages[self.backing_alias]
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        target = blob_name(_content_hash(content), name)
+        claim(target)
+        if self.backing.exists(target):
+            # Already stored: same hash, same bytes, and claimed so a pending release keeps it
+            return target
+        stored = self.backing.save(target, content, max_length=max_length)
+        if stored != target:
+            # Another request stored the same content concurrently; keep one copy
+            self.backing.delete(stored)
+        return target
+
+    def generate_filename(self, filename):
+        # Only the extension of the name survives, see save()
+        return filename
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _open(self, name, mode='rb'):
+        return self.backing.open(name, mode)
+
+    def delete(self, name):
+        """Remove the file now. Blobs are normally released through `release` instead."""
+        self.backing.delete(name)
+
+    def exists(self, name):
+        return self.backing.exists(name)
+
+    def listdir(self, path):
+        return self.backing.listdir(path)
+
+    def size(self, name):
+        return self.backing.size(name)
+
+    def url(self, name):
+        return self.backing.url(name)
+
+    def path(self, name):
+        return self.backing.path(name)
+
+    def get_accessed_time(self, name):
+        return self.backing.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backing.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backing.get_modified_time(name)
+
+
+document_storage_instance = ContentAddressedStorage()
+
+
+def document_storage():
+    """Storage of the applicant document fields (a callable, so migrations do not pin the backend)"""
+    return document_storage_instance
+
+
+# -------- Reference counting ---------
+
+def claim(name):
+    """
+    Protect a blob from deletion until the row naming it is saved. Waits for a deletion
+    in progress (it holds the row), so the caller's exists() check sees its outcome.
+    """
+    from .models import StoredBlob
+
+    now = timezone.now()
+    if StoredBlob.objects.filter(name=name).update(claimed_at=now):
+        return
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=name, refcount=0, claimed_at=now)
+    except IntegrityError:
+        StoredBlob.objects.filter(name=name).update(claimed_at=now)
+
+
+def add_reference(name):
+    from .models import StoredBlob
+
+    if not blob_hash(name):
+        return
+    if StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, claimed_at=None):
+        return
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=name, refcount=1)
+    except IntegrityError:
+        StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, claimed_at=None)
+
+
+def release(name):
+    """Drop one reference to a blob; the blob is deleted after commit once nothing references it."""
+    from .models import StoredBlob
+
+    if not blob_hash(name):
+        return
+    StoredBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+    transaction.on_commit(lambda: delete_if_unreferenced(name))
+
+
+def adjust_references(deltas):
+    """
+    Apply {blob name: reference delta} in one UPDATE per distinct delta (bulk writes bypass
+    the signals). Blobs dropping to zero are deleted after commit.
+    """
+    from .models import StoredBlob
+
+    by_delta = defaultdict(list)
+    for name, delta in deltas.items():
+        if delta and blob_hash(name):
+            by_delta[delta].append(name)
+    released = []
+    for delta, names in by_delta.items():
+        if delta < 0:
+            StoredBlob.objects.filter(name__in=names, refcount__gt=0).update(
+                refcount=Greatest(F('refcount') + delta, 0)
+            )
+            released.extend(names)
+            continue
+        if StoredBlob.objects.filter(name__in=names).update(refcount=F('refcount') + delta, claimed_at=None) < len(names):
+            # Blobs without a row yet (rare: stored outside the signals)
+            existing = set(StoredBlob.objects.filter(name__in=names).values_list('name', flat=True))
+            for name in names:
+                if name not in existing:
+                    for _ in range(delta):
+                        add_reference(name)
+    if released:
+        transaction.on_commit(lambda: delete_unreferenced(released))
+
+
+def delete_unreferenced(names):
+    """
+    Delete the blobs among `names` that nothing references or claims; returns the deleted
+    names. The files are removed before the rows' deletion commits: an upload claiming
+    one of them meanwhile waits, then finds neither row nor file and stores it again.
+    """
+    from .models import StoredBlob
+
+    deletable = Q(name__in=names, refcount=0) & (
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=timezone.now() - CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        unreferenced = list(StoredBlob.objects.select_for_update().filter(deletable).values_list('name', flat=True))
+        if not unreferenced:
+            return []
+        StoredBlob.objects.filter(deletable, name__in=unreferenced).delete()
+        for name in unreferenced:
+            try:
+                document_storage_instance.delete(name)
+            except Exception as e:
+                logger.warning(f"Could not delete blob {name}: {str(e)}")
+    return unreferenced
+
+
+def delete_if_unreferenced(name):
+    return bool(delete_unreferenced([name]))
+
+
+def discard_file(field_file):
+    """
+    Delete a file a document field no longer points to. Blobs are shared, so they are
+    left to their reference count; files stored before the blob store are removed now.
+    """
+    name = getattr(field_file, 'name', None)
+    if not name or blob_hash(name):
+        return
+    try:
+        if field_file.storage.exists(name):
+            field_file.storage.delete(name)
+    except Exception as e:
+        logger.warning(f"Could not delete file {name}: {str(e)}")
+
+
+def stored_names(instance, model_name):
+    """
+    {field: stored file name or None} of an instance's loaded blob fields. Nothing is
+    opened; deferred fields are left out since their value is unknown.
+    """
+    names = {}
+    for field_name in BLOB_FIELDS.get(model_name, []):
+        if field_name in instance.__dict__:
+            value = instance.__dict__[field_name]
+            names[field_name] = getattr(value, 'name', value) or None
+    return names
+
+
+def track_instance_names(instance):
+    """Remember the loaded file names so later saves can move references."""
+    instance._stored_blob_names = stored_names(instance, type(instance).__name__)
+
+
+def record_save(instance, update_fields=None):
+    """Add references for newly named blobs and release the ones the row stopped naming."""
+    previous = getattr(instance, '_stored_blob_names', {})
+    current = stored_names(instance, type(instance).__name__)
+    for field_name, name in current.items():
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        # A field absent from `previous` was deferred when loaded: its old value is unknown
+        old = previous.get(field_name) if field_name in previous else name
+        if name == old:
+            continue
+        if name:
+            add_reference(name)
+        if old:
+            release(old)
+    instance._stored_blob_names = current
+
+
+def record_bulk_save(instances):
+    """record_save for instances written together with bulk_update."""
+    deltas = Counter()
+    for instance in instances:
+        previous = getattr(instance, '_stored_blob_names', {})
+        current = stored_names(instance, type(instance).__name__)
+        for field_name, name in current.items():
+            old = previous.get(field_name) if field_name in previous else name
+            if name == old:
+                continue
+            if name:
+                deltas[name] += 1
+            if old:
+                deltas[old] -= 1
+        instance._stored_blob_names = current
+    adjust_references(deltas)
+
+
+def record_delete(instance):
+    for name in getattr(instance, '_stored_blob_names', {}).values():
+        if name:
+            release(name)
+
+
+# -------- Reconciliation ---------
+
+def _stored_blob_files():
+    backing = document_storage_instance
+    if not backing.exists(BLOB_PREFIX.rstrip('/')):
+        return []
+    names = []
+    for directory in backing.listdir(BLOB_PREFIX.rstrip('/'))[0]:
+        for file_name in backing.listdir(f'{BLOB_PREFIX}{directory}')[1]:
+            name = f'{BLOB_PREFIX}{directory}/{file_name}'
+            if blob_hash(name):
+                names.append(name)
+    return names
+
+
+def reconcile_blobs(dry_run=False):
+    """
+    Move pre-existing document files into the blob store, recount every StoredBlob from the
+    Profile, Registration and Candidate rows, and delete blobs nothing references.
+
+    Returns {'migrated': [legacy names], 'missing': [names], 'drifted': [(name, stored, actual)],
+    'deleted': [blob names]}.
+    """
+    from .models import StoredBlob
+
+    report = {'migrated': [], 'missing': [], 'drifted': [], 'deleted': []}
+    moved = {}  # legacy name -> blob name, a legacy file shared by several rows is read once
+    references = Counter()
+
+    for model_name, fields in BLOB_FIELDS.items():
+        model = apps.get_model('core', model_name)
+        for pk, *names in model.objects.values_list('pk', *fields).iterator():
+            for field_name, name in zip(fields, names):
+                if not name:
+                    continue
+                if not blob_hash(name):
+                    if name not in moved:
+                        if not document_storage_instance.exists(name):
+                            report['missing'].append(name)
+                            continue
+                        report['migrated'].append(name)
+                        if dry_run:
+                            moved[name] = None
+                        else:
+                            with document_storage_instance.open(name, 'rb') as legacy:
+                                moved[name] = document_storage_instance.save(name, File(legacy, name))
+                    if moved[name] is None:
+                        continue
+                    # A queryset update: the reference is counted below, not by the signals
+                    model.objects.filter(pk=pk, **{field_name: name}).update(**{field_name: moved[name]})
+                    name = moved[name]
+                references[name] += 1
+
+    stored = dict(StoredBlob.objects.values_list('name', 'refcount'))
+    for name in set(stored) | set(references) | set(_stored_blob_files()):
+        actual = references.get(name, 0)
+        if name in stored and stored[name] != actual:
+            report['drifted'].append((name, stored[name], actual))
+        elif name not in stored and actual:
+            report['drifted'].append((name, None, actual))
+        if not actual:
+            report['deleted'].append(name)
+        if dry_run:
+            continue
+        if actual:
+            StoredBlob.objects.update_or_create(name=name, defaults={'refcount': actual, 'claimed_at': None})
+        else:
+            StoredBlob.objects.filter(name=name).delete()
+            if document_storage_instance.exists(name):
+                document_storage_instance.delete(name)
+
+    if not dry_run:
+        for legacy_name in moved:
+            try:
+                document_storage_instance.delete(legacy_name)
+            except Exception as e:
+                logger.warning(f"Could not delete migrated file {legacy_name}: {str(e)}")
+    return report
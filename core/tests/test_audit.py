@@ -44,9 +44,10 @@ class AuditSignalsTests(TestCase):
         c.first_name = 'Johnny'
         c.save()
         self.assertTrue(ActivityLog.objects.filter(action_type=ActivityLog.ACTION_UPDATE, model_name='core.Candidate', object_id=str(c.pk)).exists())
-        # Delete
+        # Delete (runs in an atomic block, so the log is written on commit)
         pk = c.pk
-        c.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            c.delete()
         self.assertTrue(ActivityLog.objects.filter(action_type=ActivityLog.ACTION_DELETE, model_name='core.Candidate', object_id=str(pk)).exists())
 
     def test_auth_logging_login_logout(self):
@@ -0,0 +1,155 @@
+"""
+Upload handlers that hash files while they stream in.
+
+Settings list HashingMemoryFileUploadHandler and
+HashingTemporaryFileUploadHandler in FILE_UPLOAD_HANDLERS, in place of
+Django's two defaults. As chunks arrive they compute the SHA-256, the size
+and a MIME type sniffed from the first bytes, and attach them to the
+resulting UploadedFile as `sha256` and `sniffed_content_type`.
+UploadedFile.calculate_file_hash returns `sha256` when present, so form
+duplicate checks, check_duplicate_upload and register_upload never re-read
+an upload.
+
+Document fields have size limits (FIELD_SIZE_LIMITS). Once a file passes
+its limit, the rest of it is discarded instead of buffered. The form then
+receives an empty placeholder whose `size` is the number of bytes received.
+The model fields carry the same limits as MaxUploadSizeValidator, so every
+ModelForm, the admin's included, rejects the placeholder instead of saving
+an empty file.
+"""
+
+import hashlib
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from django.utils.deconstruct import deconstructible
+
+MAX_IMAGE_SIZE = 2 * 1024 * 1024
+MAX_DOCUMENT_SIZE = 5 * 1024 * 1024
+
+# Form field name -> largest accepted upload in bytes (other fields are not limited here)
+FIELD_SIZE_LIMITS = {
+    'profile_image': MAX_IMAGE_SIZE,
+    'license_scan': MAX_DOCUMENT_SIZE,
+    'passport_scan': MAX_DOCUMENT_SIZE,
+    'academic_certificate': MAX_DOCUMENT_SIZE,
+    'tor': MAX_DOCUMENT_SIZE,
+    'nc2_tesda': MAX_DOCUMENT_SIZE,
+    'diploma': MAX_DOCUMENT_SIZE,
+    'good_moral': MAX_DOCUMENT_SIZE,
+    'nbi_clearance': MAX_DOCUMENT_SIZE,
+}
+
+
+
+@deconstructible(path='core.uploads.MaxUploadSizeValidator')
+class MaxUploadSizeValidator:
+    """Model field validator rejecting new uploads over `limit` bytes; stored files are not re-checked."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def __call__(self, value):
+        # A FieldFile holding a new upload is not committed yet
+        if getattr(value, '_committed', True):
+            return
+        if value.size > self.limit:
+            raise ValidationError(
+                'The maximum file size that can be uploaded is %(limit)s.',
+                code='file_too_large',
+                params={'limit': filesizeformat(self.limit)},
+            )
+
+    def __eq__(self, other):
+        return isinstance(other, MaxUploadSizeValidator) and self.limit == other.limit
+
+
+def size_validators(field_name):
+    """Validators for a model file field named like its form field in FIELD_SIZE_LIMITS."""
+    return [MaxUploadSizeValidator(FIELD_SIZE_LIMITS[field_name])]
+
+
+SNIFF_BYTES = 16
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+def sniff_content_type(head):
+    """MIME type recognised from a file's first bytes, or None"""
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+class HashingUploadMixin:
+    """Hashes, measures and sniffs the files its handler stores; enforces FIELD_SIZE_LIMITS."""
+
+    def new_file(self, field_name, *args, **kwargs):
+        # Set up before super(): the memory handler raises StopFutureHandlers from new_file
+        self.hasher = hashlib.sha256()
+        self.received = 0
+        self.head = b''
+        self.limit = FIELD_SIZE_LIMITS.get(field_name)
+        self.over_limit = False
+        super().new_file(field_name, *args, **kwargs)
+
+    def stores_file(self):
+        return True
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.stores_file():
+            return super().receive_data_chunk(raw_data, start)
+        self.received += len(raw_data)
+        if self.limit is not None and self.received > self.limit:
+            if not self.over_limit:
+                self.over_limit = True
+                self.discard()
+            # Swallow the rest of the file: nothing more is buffered
+            return None
+        self.hasher.update(raw_data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+        return super().receive_data_chunk(raw_data, start)
+
+    def discard(self):
+        # A BytesIO, or a TemporaryUploadedFile which closing deletes
+        self.file.close()
+
+    def file_complete(self, file_size):
+        if not self.stores_file():
+            return super().file_complete(file_size)
+        if self.over_limit:
+            return InMemoryUploadedFile(
+                file=BytesIO(),
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=self.received,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self.hasher.hexdigest()
+            uploaded.sniffed_content_type = sniff_content_type(self.head)
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    """MemoryFileUploadHandler that hashes as it buffers (requests up to FILE_UPLOAD_MAX_MEMORY_SIZE)."""
+
+    def stores_file(self):
+        return self.activated
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler that hashes as it writes (larger requests)."""
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     # System monitoring
     path('health/', views.health_check, name='health_check'),
+    path('metrics/', views.metrics, name='metrics'),
     
     # Authentication and profile
     path('', views.index, name='index'),
@@ -46,6 +47,7 @@ urlpatterns = [
     path('notifications/', views.notifications, name='notifications'),
     path('api/notifications/', views.api_notifications, name='api_notifications'),
     path('api/notifications/clear-all/', views.api_clear_all_notifications, name='api_clear_all_notifications'),
+    path('events/stream/', views.event_stream, name='event_stream'),
     
     # Programs and registrations
     path('programs/', views.program_list, name='program_list'),
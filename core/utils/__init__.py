@@ -21,41 +21,25 @@ def admin_dashboard(request, context):
     Returns:
         Enriched context dictionary with dashboard statistics
     """
-    from django.contrib.auth.models import User
-    from core.models import Candidate, Registration, AgricultureProgram
+    from core.stats import cached_dashboard_stats
     
-    # Get statistics for dashboard
-    total_users = User.objects.filter(is_staff=False).count()
-    total_candidates = Candidate.objects.count()
-    total_registrations = Registration.objects.count()
-    total_programs = AgricultureProgram.objects.count()
-    
-    # Get status breakdowns
-    pending_registrations = Registration.objects.filter(status='pending').count()
-    approved_registrations = Registration.objects.filter(status='approved').count()
-    rejected_registrations = Registration.objects.filter(status='rejected').count()
-    
-    # Get candidate status breakdown
-    draft_candidates = Candidate.objects.filter(status='Draft').count()
-    missing_docs_candidates = Candidate.objects.filter(status='Missing_Docs').count()
-    validated_candidates = Candidate.objects.filter(status='Validated').count()
-    approved_candidates = Candidate.objects.filter(status='Approved').count()
-    rejected_candidates = Candidate.objects.filter(status='Rejected').count()
+    # Get statistics for dashboard from the shared grouped-stats snapshot
+    stats = cached_dashboard_stats()
     
     # Add statistics to context
     context.update({
-        'total_users': total_users,
-        'total_candidates': total_candidates,
-        'total_registrations': total_registrations,
-        'total_programs': total_programs,
-        'pending_registrations': pending_registrations,
-        'approved_registrations': approved_registrations,
-        'rejected_registrations': rejected_registrations,
-        'draft_candidates': draft_candidates,
-        'missing_docs_candidates': missing_docs_candidates,
-        'validated_candidates': validated_candidates,
-        'approved_candidates': approved_candidates,
-        'rejected_candidates': rejected_candidates,
+        'total_users': stats['non_staff_users'],
+        'total_candidates': stats['total_candidates'],
+        'total_registrations': stats['total_registrations'],
+        'total_programs': stats['total_programs'],
+        'pending_registrations': stats['pending_registrations'],
+        'approved_registrations': stats['approved_registrations'],
+        'rejected_registrations': stats['rejected_registrations'],
+        'draft_candidates': stats['draft_count'],
+        'missing_docs_candidates': stats['missing_docs_count'],
+        'validated_candidates': stats['validated_count'],
+        'approved_candidates': stats['approved_candidates'],
+        'rejected_candidates': stats['rejected_candidates'],
     })
     
     return context
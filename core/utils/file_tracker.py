@@ -2,7 +2,42 @@
 Utility functions for tracking and managing file uploads.
 Ensures files are registered in the UploadedFile model for duplicate detection.
 """
+import mimetypes
+
 from core.models import UploadedFile
+from core.storage import blob_hash
+
+
+# Document fields tracked for each model type
+DOCUMENT_FIELDS = {
+    'Profile': [
+        'profile_image', 'license_scan', 'passport_scan', 'academic_certificate',
+        'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
+    ],
+    'Registration': [
+        'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
+    ],
+    'Candidate': [
+        'passport_scan', 'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
+    ],
+}
+
+
+def remember_upload_digests(instance, model_name):
+    """
+    Keep the digests computed while new uploads streamed in (core.uploads) on the instance.
+    
+    Saving replaces each upload with a FieldFile of the stored copy, so without this
+    register_model_files would have to read the stored file back to hash it.
+    """
+    digests = {}
+    for field_name in DOCUMENT_FIELDS.get(model_name, []):
+        file_field = getattr(instance, field_name, None)
+        if file_field and not getattr(file_field, '_committed', True):
+            upload = file_field.file
+            if getattr(upload, 'sha256', None):
+                digests[field_name] = (upload.sha256, getattr(upload, 'sniffed_content_type', None))
+    instance._upload_digests = digests
 
 
 def register_model_files(instance, user, model_name):
@@ -14,29 +49,49 @@ def register_model_files(instance, user, model_name):
         user: User who owns/uploaded the files
         model_name: String name of the model ('Profile', 'Registration', 'Candidate')
     """
-    # Define document fields for each model type
-    document_fields = {
-        'Profile': [
-            'profile_image', 'license_scan', 'passport_scan', 'academic_certificate',
-            'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
-        ],
-        'Registration': [
-            'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
-        ],
-        'Candidate': [
-            'passport_scan', 'tor', 'nc2_tesda', 'diploma', 'good_moral', 'nbi_clearance'
-        ],
-    }
+    fields_to_check = DOCUMENT_FIELDS.get(model_name, [])
+    digests = getattr(instance, '_upload_digests', None) or {}
+    present = [
+        field_name for field_name in fields_to_check
+        if getattr(instance, field_name, None) and getattr(getattr(instance, field_name), 'name', None)
+    ]
+    if not present:
+        return
     
-    fields_to_check = document_fields.get(model_name, [])
+    # One query for the current records; a file whose name, size and mtime match its record is
+    # unchanged and is neither opened nor hashed (register_upload hashes the others, once each)
+    records = {
+        record.document_type: record
+        for record in UploadedFile.objects.filter(user=user, document_type__in=present, is_active=True)
+    }
     
-    for field_name in fields_to_check:
+    for field_name in present:
         # Get the file field from the instance
         file_field = getattr(instance, field_name, None)
         
-        # If file exists and has a name, register it
+        record = records.get(field_name)
+        if record is not None and record.matches_stamp(UploadedFile.storage_stamp(file_field)):
+            continue
+        
+        # The file is new or changed: register it
         if file_field and hasattr(file_field, 'name') and file_field.name:
             try:
+                digest = digests.get(field_name)
+                if digest is None and blob_hash(file_field.name):
+                    # A blob's name is its content hash
+                    digest = (blob_hash(file_field.name), mimetypes.guess_type(file_field.name)[0])
+                if digest:
+                    # Hash already known: register it without reading the stored copy
+                    file_field.sha256, file_field.sniffed_content_type = digest
+                    UploadedFile.register_upload(
+                        user=user,
+                        document_type=field_name,
+                        file_obj=file_field,
+                        model_name=model_name,
+                        model_id=instance.pk
+                    )
+                    continue
+                
                 # Check if file is already open
                 is_opened = hasattr(file_field, 'file') and file_field.file is not None
                 
@@ -0,0 +1,168 @@
+"""
+Set-based re-validation of candidate applications.
+
+Candidate.validate_application checks one candidate at a time. After a rule
+change, for example a program starting to require a license, `revalidate`
+re-evaluates the whole pool instead:
+
+- Candidates are read in primary-key chunks through one values_list
+  projection. Each row carries the current status, note and deadline, plus one
+  boolean per rule column. The database computes the booleans ("is this
+  column filled in?"), so file names and text bodies never leave it.
+- Each row is decided by Candidate.application_outcome, the same rules that
+  evaluate_application applies.
+- Only candidates whose status, note or deadline change are written. They
+  are grouped by status read and outcome, and each group is written with one
+  `UPDATE ... WHERE id IN (...) AND status = <status read>`. A chunk needs as
+  many UPDATEs as it has distinct groups, which is few because outcomes
+  repeat. A per-row bulk_update spent most of its time building CASE
+  expressions. A candidate whose status changed after the read (rejected by
+  staff, say) is left as it is. The counters, the audit trail and the caches
+  are updated once per chunk, for the rows actually written.
+
+Rejected candidates are a staff decision and are left alone. Exposed as
+`manage.py revalidate_candidates [--program ID] [--dry-run]`.
+"""
+
+import logging
+import time
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from . import applicant_state, audit, counters
+from .cache_utils import invalidate_candidates_cache
+from .models import Candidate
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_FIELDS = ('status', 'missing_documents_note', 'document_deadline')
+
+# Loaded on the written instances: what the counters, the audit diff and the cache
+# invalidation read
+LOADED_FIELDS = ('id', 'email', 'program_id', 'created_by_id', 'created_at') + OUTCOME_FIELDS
+
+
+def _filled(field_name):
+    """SQL boolean that is true where the column passes evaluate_application's truthiness test."""
+    field = Candidate._meta.get_field(field_name)
+    condition = Q(**{f'{field_name}__isnull': False})
+    if isinstance(field, (models.CharField, models.TextField, models.FileField)):
+        condition &= ~Q(**{field_name: ''})
+    elif isinstance(field, (models.IntegerField, models.FloatField, models.DecimalField)):
+        condition &= ~Q(**{field_name: 0})
+    return ExpressionWrapper(condition, output_field=BooleanField())
+
+
+def _rule_columns():
+    license_field = Candidate.LICENSE_DOCUMENT[0]
+    fields = [field for field, _label in Candidate.REQUIRED_DOCUMENTS + Candidate.REQUIRED_FIELDS]
+    return {f'filled_{field}': _filled(field) for field in fields + [license_field]}
+
+
+# Group key marking a document_deadline that stays as stored
+KEEP = object()
+
+
+def _outcome(row, deadline_days, now):
+    missing_docs = [label for field, label in Candidate.REQUIRED_DOCUMENTS if not row[f'filled_{field}']]
+    license_field, license_label = Candidate.LICENSE_DOCUMENT
+    if row['program__requires_license'] and not row[f'filled_{license_field}']:
+        missing_docs.append(license_label)
+    missing_fields = [label for field, label in Candidate.REQUIRED_FIELDS if not row[f'filled_{field}']]
+    return Candidate.application_outcome(
+        missing_docs, missing_fields, row['document_deadline'], deadline_days, now=now
+    )
+
+
+def _write(groups, now):
+    """
+    Store a chunk's outcomes, one UPDATE per {(status read, status, note, deadline or KEEP):
+    candidates} group, and do the work the candidates' post_save signals would for the
+    rows written. Returns a Counter of the (old, new) status transitions written.
+    """
+    candidates = []
+    transitions = Counter()
+    update_fields = list(OUTCOME_FIELDS) + ['updated_at']
+    with transaction.atomic():
+        for (read_status, status, note, deadline), group in groups.items():
+            values = {'status': status, 'missing_documents_note': note, 'updated_at': now}
+            if deadline is not KEEP:
+                values['document_deadline'] = deadline
+            ids = [candidate.pk for candidate in group]
+            if Candidate.objects.filter(pk__in=ids, status=read_status).update(**values) < len(group):
+                # Some changed status since the read; this run's timestamp marks the rows written
+                written = set(Candidate.objects.filter(pk__in=ids, updated_at=now).values_list('pk', flat=True))
+                group = [candidate for candidate in group if candidate.pk in written]
+            candidates.extend(group)
+            transitions[(read_status, status)] += len(group)
+        if not candidates:
+            return transitions
+        counters.record_bulk_update(candidates)
+    try:
+        audit.record_updates([(candidate, update_fields) for candidate in candidates])
+    except Exception:
+        logger.exception('Failed to write ActivityLog for re-validated candidates')
+    invalidate_candidates_cache(
+        program_ids=[candidate.program_id for candidate in candidates],
+        user_ids=[candidate.created_by_id for candidate in candidates],
+    )
+    applicant_state.invalidate_for_candidates(candidates)
+    return transitions
+
+
+def revalidate(queryset=None, deadline_days=7, chunk_size=2000, dry_run=False):
+    """
+    Re-evaluate the completeness of candidates and store the outcomes that changed.
+
+    Args:
+        queryset: Candidates to check (defaults to all); rejected ones are skipped
+        deadline_days: Deadline given to candidates newly missing documents
+        chunk_size: Candidates read and written per query
+        dry_run: Compute the changes without writing them
+
+    Returns:
+        dict: checked, changed, transitions (Counter of (old, new) status), seconds
+    """
+    queryset = Candidate.objects.all() if queryset is None else queryset
+    queryset = queryset.exclude(status=Candidate.REJECTED).order_by('pk')
+    rules = _rule_columns()
+    columns = list(LOADED_FIELDS) + ['program__requires_license'] + list(rules)
+    attnames = [field.attname for field in Candidate._meta.concrete_fields if field.attname in LOADED_FIELDS]
+    report = {'checked': 0, 'changed': 0, 'transitions': Counter()}
+    started = time.perf_counter()
+
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk.annotate(**rules).values_list(*columns)[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        now = timezone.now()
+        groups = defaultdict(list)
+        for values in rows:
+            row = dict(zip(columns, values))
+            outcome = _outcome(row, deadline_days, now)
+            if outcome == tuple(row[field] for field in OUTCOME_FIELDS):
+                continue
+            if dry_run:
+                report['changed'] += 1
+                report['transitions'][(row['status'], outcome[0])] += 1
+                continue
+            candidate = Candidate.from_db(queryset.db, attnames, [row[attname] for attname in attnames])
+            candidate.status, candidate.missing_documents_note, candidate.document_deadline = outcome
+            candidate.updated_at = now
+            status, note, deadline = outcome
+            deadline_key = KEEP if deadline == row['document_deadline'] else deadline
+            groups[(row['status'], status, note, deadline_key)].append(candidate)
+        report['checked'] += len(rows)
+        if groups:
+            transitions = _write(groups, now)
+            report['changed'] += sum(transitions.values())
+            report['transitions'].update(transitions)
+
+    report['seconds'] = time.perf_counter() - started
+    return report
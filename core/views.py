@@ -16,11 +16,15 @@ from django.db.models import Q, F
 
 from django.db import transaction
 
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+
+from django.core.handlers.asgi import ASGIRequest
 
 from django.db import connection
 
-from django.views.decorators.http import require_POST, require_GET
+from django.views.decorators.http import require_POST, require_GET, condition
+
+from django.views.decorators.vary import vary_on_headers
 
 from django.utils import timezone
 
@@ -36,6 +40,24 @@ from .models import Profile, AgricultureProgram, Registration, Candidate, Univer
 
 from .models import ActivityLog
 
+from .stats import cached_dashboard_stats, compute_dashboard_stats
+
+from .pagination import KeysetPaginator
+
+from .applicant_state import ApplicantState, ownership_q
+
+from .cache_rows import RowSet
+
+from . import activity_archive, cache_metrics, candidate_sync, conditional, counters, events, notification_counts, search, storage
+
+from .cache_utils import (
+
+    CANDIDATES, PROGRAMS, cache_view_result, get_or_compute, invalidate_program_cache,
+
+    notifications_namespace, program_namespace, user_namespace, warmable,
+
+)
+
 import logging
 
 from .forms import (
@@ -82,6 +104,8 @@ import os
 
 import json
 
+import hmac
+
 from .decorators import ajax_login_required
 
 
@@ -104,7 +128,7 @@ def cancel_application(request, candidate_id):
 
         Candidate.objects.filter(
 
-            Q(created_by=request.user) | Q(email=request.user.email),
+            ownership_q(request.user),
 
             id=candidate_id
 
@@ -132,7 +156,7 @@ def cancel_application(request, candidate_id):
 
                 if program:
 
-                    AgricultureProgram.objects.filter(id=program.id).update(capacity=F('capacity') + 1)
+                    AgricultureProgram.objects.filter(id=program.id).update(capacity=F('capacity') + 1, updated_at=timezone.now())
 
                 
 
@@ -160,45 +184,11 @@ def cancel_application(request, candidate_id):
 
                 
 
-                # Clear related cache entries
-
-                try:
-
-                    cache_keys = [
-
-                        'candidate_list:all',
-
-                        f'candidate_detail:{candidate_id}',
-
-                    ]
-
-                    if program:
+                # Capacity changed through update(), which sends no signal
 
-                        cache_keys.extend([
-
-                            f'program_candidates:{program.id}',
-
-                            f'program_detail:{program.id}',
-
-                            f'program_stats:{program.id}'
-
-                        ])
-
-                    
-
-                    for key in cache_keys:
-
-                        try:
-
-                            cache.delete(key)
-
-                        except Exception as e:
-
-                            logger.warning(f"Cache clear failed for key {key}: {e}")
-
-                except Exception as e:
+                if program:
 
-                    logger.warning(f"Cache operations failed: {e}")
+                    invalidate_program_cache(program.id)
 
                     # Continue even if cache fails
 
@@ -298,6 +288,8 @@ def health_check(request):
 
                 "session_engine": settings.SESSION_ENGINE,
 
+                "cache_metrics": cache_metrics.summary(cache_metrics.collect()['tiers']),
+
             },
 
             "version": "2.0"
@@ -334,6 +326,32 @@ def health_check(request):
 
 
 
+@require_GET
+
+def metrics(request):
+
+    """Cache metrics of all workers in Prometheus text format (staff, or `Authorization: Bearer <METRICS_TOKEN>`)"""
+
+    authorized = request.user.is_authenticated and request.user.is_staff
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+
+    if not authorized and token:
+
+        authorized = hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+    if not authorized:
+
+        return HttpResponse(status=403)
+
+    body = cache_metrics.prometheus_text(cache_metrics.collect()['tiers'])
+
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+
+
+
 # TEMPORARY: OAuth debug endpoint — REMOVE after debugging
 @require_GET
 def oauth_debug(request):
@@ -367,6 +385,28 @@ def oauth_debug(request):
 
 
 
+@warmable('index_programs')
+
+def _index_program_ids():
+
+    """Programs on the signed-in home page: up to 6 featured ones, or the latest 6 when fewer than 3 are featured"""
+
+    def compute():
+
+        latest = AgricultureProgram.objects.order_by('-start_date').values_list('id', flat=True)
+
+        featured = list(latest.filter(is_featured=True)[:6])
+
+        return featured if len(featured) >= 3 else list(latest[:6])
+
+    return get_or_compute('index:program_ids', compute, cache_type='programs', namespaces=(PROGRAMS,))
+
+
+
+
+
+@cache_view_result('static_content')
+
 def index(request):
 
     """Home page view - shows different pages for guests vs authenticated users"""
@@ -387,19 +427,13 @@ def index(request):
 
     # For authenticated users, show the main programs landing page
 
-    # Get featured programs first, then regular programs if needed
-
-    featured_programs = AgricultureProgram.objects.filter(is_featured=True).order_by('-start_date')[:6]
-
-    if featured_programs.count() < 3:
+    # Featured programs first, the latest ones if fewer than 3 are featured (ids from the hot cache)
 
-        # If less than 3 featured programs, show latest programs
+    program_ids = _index_program_ids()
 
-        programs = AgricultureProgram.objects.all().order_by('-start_date')[:6]
-
-    else:
+    programs_by_id = AgricultureProgram.objects.in_bulk(program_ids)
 
-        programs = featured_programs
+    programs = [programs_by_id[pk] for pk in program_ids if pk in programs_by_id]
 
     return render(request, 'index.html', {'programs': programs, 'auto_open_modal': auto_open_modal})
 
@@ -1083,23 +1117,23 @@ def profile(request):
 
         if u_form.is_valid() and p_form.is_valid():
 
+            # Candidates are synced once below, not on each profile save
+
+            request.user.profile._defer_candidate_sync = True
+
             # Check if user wants to delete the profile image
 
             if 'delete_image' in request.POST and request.user.profile.profile_image:
 
-                # Save the path to delete the file after saving the form
-
-                old_image = request.user.profile.profile_image.path
+                old_image = request.user.profile.profile_image
 
                 request.user.profile.profile_image = None
 
                 
 
-                # Delete the file if it exists
+                # Shared blobs go when their last reference does; legacy files are removed now
 
-                if os.path.exists(old_image):
-
-                    os.remove(old_image)
+                storage.discard_file(old_image)
 
             
 
@@ -1111,87 +1145,11 @@ def profile(request):
 
 
 
-            # Sync updated identity fields to any of the user's candidate applications
+            # Sync updated identity fields and documents to the user's candidate applications
 
             try:
 
-                candidate_qs = Candidate.objects.filter(Q(created_by=request.user) | Q(email=request.user.email))
-
-                for candidate in candidate_qs:
-
-                    candidate.first_name = request.user.first_name
-
-                    candidate.middle_initial = request.user.profile.middle_initial
-
-                    candidate.last_name = request.user.last_name
-
-                    candidate.email = request.user.email
-
-                    candidate.phone_number = request.user.profile.phone_number
-
-                    candidate.address = request.user.profile.address
-
-                    candidate.date_of_birth = request.user.profile.date_of_birth
-
-                    candidate.gender = request.user.profile.gender
-
-                    candidate.country_of_birth = request.user.profile.country_of_birth
-
-                    candidate.nationality = request.user.profile.nationality
-
-                    candidate.religion = request.user.profile.religion
-
-                    candidate.father_name = request.user.profile.father_name
-
-                    candidate.mother_name = request.user.profile.mother_name
-
-                    candidate.passport_number = request.user.profile.passport_number
-
-                    candidate.passport_issue_date = request.user.profile.passport_issue_date
-
-                    candidate.passport_expiry_date = request.user.profile.passport_expiry_date
-
-                    candidate.place_of_issue = request.user.profile.place_of_issue
-
-                    candidate.university = request.user.profile.university
-
-                    candidate.highest_education_level = request.user.profile.highest_education_level
-
-                    candidate.field_of_study = request.user.profile.field_of_study
-
-                    candidate.graduation_year = request.user.profile.graduation_year
-
-                    candidate.specialization = request.user.profile.specialization
-
-                    candidate.secondary_specialization = request.user.profile.secondary_specialization
-
-                    candidate.year_graduated = request.user.profile.year_graduated
-
-                    candidate.shoes_size = request.user.profile.shoes_size
-
-                    candidate.shirt_size = request.user.profile.shirt_size
-
-                    candidate.health_condition = request.user.profile.health_condition
-
-                    candidate.health_remarks = request.user.profile.health_remarks
-
-                    candidate.smokes = request.user.profile.smokes
-
-                    
-
-                    # Sync files as well if they were updated in the profile
-
-                    if request.user.profile.profile_image:
-
-                        candidate.profile_image = request.user.profile.profile_image
-
-                    
-
-                    candidate.save()
-
-                    # Trigger automatic validation and potential approval
-
-                    candidate.validate_application()
+                candidate_sync.sync_candidates_from_profile(request.user.profile)
 
             except Exception as e:
 
@@ -1199,9 +1157,7 @@ def profile(request):
 
                 logger.exception(f"Failed to sync candidate data for user {request.user.id}: {e}")
 
-                pass
-
-
+            
 
             # Create a notification
 
@@ -1263,7 +1219,7 @@ def profile(request):
 
     registrations = Registration.objects.filter(user=request.user).order_by('-registration_date')
 
-    candidate_apps = Candidate.objects.filter(Q(created_by=request.user) | Q(email=request.user.email)).order_by('-created_at')
+    candidate_apps = Candidate.objects.filter(ownership_q(request.user)).order_by('-created_at')
 
     
 
@@ -1303,45 +1259,9 @@ def admin_dashboard(request):
 
     
 
-    # Get statistics
+    # All counters, monthly charts and report breakdowns come from one grouped-stats snapshot
 
-    total_users = User.objects.count()
-
-    total_candidates = Candidate.objects.count()
-
-    total_programs = AgricultureProgram.objects.count()
-
-    
-
-    # Application statuses - all status counts for analytics
-
-    missing_docs_count = Candidate.objects.filter(status='Missing_Docs').count()
-
-    validated_count = Candidate.objects.filter(status='Validated').count()
-
-    approved_candidates = Candidate.objects.filter(status='Approved').count()
-
-    rejected_candidates = Candidate.objects.filter(status='Rejected').count()
-
-    pending_applications = missing_docs_count + validated_count  # Combined pending
-
-    
-
-    # Staff count
-
-    staff_count = User.objects.filter(is_staff=True).count()
-
-    
-
-    # Active programs (programs that are still open for registration)
-
-    active_programs = AgricultureProgram.objects.filter(
-
-        Q(registration_deadline__gte=timezone.now()) | 
-
-        Q(registration_deadline__isnull=True, start_date__gte=timezone.now().date())
-
-    ).count()
+    stats = cached_dashboard_stats()
 
     
 
@@ -1357,75 +1277,15 @@ def admin_dashboard(request):
 
     
 
-    # Monthly application data for the current year (for chart)
-
-    current_year = timezone.now().year
-
-    monthly_applications = []
-
-    for month in range(1, 13):
-
-        count = Candidate.objects.filter(
-
-            created_at__year=current_year,
-
-            created_at__month=month
-
-        ).count()
-
-        monthly_applications.append(count)
-
-    
-
-    # Monthly approved data for mini chart
-
-    monthly_approved = []
-
-    for month in range(1, 13):
-
-        count = Candidate.objects.filter(
-
-            status='Approved',
-
-            updated_at__year=current_year,
-
-            updated_at__month=month
-
-        ).count()
-
-        monthly_approved.append(count)
-
-    
-
-    # Get last 7 data points for mini charts (last 7 months or available data)
-
-    current_month = timezone.now().month
-
-    mini_chart_approved = monthly_approved[max(0, current_month-7):current_month] if current_month >= 7 else monthly_approved[:current_month]
-
-    mini_chart_pending = monthly_applications[max(0, current_month-7):current_month] if current_month >= 7 else monthly_applications[:current_month]
-
-    
-
     # Current day of week (0=Monday, 6=Sunday)
 
     current_day_of_week = timezone.now().weekday()
 
     
 
-    # Overall approval rate - based on all candidates with a decision (approved/rejected)
-
-    total_processed = Candidate.objects.filter(status__in=['Approved', 'Rejected']).count()
-
-    total_approved_decisions = Candidate.objects.filter(status='Approved').count()
-
-    # Calculate overall approval rate
-
-    approval_rate = round((total_approved_decisions / total_processed * 100) if total_processed > 0 else 0)
-
     # SVG circle circumference is 201, calculate stroke-dashoffset for progress ring
 
-    approval_ring_offset = round(201 - (201 * approval_rate / 100))
+    approval_ring_offset = round(201 - (201 * stats['approval_rate'] / 100))
 
     
 
@@ -1439,125 +1299,27 @@ def admin_dashboard(request):
 
     
 
-    # ===== REPORTS DATA =====
-
-    # Applicants per year (last 5 years)
-
-    from django.db.models import Count
-
-    from django.db.models.functions import ExtractYear
-
-    
-
-    applicants_per_year = Candidate.objects.annotate(
-
-        year=ExtractYear('created_at')
-
-    ).values('year').annotate(
-
-        count=Count('id')
-
-    ).order_by('-year')[:5]
-
-    
-
-    # Deployed (Approved) per year
-
-    deployed_per_year = Candidate.objects.filter(status='Approved').annotate(
-
-        year=ExtractYear('updated_at')
-
-    ).values('year').annotate(
-
-        count=Count('id')
-
-    ).order_by('-year')[:5]
-
-    
-
-    # Deployed per program
-
-    deployed_per_program = Candidate.objects.filter(
-
-        status='Approved', program__isnull=False
-
-    ).values('program__title').annotate(
-
-        count=Count('id')
-
-    ).order_by('-count')[:10]
-
-    
-
-    # Deployed per farm (program location)
-
-    deployed_per_farm = Candidate.objects.filter(
-
-        status='Approved', program__isnull=False
-
-    ).values('program__location', 'program__country').annotate(
-
-        count=Count('id')
-
-    ).order_by('-count')[:10]
-
-    
-
-    # Deployed per SUC (University)
-
-    deployed_per_suc = Candidate.objects.filter(
-
-        status='Approved', university__isnull=False, university__gt=''
-
-    ).values('university').annotate(
-
-        count=Count('id')
-
-    ).order_by('-count')[:10]
-
-    
-
-    # Deployed per sex
-
-    deployed_per_sex = Candidate.objects.filter(
-
-        status='Approved'
-
-    ).values('gender').annotate(
-
-        count=Count('id')
-
-    ).order_by('-count')
-
-    
-
-    # Total deployed
-
-    total_deployed = Candidate.objects.filter(status='Approved').count()
-
-    
-
     context = {
 
-        'total_users': total_users,
+        'total_users': stats['total_users'],
 
-        'total_candidates': total_candidates,
+        'total_candidates': stats['total_candidates'],
 
-        'total_programs': total_programs,
+        'total_programs': stats['total_programs'],
 
-        'pending_applications': pending_applications,
+        'pending_applications': stats['pending_applications'],
 
-        'approved_candidates': approved_candidates,
+        'approved_candidates': stats['approved_candidates'],
 
-        'rejected_candidates': rejected_candidates,
+        'rejected_candidates': stats['rejected_candidates'],
 
-        'missing_docs_count': missing_docs_count,
+        'missing_docs_count': stats['missing_docs_count'],
 
-        'validated_count': validated_count,
+        'validated_count': stats['validated_count'],
 
-        'staff_count': staff_count,
+        'staff_count': stats['staff_count'],
 
-        'active_programs': active_programs,
+        'active_programs': stats['active_programs'],
 
         'recent_activities': recent_activities,
 
@@ -1565,35 +1327,35 @@ def admin_dashboard(request):
 
         'recent_status_changes': recent_status_changes,
 
-        'monthly_applications': monthly_applications,
+        'monthly_applications': stats['monthly_applications'],
 
-        'monthly_approved': monthly_approved,
+        'monthly_approved': stats['monthly_approved'],
 
         'current_day_of_week': current_day_of_week,
 
-        'total_processed': total_processed,
+        'total_processed': stats['total_processed'],
 
-        'total_approved_decisions': total_approved_decisions,
+        'total_approved_decisions': stats['total_approved_decisions'],
 
-        'approval_rate': approval_rate,
+        'approval_rate': stats['approval_rate'],
 
         'approval_ring_offset': approval_ring_offset,
 
         # Reports data
 
-        'applicants_per_year': applicants_per_year,
+        'applicants_per_year': stats['applicants_per_year'][:5],
 
-        'deployed_per_year': deployed_per_year,
+        'deployed_per_year': stats['deployed_per_year'][:5],
 
-        'deployed_per_program': deployed_per_program,
+        'deployed_per_program': stats['deployed_per_program'],
 
-        'deployed_per_farm': deployed_per_farm,
+        'deployed_per_farm': stats['deployed_per_farm'],
 
-        'deployed_per_suc': deployed_per_suc,
+        'deployed_per_suc': stats['deployed_per_suc'],
 
-        'deployed_per_sex': deployed_per_sex,
+        'deployed_per_sex': stats['deployed_per_sex'],
 
-        'total_deployed': total_deployed,
+        'total_deployed': stats['total_deployed'],
 
     }
 
@@ -1619,10 +1381,6 @@ def export_dashboard_report(request):
 
     
 
-    from django.db.models import Count
-
-    from django.db.models.functions import ExtractYear
-
     from io import BytesIO
 
     from datetime import datetime
@@ -1633,59 +1391,25 @@ def export_dashboard_report(request):
 
     
 
-    # Gather report data
+    # Gather report data from the shared dashboard snapshot
 
-    applicants_per_year = list(Candidate.objects.annotate(
+    stats = compute_dashboard_stats()
 
-        year=ExtractYear('created_at')
+    applicants_per_year = stats['applicants_per_year'][:10]
 
-    ).values('year').annotate(count=Count('id')).order_by('-year')[:10])
+    deployed_per_year = stats['deployed_per_year'][:10]
 
-    
+    deployed_per_program = stats['deployed_per_program']
 
-    deployed_per_year = list(Candidate.objects.filter(status='Approved').annotate(
+    deployed_per_farm = stats['deployed_per_farm']
 
-        year=ExtractYear('updated_at')
+    deployed_per_suc = stats['deployed_per_suc']
 
-    ).values('year').annotate(count=Count('id')).order_by('-year')[:10])
+    deployed_per_sex = stats['deployed_per_sex']
 
-    
-
-    deployed_per_program = list(Candidate.objects.filter(
-
-        status='Approved', program__isnull=False
-
-    ).values('program__title').annotate(count=Count('id')).order_by('-count')[:10])
-
-    
-
-    deployed_per_farm = list(Candidate.objects.filter(
-
-        status='Approved', program__isnull=False
-
-    ).values('program__location', 'program__country').annotate(count=Count('id')).order_by('-count')[:10])
-
-    
-
-    deployed_per_suc = list(Candidate.objects.filter(
-
-        status='Approved', university__isnull=False, university__gt=''
-
-    ).values('university').annotate(count=Count('id')).order_by('-count')[:10])
-
-    
-
-    deployed_per_sex = list(Candidate.objects.filter(
-
-        status='Approved'
-
-    ).values('gender').annotate(count=Count('id')).order_by('-count'))
+    total_candidates = stats['total_candidates']
 
-    
-
-    total_candidates = Candidate.objects.count()
-
-    total_deployed = Candidate.objects.filter(status='Approved').count()
+    total_deployed = stats['total_deployed']
 
     
 
@@ -2113,17 +1837,9 @@ def clear_all_documents(request):
 
             if file_field:
 
-                # Delete the physical file if it exists
-
-                try:
-
-                    if file_field.name and os.path.exists(file_field.path):
-
-                        os.remove(file_field.path)
-
-                except Exception as e:
+                # Drop this profile's reference; candidates sharing the blob keep it
 
-                    logger.warning(f"Could not delete file {field_name}: {str(e)}")
+                storage.discard_file(file_field)
 
                 
 
@@ -2187,107 +1903,143 @@ def clear_all_documents(request):
 
 
 
-def program_list(request):
+@warmable('program_list')
 
-    """List all available programs"""
+def _program_list_rows():
 
-    # Try to get from cache first, but only if no filters are applied
+    """(id, registration_deadline) rows of every program in list order, through the hot cache"""
 
-    cache_key = 'programs_list:all'
+    def compute():
 
-    programs = None
+        programs = AgricultureProgram.objects.order_by('-start_date')
 
-    
+        return RowSet.from_queryset(programs, 'id', 'registration_deadline')
 
-    if not request.GET:  # Only use cache for unfiltered list
+    return get_or_compute('programs_list:deadlines', compute, cache_type='programs', namespaces=(PROGRAMS,))
 
-        try:
 
-            programs = cache.get(cache_key)
 
-        except Exception as e:
 
-            logger.warning(f"Cache get failed for programs list: {e}")
 
-    
+def _closed_program_count():
 
-    if programs is None:
+    """How many registration deadlines have passed; changes pages without any write"""
 
-        programs = AgricultureProgram.objects.select_related().all().order_by('-start_date')
+    now = timezone.now()
 
-        if not request.GET:  # Cache only unfiltered results
+    return sum(1 for program in _program_list_rows() if program.registration_deadline and program.registration_deadline < now)
 
-            try:
 
-                cache.set(cache_key, programs, timeout=300)  # Cache for 5 minutes
 
-            except Exception as e:
 
-                logger.warning(f"Cache set failed for programs list: {e}")
 
-    
+def _deadline_key(request, **kwargs):
+
+    """Cache key part for guest program pages, which change as deadlines pass"""
+
+    return _closed_program_count()
+
+
+
+
+
+def _program_list_etag(request):
+
+    # Applications and cancellations change capacities with update(); their Candidate/Registration writes bump CANDIDATES
+
+    return conditional.page_etag(request, (PROGRAMS, CANDIDATES), _closed_program_count())
+
+
+
+
+
+@condition(etag_func=_program_list_etag)
+
+@cache_view_result('programs', namespaces=(PROGRAMS, CANDIDATES), key_func=_deadline_key)
+
+@vary_on_headers('X-Requested-With')
+
+def program_list(request):
+
+    """List all available programs"""
 
     form = ProgramSearchForm(request.GET)
 
-    if form.is_valid():
+    if form.is_valid() and not any(form.cleaned_data.values()):
 
-        query = form.cleaned_data.get('query')
+        # Default listing: the open program ids come from the hot cache, only the page is fetched
 
-        location = form.cleaned_data.get('location')
+        now = timezone.now()
 
-        country = form.cleaned_data.get('country')
+        open_ids = [
 
-        gender = form.cleaned_data.get('gender')
+            program.id for program in _program_list_rows()
 
+            if program.registration_deadline is None or program.registration_deadline >= now
 
+        ]
 
-        if query:
+        page_obj = Paginator(open_ids, 10).get_page(request.GET.get('page'))
 
-            programs = programs.filter(
+        programs_by_id = AgricultureProgram.objects.in_bulk(page_obj.object_list)
 
-                Q(title__icontains=query) | Q(description__icontains=query)
+        page_obj.object_list = [programs_by_id[pk] for pk in page_obj.object_list if pk in programs_by_id]
 
-            )
+    else:
 
-        
+        programs = AgricultureProgram.objects.select_related().all().order_by('-start_date')
 
-        if location:
+        if form.is_valid():
+
+            query = form.cleaned_data.get('query')
+
+            location = form.cleaned_data.get('location')
 
-            programs = programs.filter(location__icontains=location)
+            country = form.cleaned_data.get('country')
+
+            gender = form.cleaned_data.get('gender')
 
             
 
-        if country:
+            if query:
+
+                # Indexed full-text search, best matches first
+
+                programs = search.filter_queryset(programs, query, rank=True)
+
+            if location:
+
+                programs = programs.filter(location__icontains=location)
 
-            programs = programs.filter(country__icontains=country)
+            if country:
 
-        
+                programs = programs.filter(country__icontains=country)
 
-        if gender:
+            if gender:
 
-            programs = programs.filter(required_gender=gender)
+                programs = programs.filter(required_gender=gender)
 
             
 
-        # Filter out programs with expired registration deadlines
-
-        programs = programs.filter(
+            # Filter out programs with expired registration deadlines
 
-            Q(registration_deadline__isnull=True) |  # No deadline set
+            programs = programs.filter(
 
-            Q(registration_deadline__gte=timezone.now())  # Or deadline not passed
+                Q(registration_deadline__isnull=True) |  # No deadline set
 
-        )
+                Q(registration_deadline__gte=timezone.now())  # Or deadline not passed
 
+            )
 
+        
 
-    # Pagination
+        # Pagination
 
-    paginator = Paginator(programs, 10)  # Show 10 programs per page
+        paginator = Paginator(programs, 10)  # Show 10 programs per page
 
-    page_number = request.GET.get('page')
+        page_number = request.GET.get('page')
 
-    page_obj = paginator.get_page(page_number)
+        page_obj = paginator.get_page(page_number)
 
     
 
@@ -2299,19 +2051,11 @@ def program_list(request):
 
     if request.user.is_authenticated and not request.user.is_staff:
 
-        reg_qs = Registration.objects.filter(user=request.user)
-
-        cand_qs = Candidate.objects.filter(Q(created_by=request.user) | Q(email=request.user.email))
+        applicant = ApplicantState.for_request(request)
 
-        has_applied_any = reg_qs.exists() or cand_qs.exists()
+        has_applied_any = applicant.has_applied_any
 
-        if reg_qs.exists():
-
-            applied_program_ids.update(reg_qs.values_list('program_id', flat=True))
-
-        if cand_qs.exists():
-
-            applied_program_ids.update([pid for pid in cand_qs.values_list('program_id', flat=True) if pid is not None])
+        applied_program_ids = set(applicant.applied_program_ids)
 
     
 
@@ -2345,6 +2089,18 @@ def program_list(request):
 
 
 
+def _program_detail_etag(request, program_id):
+
+    return conditional.page_etag(request, (PROGRAMS, program_namespace(program_id)), _closed_program_count())
+
+
+
+
+
+@condition(etag_func=_program_detail_etag)
+
+@cache_view_result('programs', namespaces=(PROGRAMS, 'program:{program_id}'), key_func=_deadline_key)
+
 def program_detail(request, program_id):
 
     """Show details of a specific program"""
@@ -2363,28 +2119,21 @@ def program_detail(request, program_id):
 
     if request.user.is_authenticated:
 
-        try:
-
-            registration = Registration.objects.get(user=request.user, program=program)
-
-            user_registered = True
+        # Registrations and owned Candidates both count as applied
 
-        except Registration.DoesNotExist:
+        applicant = ApplicantState.for_request(request)
 
-            # Also consider an existing Candidate as applied
+        user_registered = applicant.has_applied_to(program.id)
 
-            if Candidate.objects.filter(program=program).filter(
+        registration_id = applicant.registration_id(program.id)
 
-                Q(created_by=request.user) | Q(email=request.user.email)
+        if registration_id is not None:
 
-            ).exists():
-
-                user_registered = True
+            registration = Registration.objects.filter(pk=registration_id).first()
 
         # One-time application rule across all programs
 
-        has_applied_any = Registration.objects.filter(user=request.user).exists() or \
-            Candidate.objects.filter(Q(created_by=request.user) | Q(email=request.user.email)).exists()
+        has_applied_any = applicant.has_applied_any
 
     
 
@@ -2522,11 +2271,9 @@ def apply_candidate(request, program_id):
 
     # 1) Already applied to this program
 
-    already_applied_this = Candidate.objects.filter(program=program).filter(
-
-        Q(created_by=request.user) | Q(email=request.user.email)
+    applicant = ApplicantState.for_request(request)
 
-    ).exists() or Registration.objects.filter(user=request.user, program=program).exists()
+    already_applied_this = applicant.has_applied_to(program.id)
 
     if already_applied_this:
 
@@ -2538,13 +2285,7 @@ def apply_candidate(request, program_id):
 
     # 2) One-time application: if applied anywhere else, block
 
-    has_applied_elsewhere = (
-
-        Registration.objects.filter(user=request.user).exclude(program=program).exists() or
-
-        Candidate.objects.filter(Q(created_by=request.user) | Q(email=request.user.email)).exclude(program=program).exists()
-
-    )
+    has_applied_elsewhere = applicant.has_applied_elsewhere(program.id)
 
     if has_applied_elsewhere:
 
@@ -2578,13 +2319,9 @@ def apply_candidate(request, program_id):
 
                 
 
-                # Re-check if user already applied (inside transaction)
+                # Re-check if user already applied (inside transaction, bypassing the cache)
 
-                already_applied_this = Candidate.objects.filter(program=program).filter(
-
-                    Q(created_by=request.user) | Q(email=request.user.email)
-
-                ).exists() or Registration.objects.filter(user=request.user, program=program).exists()
+                already_applied_this = ApplicantState.load(request.user, use_cache=False).has_applied_to(program.id)
 
                 if already_applied_this:
 
@@ -2744,7 +2481,7 @@ def apply_candidate(request, program_id):
 
                 # Atomically decrease program capacity
 
-                AgricultureProgram.objects.filter(id=program.id).update(capacity=F('capacity') - 1)
+                AgricultureProgram.objects.filter(id=program.id).update(capacity=F('capacity') - 1, updated_at=timezone.now())
 
 
 
@@ -2914,35 +2651,9 @@ AgroStudies Team
 
                 
 
-                # Clear related cache entries
-
-                try:
-
-                    cache_keys = [
-
-                        'candidate_list:all',
-
-                        f'program_candidates:{program_id}',
-
-                        f'program_detail:{program_id}',
-
-                        f'program_stats:{program_id}'
-
-                    ]
-
-                    for key in cache_keys:
-
-                        try:
-
-                            cache.delete(key)
-
-                        except Exception as e:
-
-                            logger.warning(f"Cache clear failed for key {key}: {e}")
+                # Capacity changed through update(), which sends no signal
 
-                except Exception as e:
-
-                    logger.warning(f"Cache operations failed: {e}")
+                invalidate_program_cache(program_id)
 
                 
 
@@ -3048,8 +2759,54 @@ def cancel_registration(request, registration_id):
 
 
 
+# CandidateSearchForm sort choice -> full ordering. The secondary keys mirror the
+
+# Candidate indexes, so every sort (and keyset page) is a single index scan.
+
+CANDIDATE_ORDERINGS = {
+
+    '-created_at': ('-created_at', '-id'),
+
+    'created_at': ('created_at', 'id'),
+
+    'first_name': ('first_name', 'last_name', 'id'),
+
+    '-first_name': ('-first_name', '-last_name', '-id'),
+
+    'email': ('email', 'id'),
+
+    '-email': ('-email', '-id'),
+
+    'gender': ('gender', '-created_at', '-id'),
+
+    'country_of_birth': ('country_of_birth', '-created_at', '-id'),
+
+    'nationality': ('nationality', '-created_at', '-id'),
+
+    'status': ('status', '-created_at', '-id'),
+
+}
+
+
+
+
+
+def _candidate_list_etag(request):
+
+    # Dates are shown relative to today
+
+    return conditional.page_etag(request, (CANDIDATES, PROGRAMS), timezone.localdate().isoformat())
+
+
+
+
+
 @login_required
 
+@vary_on_headers('X-Requested-With')
+
+@condition(etag_func=_candidate_list_etag)
+
 def candidate_list(request):
 
     """List candidates. Staff see all; applicants see only their own submission(s)."""
@@ -3064,7 +2821,7 @@ def candidate_list(request):
 
         candidates = Candidate.objects.select_related('program', 'created_by').filter(
 
-            Q(created_by=request.user) | Q(email=request.user.email)
+            ownership_q(request.user)
 
         )
 
@@ -3080,19 +2837,13 @@ def candidate_list(request):
 
         # Text search - search by name or email
 
-        search = form.cleaned_data.get('search')
+        search_text = form.cleaned_data.get('search')
 
-        if search:
+        if search_text:
 
-            candidates = candidates.filter(
+            # Indexed full-text search over name and email
 
-                Q(first_name__icontains=search) | 
-
-                Q(last_name__icontains=search) | 
-
-                Q(email__icontains=search)
-
-            )
+            candidates = search.filter_queryset(candidates, search_text)
 
 
 
@@ -3242,19 +2993,17 @@ def candidate_list(request):
 
         sort_by = form.cleaned_data.get('sort_by')
 
-        if sort_by:
+        ordering = CANDIDATE_ORDERINGS.get(sort_by, CANDIDATE_ORDERINGS['-created_at'])
 
-            candidates = candidates.order_by(sort_by)
-
-        else:
-
-            candidates = candidates.order_by('-created_at')
+        candidates = candidates.order_by(*ordering)
 
     else:
 
         # Default sorting for non-staff users
 
-        candidates = candidates.order_by('-created_at')
+        ordering = CANDIDATE_ORDERINGS['-created_at']
+
+        candidates = candidates.order_by(*ordering)
 
     
 
@@ -3298,13 +3047,11 @@ def candidate_list(request):
 
     
 
-    # Pagination
-
-    paginator = Paginator(candidates, 15)  # Show 15 candidates per page
+    # Keyset pagination: the cursor remembers the last row shown, so deep pages cost the same as page 1
 
-    page_number = request.GET.get('page')
+    paginator = KeysetPaginator(candidates, 15, ordering=ordering)  # Show 15 candidates per page
 
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_page(request.GET.get('cursor'), params=request.GET)
 
     
 
@@ -4226,49 +3973,7 @@ def delete_candidate(request, candidate_id):
 
         candidate_name = f"{candidate.first_name} {candidate.last_name}"
 
-        program_id = candidate.program.id if candidate.program else None
-
-        
-
-        # Clear cache before deletion
-
-        try:
-
-            cache_keys = [
-
-                'candidate_list:all',
-
-                f'candidate_detail:{candidate_id}',
-
-            ]
-
-            if program_id:
-
-                cache_keys.extend([
-
-                    f'program_candidates:{program_id}',
-
-                    f'program_detail:{program_id}',
-
-                ])
-
-            
-
-            for key in cache_keys:
-
-                try:
-
-                    cache.delete(key)
-
-                except Exception as e:
-
-                    logger.warning(f"Cache clear failed for key {key}: {e}")
-
-        except Exception as e:
-
-            logger.warning(f"Cache operations failed during candidate deletion: {e}")
-
-            # Continue with deletion even if cache fails
+        # The candidate post_delete signal invalidates the cached lists and program entries
 
         
 
@@ -4288,6 +3993,8 @@ def delete_candidate(request, candidate_id):
 
 
 
+@cache_view_result('static_content')
+
 def help_page(request):
 
     """Registration help page"""
@@ -4298,6 +4005,8 @@ def help_page(request):
 
 
 
+@cache_view_result('static_content')
+
 def contact_page(request):
 
     """Contact page"""
@@ -4356,11 +4065,9 @@ def program_registrants(request, program_id):
 
     # Pagination
 
-    paginator = Paginator(candidates_qs, 20)  # Show 20 candidates per page
+    paginator = KeysetPaginator(candidates_qs, 20, ordering=('-created_at', '-id'))  # Show 20 candidates per page
 
-    page_number = request.GET.get('page')
-
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_page(request.GET.get('cursor'), params=request.GET)
 
     
 
@@ -4962,11 +4669,15 @@ def mark_notification_read(request, notification_id):
 
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
 
-    notification.read = True
+    # Only the request that flips the flag decrements, so a double click counts once
+
+    updated = Notification.objects.filter(pk=notification.pk, read=False).update(read=True)
+
+    if updated:
+
+        notification_counts.decrement(request.user.pk, updated)
 
-    notification.save()
 
-    
 
     # Check if this is an AJAX request
 
@@ -4974,7 +4685,7 @@ def mark_notification_read(request, notification_id):
 
         # Get updated unread count
 
-        unread_count = Notification.objects.filter(user=request.user, read=False).count()
+        unread_count = notification_counts.get_count(request.user.pk)
 
         return JsonResponse({
 
@@ -5014,7 +4725,9 @@ def mark_all_read(request):
 
     
 
-    Notification.objects.filter(**filter_kwargs).update(read=True)
+    updated = Notification.objects.filter(**filter_kwargs).update(read=True)
+
+    notification_counts.decrement(request.user.pk, updated)
 
     
 
@@ -5042,9 +4755,27 @@ def delete_notification(request, notification_id):
 
     """Delete a specific notification"""
 
-    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+    # Delete it as unread first: a racing read or delete then finds nothing left to decrement
+
+    notifications = Notification.objects.filter(id=notification_id, user=request.user)
+
+    _, deleted = notifications.filter(read=False).delete()
+
+    unread = deleted.get(Notification._meta.label, 0)
 
-    notification.delete()
+    if unread:
+
+        notification_counts.decrement(request.user.pk, unread)
+
+    else:
+
+        _, deleted = notifications.delete()
+
+        if not deleted.get(Notification._meta.label, 0):
+
+            raise Http404('No Notification matches the given query.')
+
+        notification_counts.touch(request.user.pk)
 
     messages.success(request, 'Notification deleted.')
 
@@ -5088,6 +4819,16 @@ def delete_all_notifications(request):
 
     Notification.objects.filter(**filter_kwargs).delete()
 
+    if 'notification_type' in filter_kwargs:
+
+        # Unread notifications of other types remain
+
+        notification_counts.reset(request.user.pk)
+
+    else:
+
+        notification_counts.set_count(request.user.pk, 0)
+
     
 
     messages.success(request, 'All notifications have been deleted.')
@@ -5146,6 +4887,12 @@ def update_registration_status(request, registration_id, status):
 
     messages.success(request, f'Registration status updated to {status_display}.')
 
+    events.publish(registration.user_id, events.APPLICATION, {
+
+        'kind': 'registration', 'id': registration.id, 'status': status, 'status_display': status_display,
+
+    })
+
     
 
     # Determine notification type
@@ -5476,6 +5223,14 @@ def update_candidate_status(request, candidate_id, status):
 
     
 
+    events.publish({applicant_user.pk if applicant_user else None, candidate.created_by_id}, events.APPLICATION, {
+
+        'kind': 'candidate', 'id': candidate.id, 'status': normalized_status, 'status_display': status_display,
+
+    })
+
+    
+
     # Send in-app notification if we found an applicant user
 
     if applicant_user:
@@ -5728,8 +5483,24 @@ def validate_candidate(request, candidate_id):
 
 
 
+def _notifications_namespaces(request):
+
+    return [notifications_namespace(request.user.pk)]
+
+
+
+
+
 @login_required
 
+@condition(
+
+    etag_func=lambda request: conditional.data_etag(request, _notifications_namespaces(request)),
+
+    last_modified_func=lambda request: conditional.last_modified(_notifications_namespaces(request)),
+
+)
+
 def api_notifications(request):
 
     """API endpoint to get notifications for the current user"""
@@ -5768,7 +5539,41 @@ def api_notifications(request):
 
     
 
-    return JsonResponse({'notifications': notifications_data})
+    return JsonResponse({
+
+        'notifications': notifications_data,
+
+        'unread_count': notification_counts.get_count(request.user.pk),
+
+    })
+
+
+
+
+
+async def event_stream(request):
+
+    """Server-sent events (notifications, application status) for the signed-in user"""
+
+    if not isinstance(request, ASGIRequest):
+
+        # Under WSGI a long-lived stream would pin a worker; 204 makes EventSource give up and the page polls instead
+
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+
+    if not user.is_authenticated:
+
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(events.stream(events.subscribe(user.pk)), content_type='text/event-stream')
+
+    response['Cache-Control'] = 'no-cache'
+
+    response['X-Accel-Buffering'] = 'no'  # let nginx-style proxies pass events through immediately
+
+    return response
 
 
 
@@ -5784,6 +5589,8 @@ def api_clear_all_notifications(request):
 
         Notification.objects.filter(user=request.user).delete()
 
+        notification_counts.set_count(request.user.pk, 0)
+
         return JsonResponse({
 
             'success': True,
@@ -6036,8 +5843,26 @@ def ajax_register(request):
 
 
 
+def _applications_namespaces(request):
+
+    # Registrations bump the user's namespace, program renames bump PROGRAMS
+
+    return [user_namespace(request.user.pk), PROGRAMS]
+
+
+
+
+
 @login_required
 
+@condition(
+
+    etag_func=lambda request: conditional.data_etag(request, _applications_namespaces(request)),
+
+    last_modified_func=lambda request: conditional.last_modified(_applications_namespaces(request)),
+
+)
+
 def get_user_applications(request):
 
     """API endpoint to get user's program applications"""
@@ -6056,9 +5881,11 @@ def get_user_applications(request):
 
         'status_code': reg.status,
 
-        'application_date': reg.created_at.strftime('%Y-%m-%d'),
+        'application_date': reg.registration_date.strftime('%Y-%m-%d'),
+
+        # Registrations keep no modification time
 
-        'last_updated': reg.updated_at.strftime('%Y-%m-%d %H:%M')
+        'last_updated': reg.registration_date.strftime('%Y-%m-%d %H:%M')
 
     } for reg in registrations]
 
@@ -7412,17 +7239,7 @@ def manage_users(request):
 
     if search_query:
 
-        users = users.filter(
-
-            Q(username__icontains=search_query) |
-
-            Q(email__icontains=search_query) |
-
-            Q(first_name__icontains=search_query) |
-
-            Q(last_name__icontains=search_query)
-
-        )
+        users = search.filter_queryset(users, search_query)
 
     
 
@@ -7442,11 +7259,15 @@ def manage_users(request):
 
     # Pagination
 
-    paginator = Paginator(users, 20)
+    paginator = KeysetPaginator(users, 20, ordering=('-date_joined', '-id'))
 
-    page = request.GET.get('page', 1)
+    users_page = paginator.get_page(request.GET.get('cursor'), params=request.GET)
+
+    
+
+    # Totals come from the maintained stats counters
 
-    users_page = paginator.get_page(page)
+    user_totals = counters.user_counts()
 
     
 
@@ -7454,15 +7275,15 @@ def manage_users(request):
 
         'users': users_page,
 
-        'total_users': User.objects.count(),
+        'total_users': user_totals['total'],
 
-        'active_users': User.objects.filter(is_active=True).count(),
+        'active_users': user_totals['active'],
 
-        'staff_users': User.objects.filter(is_staff=True).count(),
+        'staff_users': user_totals['staff'],
 
-        'inactive_users': User.objects.filter(is_active=False).count(),
+        'inactive_users': user_totals['inactive'],
 
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': users_page.has_other_pages(),
 
         'page_obj': users_page,
 
@@ -7976,11 +7797,13 @@ def manage_programs(request):
 
     
 
-    # Count stats
+    # Count stats (total/featured from the maintained stats counters; "active" depends on now)
 
     now = timezone.now()
 
-    total = AgricultureProgram.objects.count()
+    program_totals = counters.get_status_counts('program')
+
+    total = sum(program_totals.values())
 
     active = AgricultureProgram.objects.filter(
 
@@ -7990,7 +7813,7 @@ def manage_programs(request):
 
     ).count()
 
-    featured = AgricultureProgram.objects.filter(is_featured=True).count()
+    featured = program_totals.get('featured', 0)
 
     
 
@@ -8382,11 +8205,9 @@ def manage_registrations(request):
 
         registrations = registrations.filter(
 
-            Q(user__username__icontains=search_query) |
+            Q(user__in=search.filter_queryset(User.objects.all(), search_query)) |
 
-            Q(user__email__icontains=search_query) |
-
-            Q(program__title__icontains=search_query)
+            Q(program__in=search.filter_queryset(AgricultureProgram.objects.all(), search_query))
 
         )
 
@@ -8400,11 +8221,15 @@ def manage_registrations(request):
 
     # Pagination
 
-    paginator = Paginator(registrations, 20)
+    paginator = KeysetPaginator(registrations, 20, ordering=('-registration_date', '-id'))
 
-    page = request.GET.get('page', 1)
+    registrations_page = paginator.get_page(request.GET.get('cursor'), params=request.GET)
 
-    registrations_page = paginator.get_page(page)
+    
+
+    # Totals come from the maintained stats counters
+
+    registration_totals = counters.get_status_counts('registration')
 
     
 
@@ -8412,15 +8237,15 @@ def manage_registrations(request):
 
         'registrations': registrations_page,
 
-        'total_registrations': Registration.objects.count(),
+        'total_registrations': sum(registration_totals.values()),
 
-        'pending_registrations': Registration.objects.filter(status='pending').count(),
+        'pending_registrations': registration_totals.get('pending', 0),
 
-        'approved_registrations': Registration.objects.filter(status='approved').count(),
+        'approved_registrations': registration_totals.get('approved', 0),
 
-        'rejected_registrations': Registration.objects.filter(status='rejected').count(),
+        'rejected_registrations': registration_totals.get('rejected', 0),
 
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': registrations_page.has_other_pages(),
 
         'page_obj': registrations_page,
 
@@ -8454,55 +8279,93 @@ def manage_activity_logs(request):
 
     model_filter = request.GET.get('model', '')
 
+    # '' = recent window, 'all' = every stored row, 'archive:YYYY-MM' = archived month
+
+    period = request.GET.get('period', '')
+
     
 
-    # Base queryset
+    if period.startswith('archive:'):
 
-    logs = ActivityLog.objects.select_related('user').order_by('-timestamp')
+        # Archived months are read from the compressed files on demand
 
-    
+        logs = activity_archive.read_archive(period.split(':', 1)[1], search_query, action_filter)
 
-    # Apply filters
+        model_names = sorted({log.model_name for log in logs})
 
-    if search_query:
+        if model_filter:
 
-        logs = logs.filter(
+            logs = [log for log in logs if log.model_name == model_filter]
 
-            Q(user__username__icontains=search_query) |
+    else:
 
-            Q(model_name__icontains=search_query) |
+        # Base queryset
 
-            Q(object_id__icontains=search_query)
+        logs = ActivityLog.objects.select_related('user').order_by('-timestamp')
 
-        )
+        if period != 'all':
 
-    
+            # Only the recent window by default; older rows are scanned on request
+
+            logs = logs.filter(timestamp__gte=activity_archive.recent_cutoff())
 
-    if action_filter:
+        
 
-        logs = logs.filter(action_type=action_filter)
+        # Get distinct model names for filter (from the same window)
 
-    
+        model_names = logs.order_by().values_list('model_name', flat=True).distinct()
 
-    if model_filter:
+        
 
-        logs = logs.filter(model_name=model_filter)
+        # Apply filters
 
-    
+        if search_query:
+
+            logs = logs.filter(
+
+                Q(user__username__icontains=search_query) |
+
+                Q(model_name__icontains=search_query) |
+
+                Q(object_id__icontains=search_query)
+
+            )
+
+        
+
+        if action_filter:
+
+            logs = logs.filter(action_type=action_filter)
 
-    # Get distinct model names for filter
+        
+
+        if model_filter:
 
-    model_names = ActivityLog.objects.values_list('model_name', flat=True).distinct()
+            logs = logs.filter(model_name=model_filter)
 
     
 
     # Pagination
 
-    paginator = Paginator(logs, 50)
+    if isinstance(logs, list):
 
-    page = request.GET.get('page', 1)
+        # An archived month is already in memory; page it by number
+
+        logs_page = Paginator(logs, 50).get_page(request.GET.get('page', 1))
+
+    else:
+
+        # Seek on (timestamp, id) and use the planner's row estimate for the total on PostgreSQL
+
+        paginator = KeysetPaginator(logs, 50, ordering=('-timestamp', '-id'), estimate_count=True)
 
-    logs_page = paginator.get_page(page)
+        logs_page = paginator.get_page(request.GET.get('cursor'), params=request.GET)
+
+    
+
+    # Totals come from the maintained stats counters
+
+    log_totals = counters.get_status_counts('activitylog')
 
     
 
@@ -8512,18 +8375,24 @@ def manage_activity_logs(request):
 
         'model_names': model_names,
 
-        'total_logs': ActivityLog.objects.count(),
+        'total_logs': sum(log_totals.values()),
 
-        'create_count': ActivityLog.objects.filter(action_type='CREATE').count(),
+        'create_count': log_totals.get('CREATE', 0),
 
-        'update_count': ActivityLog.objects.filter(action_type='UPDATE').count(),
+        'update_count': log_totals.get('UPDATE', 0),
 
-        'delete_count': ActivityLog.objects.filter(action_type='DELETE').count(),
+        'delete_count': log_totals.get('DELETE', 0),
 
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': logs_page.has_other_pages(),
 
         'page_obj': logs_page,
 
+        'period': period,
+
+        'archive_periods': activity_archive.list_archive_periods(),
+
+        'recent_days': activity_archive.get_config()['RECENT_DAYS'],
+
     }
 
     return render(request, 'management/activity_logs.html', context)
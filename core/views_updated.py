@@ -38,13 +38,12 @@ def program_register(request, program_id):
             
             # Create notifications for all admin users
             admin_users = User.objects.filter(is_staff=True)
-            for admin in admin_users:
-                Notification.add_notification(
-                    admin,
-                    f'New registration: {request.user.get_full_name() or request.user.username} has registered for {program.title}.',
-                    Notification.INFO,
-                    f'/programs/{program.id}/registrants/'
-                )
+            Notification.notify_many(
+                admin_users,
+                f'New registration: {request.user.get_full_name() or request.user.username} has registered for {program.title}.',
+                Notification.INFO,
+                f'/programs/{program.id}/registrants/'
+            )
             
             messages.success(request, f'Successfully registered for {program.title}!')
             return redirect('profile')
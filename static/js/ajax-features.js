@@ -8,6 +8,7 @@ document.addEventListener('DOMContentLoaded', function () {
     setupAjaxFormSubmissions();
     setupApplicationStatusTracking();
     setupNotificationRefresh();
+    setupEventStream();
 });
 
 /**
@@ -255,11 +256,6 @@ function setupApplicationStatusTracking() {
     const applicationContainer = document.getElementById('user-applications');
     if (applicationContainer) {
         fetchAndUpdateApplications(applicationContainer);
-
-        // Refresh every 30 seconds
-        setInterval(function () {
-            fetchAndUpdateApplications(applicationContainer);
-        }, 30000);
     }
 }
 
@@ -337,21 +333,104 @@ function getStatusClass(statusCode) {
  * Setup automatic notification refresh
  */
 function setupNotificationRefresh() {
-    const notificationDropdown = document.getElementById('notificationDropdown');
-    if (notificationDropdown) {
-        // Refresh notifications every 60 seconds
+    // Updates arrive through setupEventStream(); startPolling() is the fallback
+}
+
+let pollingStarted = false;
+
+/**
+ * Poll for notifications (every 60s) and application status (every 30s)
+ * when server-sent events are unavailable
+ */
+function startPolling() {
+    if (pollingStarted) {
+        return;
+    }
+    pollingStarted = true;
+
+    const applicationContainer = document.getElementById('user-applications');
+    if (applicationContainer) {
+        setInterval(function () {
+            fetchAndUpdateApplications(applicationContainer);
+        }, 30000);
+    }
+
+    if (document.getElementById('notificationDropdown')) {
         setInterval(function () {
             refreshNotifications();
         }, 60000);
     }
 }
 
+/**
+ * Subscribe to pushed notification and application-status events
+ */
+function setupEventStream() {
+    const applicationContainer = document.getElementById('user-applications');
+    const notificationDropdown = document.getElementById('notificationDropdown');
+    if (!applicationContainer && !notificationDropdown) {
+        return;
+    }
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource('/events/stream/');
+    let opened = false;
+
+    source.addEventListener('open', function () {
+        opened = true;
+    });
+
+    source.addEventListener('notification', function (event) {
+        const data = JSON.parse(event.data);
+        updateNotificationBadge(data.unread_count);
+    });
+
+    source.addEventListener('application', function () {
+        if (applicationContainer) {
+            fetchAndUpdateApplications(applicationContainer);
+        }
+    });
+
+    source.addEventListener('resync', function () {
+        refreshNotifications();
+        if (applicationContainer) {
+            fetchAndUpdateApplications(applicationContainer);
+        }
+    });
+
+    source.addEventListener('error', function () {
+        // CLOSED: the server refused the stream (e.g. 204 under WSGI); the browser will not retry
+        if (source.readyState === EventSource.CLOSED || !opened) {
+            source.close();
+            startPolling();
+        }
+    });
+}
+
+/**
+ * Show or hide the unread notification badge
+ */
+function updateNotificationBadge(unreadCount) {
+    const notificationBadge = document.querySelector('#notificationDropdown .badge');
+    if (!notificationBadge) {
+        return;
+    }
+    if (unreadCount > 0) {
+        notificationBadge.textContent = unreadCount;
+        notificationBadge.style.display = 'inline-block';
+    } else {
+        notificationBadge.style.display = 'none';
+    }
+}
+
 /**
  * Refresh notifications via AJAX
  */
 function refreshNotifications() {
     const notificationList = document.getElementById('notificationList');
-    const notificationBadge = document.querySelector('#notificationDropdown .badge');
     const dropdownEl = document.getElementById('notificationDropdown');
 
     if (notificationList) {
@@ -359,14 +438,7 @@ function refreshNotifications() {
             .then(response => response.json())
             .then(data => {
                 // Update notification count badge
-                if (data.unread_count > 0) {
-                    if (notificationBadge) {
-                        notificationBadge.textContent = data.unread_count;
-                        notificationBadge.style.display = 'inline-block';
-                    }
-                } else if (notificationBadge) {
-                    notificationBadge.style.display = 'none';
-                }
+                updateNotificationBadge(data.unread_count);
 
                 // Only update the dropdown content if it's not currently open
                 if (!dropdownEl || !dropdownEl.classList.contains('show')) {
@@ -120,8 +120,9 @@ function initCandidateList() {
             let url = new URL(window.location.href);
             let params = new URLSearchParams(url.search);
 
-            // Remove page parameter but keep other filters
+            // Remove page/cursor parameters but keep other filters
             params.delete('page');
+            params.delete('cursor');
             params.set('export', format);
 
             if (selectedOnly) {
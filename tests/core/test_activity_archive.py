@@ -0,0 +1,88 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from core import activity_archive, counters
+from core.models import ActivityLog
+from tests.factories import user_factory
+
+
+@pytest.fixture
+def archive_dir(tmp_path, settings):
+    settings.AUDIT_LOG = {**settings.AUDIT_LOG, "ARCHIVE_DIR": tmp_path / "archive", "RECENT_DAYS": 30}
+    return tmp_path / "archive"
+
+
+def _log(days_ago, **fields):
+    fields.setdefault("action_type", ActivityLog.ACTION_UPDATE)
+    fields.setdefault("model_name", "core.Candidate")
+    return ActivityLog.objects.create(timestamp=timezone.now() - timedelta(days=days_ago), **fields)
+
+
+def test_archive_moves_old_rows_to_monthly_files(db, archive_dir):
+    staff = user_factory(username="staff", is_staff=True)
+    old = [_log(400 + i, user=staff, object_id=str(i), after_data={"n": i}) for i in range(5)]
+    recent = _log(1, object_id="recent")
+    period = counters.format_period(old[0].timestamp)
+    updates_before = counters.get_status_counts("activitylog")[ActivityLog.ACTION_UPDATE]
+
+    result = activity_archive.archive_logs(older_than_days=365, chunk_size=2)
+
+    assert result["archived"] == 5
+    assert list(ActivityLog.objects.filter(model_name="core.Candidate")) == [recent]
+    assert counters.get_status_counts("activitylog")[ActivityLog.ACTION_UPDATE] == updates_before - 5
+
+    with gzip.open(activity_archive.archive_path(period), "rt") as handle:
+        rows = [json.loads(line) for line in handle]
+    assert {row["username"] for row in rows} == {"staff"}
+    assert period in activity_archive.list_archive_periods()
+
+
+def test_read_archive_filters_and_dedupes(db, archive_dir):
+    _log(400, object_id="a1", model_name="core.Candidate")
+    _log(400, object_id="b1", model_name="core.Profile", action_type=ActivityLog.ACTION_CREATE)
+    activity_archive.archive_logs(older_than_days=365)
+    period = activity_archive.list_archive_periods()[0]
+
+    # A re-run after an interrupted chunk may append the same rows again
+    with gzip.open(activity_archive.archive_path(period), "rt") as handle:
+        lines = handle.read()
+    with gzip.open(activity_archive.archive_path(period), "at") as handle:
+        handle.write(lines)
+
+    assert len(activity_archive.read_archive(period)) == 2
+    logs = activity_archive.read_archive(period, search_query="B1")
+    assert [log.object_id for log in logs] == ["b1"]
+    assert activity_archive.read_archive(period, action_filter=ActivityLog.ACTION_CREATE)[0].model_name == "core.Profile"
+
+
+def test_archive_command_dry_run(db, archive_dir):
+    _log(400)
+    out = StringIO()
+    call_command("archive_activity_logs", "--days", "365", "--dry-run", stdout=out)
+    assert "1 activity log(s) would be archived" in out.getvalue()
+    assert ActivityLog.objects.filter(model_name="core.Candidate").count() == 1
+    assert not archive_dir.exists()
+
+
+def test_activity_log_view_reads_recent_window_and_archives(db, client, archive_dir):
+    staff = user_factory(username="staff", is_staff=True)
+    _log(60, object_id="older-than-window")
+    _log(400, object_id="archived-row")
+    activity_archive.archive_logs(older_than_days=365)
+    period = activity_archive.list_archive_periods()[0]
+    client.force_login(staff)
+
+    url = reverse("manage_activity_logs")
+    ids = lambda resp: {log.object_id for log in resp.context["logs"]}
+    assert "older-than-window" not in ids(client.get(url))
+    assert "older-than-window" in ids(client.get(url, {"period": "all"}))
+    resp = client.get(url, {"period": f"archive:{period}"})
+    assert resp.status_code == 200
+    assert ids(resp) == {"archived-row"}
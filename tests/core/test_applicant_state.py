@@ -0,0 +1,154 @@
+import pytest
+from cachalot.api import cachalot_disabled
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.applicant_state import ApplicantState, cache_key
+from core.models import Candidate
+from tests.factories import candidate_factory, program_factory, registration_factory, user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(settings):
+    settings.CACHALOT_ENABLED = False
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def applicant(db):
+    return user_factory(username="applicant", email="applicant@example.com")
+
+
+def _request(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return request
+
+
+def test_one_query_resolves_registrations_and_owned_candidates(applicant, django_assert_num_queries):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    registered, emailed, other = program_factory(title="A"), program_factory(title="B"), program_factory(title="C")
+    registration_factory(user=applicant, program=registered)
+    # Entered by staff, owned through the applicant's e-mail address
+    candidate_factory(created_by=staff, email="applicant@example.com", program=emailed)
+    candidate_factory(created_by=staff, email="someone@example.com", program=other)
+
+    with django_assert_num_queries(1):
+        state = ApplicantState.load(applicant, use_cache=False)
+
+    assert state.applied_program_ids == {registered.pk, emailed.pk}
+    assert state.has_applied_any
+    assert state.has_applied_to(emailed.pk) and not state.has_applied_to(other.pk)
+    assert state.has_applied_elsewhere(registered.pk)
+    assert state.registration_id(registered.pk) is not None
+
+
+def test_blank_email_does_not_claim_other_candidates(db):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    candidate_factory(created_by=staff, email="")
+    user = user_factory(username="noemail", email="")
+    assert not ApplicantState.load(user).has_applied_any
+
+
+def test_unassigned_candidate_counts_as_applied_elsewhere(applicant):
+    program = program_factory()
+    candidate_factory(created_by=applicant, program=None)
+    state = ApplicantState.load(applicant)
+    assert state.has_applied_elsewhere(program.pk)
+    assert state.applied_program_ids == frozenset()
+
+
+def test_memoised_per_request_and_cached_per_user(applicant, django_assert_num_queries):
+    request = _request(applicant)
+    with django_assert_num_queries(1):
+        first = ApplicantState.for_request(request)
+        assert ApplicantState.for_request(request) is first
+    with django_assert_num_queries(0):
+        ApplicantState.for_request(_request(applicant))
+    assert cache.get(cache_key(applicant.pk)) == []
+
+
+def test_signals_invalidate_cached_state(applicant, django_capture_on_commit_callbacks):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    program = program_factory()
+    assert not ApplicantState.load(applicant).has_applied_any
+
+    with django_capture_on_commit_callbacks(execute=True):
+        candidate = candidate_factory(created_by=staff, email="applicant@example.com", program=program)
+    assert ApplicantState.load(applicant).has_applied_to(program.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        candidate.delete()
+    assert not ApplicantState.load(applicant).has_applied_any
+
+    registration_factory(user=applicant, program=program)
+    assert ApplicantState.load(applicant).has_applied_to(program.pk)
+
+
+def test_moving_a_candidate_invalidates_its_previous_owner(applicant):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    candidate = candidate_factory(created_by=staff, email="applicant@example.com", program=program_factory())
+    candidate = Candidate.objects.get(pk=candidate.pk)
+    for user in (applicant, staff):
+        cache.set(cache_key(user.pk), [["candidate", candidate.program_id, candidate.pk, candidate.status]])
+
+    candidate.email = "someone@example.com"
+    candidate.created_by = user_factory(username="other", email="other@example.com")
+    candidate.save()
+
+    assert cache.get(cache_key(applicant.pk)) is None
+    assert cache.get(cache_key(staff.pk)) is None
+    assert not ApplicantState.load(applicant).has_applied_any
+
+    # Nothing the states show changed: no e-mail owner lookup
+    candidate.specialization = "Dairy"
+    with cachalot_disabled(), CaptureQueriesContext(connection) as queries:
+        candidate.save()
+    print("Q", [q["sql"][:60] for q in queries]);     assert not [query for query in queries if '"auth_user"' in query["sql"]]
+
+
+def test_uncommitted_changes_are_not_cached(applicant):
+    program = program_factory()
+    try:
+        with transaction.atomic():
+            candidate_factory(created_by=applicant, program=program)
+            assert ApplicantState.load(applicant).has_applied_to(program.pk)
+            raise DatabaseError("rolled back")
+    except DatabaseError:
+        pass
+    assert cache.get(cache_key(applicant.pk)) is None
+    assert not ApplicantState.load(applicant).has_applied_any
+
+
+def test_email_change_invalidates_cached_state(applicant):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    candidate_factory(created_by=staff, email="new@example.com")
+    assert not ApplicantState.load(applicant).has_applied_any
+
+    # Logins save only last_login and keep the cached state
+    applicant.save(update_fields=["last_login"])
+    assert cache.get(cache_key(applicant.pk)) is not None
+
+    applicant.email = "new@example.com"
+    applicant.save()
+    assert ApplicantState.load(applicant).has_applied_any
+
+
+def test_program_pages_use_the_resolved_state(applicant, client):
+    program = program_factory(title="Orchard")
+    candidate_factory(created_by=applicant, email="applicant@example.com", program=program)
+    client.force_login(applicant)
+
+    response = client.get(reverse("program_list"))
+    assert response.context["applied_program_ids"] == {program.pk}
+    assert response.context["has_applied_any"]
+
+    response = client.get(reverse("program_detail", args=[program.pk]))
+    assert response.context["user_registered"]
+    assert response.context["registration"] is None
+    assert Candidate.objects.count() == 1
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from core import audit
+from core.models import ActivityLog
+from tests.factories import candidate_factory, user_factory
+
+THREADS = 8
+SAVES_PER_THREAD = 10
+
+
+def _retry_when_locked(execute, sql, params, many, context):
+    # Shared-cache in-memory SQLite reports "table is locked" instead of honouring
+    # a busy timeout; retry the statement like a file database would wait
+    for _ in range(500):
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            time.sleep(0.002)
+    return execute(sql, params, many, context)
+
+
+def _logs(pk, action):
+    return ActivityLog.objects.filter(
+        model_name="core.Candidate", object_id=str(pk), action_type=action
+    ).order_by("pk")
+
+
+@pytest.mark.slow
+def test_concurrent_saves_log_their_own_before_snapshots(transactional_db):
+    staff = user_factory(username="staff", is_staff=True)
+    barrier = threading.Barrier(THREADS)
+    leftovers = []
+
+    def work(index):
+        try:
+            with connection.execute_wrapper(_retry_when_locked):
+                barrier.wait()
+                candidate = candidate_factory(created_by=staff, passport_number=f"T{index}", first_name="v0")
+                for step in range(1, SAVES_PER_THREAD + 1):
+                    if step % 3 == 0:
+                        with transaction.atomic():
+                            candidate.first_name = f"v{step}"
+                            candidate.save()
+                    else:
+                        candidate.first_name = f"v{step}"
+                        candidate.save()
+                leftovers.append(audit.pending_records())
+                return candidate.pk
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        pks = list(pool.map(work, range(THREADS)))
+
+    assert leftovers == [0] * THREADS
+    for index, pk in enumerate(pks):
+        created = _logs(pk, ActivityLog.ACTION_CREATE).get()
+        assert created.after_data["passport_number"] == f"T{index}"
+        updates = list(_logs(pk, ActivityLog.ACTION_UPDATE))
+        assert len(updates) == SAVES_PER_THREAD
+        for step, log in enumerate(updates, start=1):
+            assert log.before_data["first_name"] == f"v{step - 1}"
+            assert log.after_data["first_name"] == f"v{step}"
+
+
+def test_failed_save_leaves_no_stale_snapshot(db):
+    staff = user_factory(username="staff", is_staff=True)
+    candidate = candidate_factory(created_by=staff, first_name="Old", last_name="Cruz")
+
+    candidate.first_name = "New"
+    candidate.last_name = None
+    with pytest.raises(IntegrityError):
+        with transaction.atomic():
+            candidate.save()
+
+    candidate.last_name = "Cruz"
+    candidate.save()
+    log = _logs(candidate.pk, ActivityLog.ACTION_UPDATE).get()
+    assert log.before_data == {"first_name": "Old", "updated_at": log.before_data["updated_at"]}
+    assert log.after_data["first_name"] == "New"
+    assert audit.pending_records() == 0
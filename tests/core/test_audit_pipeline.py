@@ -0,0 +1,102 @@
+import pytest
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import audit
+from core.middleware import RequestContextMiddleware
+from core.models import ActivityLog, Candidate
+from tests.factories import candidate_factory, user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    audit.reset_metrics()
+    yield
+    audit.reset_metrics()
+
+
+def _candidate_logs(action=None):
+    qs = ActivityLog.objects.filter(model_name="core.Candidate")
+    return qs.filter(action_type=action) if action else qs
+
+
+def test_transaction_logs_flush_once_on_commit(db, django_capture_on_commit_callbacks):
+    staff = user_factory(username="staff", is_staff=True)
+    flushes = audit.get_metrics()["flushes"]
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            candidate = candidate_factory(created_by=staff, passport_number="P1")
+            candidate.status = Candidate.VALIDATED
+            candidate.save()
+            assert not _candidate_logs().exists()
+
+    assert _candidate_logs(ActivityLog.ACTION_CREATE).count() == 1
+    assert _candidate_logs(ActivityLog.ACTION_UPDATE).count() == 1
+    assert audit.get_metrics()["flushes"] == flushes + 1
+
+
+def test_rolled_back_savepoint_discards_its_logs(db, django_capture_on_commit_callbacks):
+    staff = user_factory(username="staff", is_staff=True)
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            kept = candidate_factory(created_by=staff, passport_number="P1")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    candidate_factory(created_by=staff, passport_number="P2")
+                    raise RuntimeError("rollback")
+
+    assert list(_candidate_logs().values_list("object_id", flat=True)) == [str(kept.pk)]
+
+
+def test_buffered_block_defers_autocommit_logs(db):
+    staff = user_factory(username="staff", is_staff=True)
+    with audit.buffered():
+        for i in range(3):
+            candidate_factory(created_by=staff, passport_number=f"P{i}")
+        assert not _candidate_logs().exists()
+
+    assert _candidate_logs(ActivityLog.ACTION_CREATE).count() == 3
+    assert audit.get_metrics()["written"] >= 3
+
+
+def test_request_logs_are_flushed_with_the_response(db):
+    staff = user_factory(username="staff", is_staff=True)
+    request = RequestFactory().get("/")
+    request.user = staff
+    request.session = type("S", (), {"session_key": "abc"})()
+
+    def view(req):
+        candidate_factory(created_by=staff, passport_number="P1")
+        assert not _candidate_logs().exists()
+        return HttpResponse("ok")
+
+    RequestContextMiddleware(view)(request)
+    log = _candidate_logs(ActivityLog.ACTION_CREATE).get()
+    assert log.user == staff
+    assert log.session_key == "abc"
+
+
+def test_writer_drops_when_queue_full(db):
+    writer = audit.AuditWriter(queue_size=1, batch_size=10, overflow="drop")
+    writer.submit([ActivityLog(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Test")])
+    writer.submit([ActivityLog(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Test")] * 2)
+
+    metrics = audit.get_metrics()
+    assert metrics["queued"] == 1
+    assert metrics["dropped"] == 2
+
+    assert writer.drain() == 1
+    assert ActivityLog.objects.filter(model_name="core.Test").count() == 1
+
+
+def test_writer_applies_backpressure_when_queue_full(db):
+    writer = audit.AuditWriter(queue_size=1, batch_size=10, overflow="block", block_timeout=0)
+    writer.submit([ActivityLog(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Test")])
+    writer.submit([ActivityLog(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Test")])
+
+    metrics = audit.get_metrics()
+    assert metrics["blocked"] == 1
+    assert metrics["sync_fallbacks"] == 1
+    # The overflowing batch was written inline by the caller
+    assert ActivityLog.objects.filter(model_name="core.Test").count() == 1
@@ -0,0 +1,103 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import ActivityLog, Candidate
+from tests.factories import candidate_factory, user_factory
+
+
+def _updates(candidate):
+    return ActivityLog.objects.filter(
+        model_name="core.Candidate", object_id=str(candidate.pk), action_type=ActivityLog.ACTION_UPDATE
+    ).order_by("pk")
+
+
+def test_update_logs_only_changed_fields_without_refetch(db):
+    staff = user_factory(username="staff", is_staff=True)
+    candidate = Candidate.objects.get(pk=candidate_factory(created_by=staff, first_name="Old").pk)
+
+    candidate.first_name = "New"
+    with CaptureQueriesContext(connection) as ctx:
+        candidate.save(update_fields=["first_name"])
+
+    assert not [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and '"core_candidate"' in q["sql"]]
+    log = _updates(candidate).get()
+    assert log.before_data == {"first_name": "Old"}
+    assert log.after_data == {"first_name": "New"}
+
+
+def test_create_log_keeps_full_snapshot(db):
+    staff = user_factory(username="staff", is_staff=True)
+    candidate = candidate_factory(created_by=staff, first_name="Ana")
+    log = ActivityLog.objects.get(
+        model_name="core.Candidate", object_id=str(candidate.pk), action_type=ActivityLog.ACTION_CREATE
+    )
+    assert log.before_data is None
+    assert log.after_data["first_name"] == "Ana"
+    assert log.after_data["passport_number"] == candidate.passport_number
+
+
+def test_instance_with_explicit_pk_is_diffed_against_stored_row(db):
+    staff = user_factory(username="staff", is_staff=True)
+    candidate = candidate_factory(created_by=staff, first_name="Old")
+    detached = Candidate.objects.get(pk=candidate.pk)
+    detached.__dict__.pop("_audit_loaded_state")
+
+    detached.first_name = "New"
+    detached.save()
+    log = _updates(candidate).last()
+    assert log.before_data["first_name"] == "Old"
+    assert "last_name" not in log.before_data
+
+
+def test_rollback_rebuilds_full_previous_state(db):
+    staff = user_factory(username="staff", is_staff=True)
+    candidate = candidate_factory(created_by=staff, first_name="Ana", last_name="Cruz")
+
+    candidate.first_name = "Bea"
+    candidate.save()
+    candidate.last_name = "Reyes"
+    candidate.save()
+    first_update, second_update = _updates(candidate)
+    assert "last_name" not in first_update.before_data
+
+    state = first_update.previous_state()
+    assert state["first_name"] == "Ana"
+    assert state["last_name"] == "Cruz"
+    assert state["passport_number"] == candidate.passport_number
+
+    first_update.rollback()
+    candidate.refresh_from_db()
+    assert (candidate.first_name, candidate.last_name) == ("Ana", "Cruz")
+
+
+def test_compact_activity_logs_command(db):
+    legacy = ActivityLog.objects.create(
+        action_type=ActivityLog.ACTION_UPDATE,
+        model_name="core.Candidate",
+        object_id="1",
+        before_data={"first_name": "Old", "last_name": "Same", "status": "Draft"},
+        after_data={"first_name": "New", "last_name": "Same", "status": "Draft"},
+    )
+    compact = ActivityLog.objects.create(
+        action_type=ActivityLog.ACTION_UPDATE,
+        model_name="core.Candidate",
+        object_id="1",
+        before_data={"status": "Draft"},
+        after_data={"status": "Approved"},
+    )
+
+    out = StringIO()
+    call_command("compact_activity_logs", "--dry-run", stdout=out)
+    assert "1 of 2" in out.getvalue()
+    legacy.refresh_from_db()
+    assert len(legacy.before_data) == 3
+
+    call_command("compact_activity_logs", "--batch-size", "1", stdout=StringIO())
+    legacy.refresh_from_db()
+    compact.refresh_from_db()
+    assert legacy.before_data == {"first_name": "Old"}
+    assert legacy.after_data == {"first_name": "New"}
+    assert compact.after_data == {"status": "Approved"}
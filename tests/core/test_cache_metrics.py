@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from core import cache_metrics
+from core.cache_metrics import cache
+from core.cache_utils import get_or_compute, local_cache
+from tests.factories import user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    django_cache.clear()
+    local_cache.clear()
+    cache_metrics.reset()
+    yield
+    django_cache.clear()
+    cache_metrics.reset()
+
+
+def _stats(tier, namespace):
+    return cache_metrics.snapshot()[tier][namespace]
+
+
+def test_reads_and_writes_are_counted_per_namespace():
+    assert cache.get("programs_list:rows") is None
+    cache.set("programs_list:rows", [1, 2, 3])
+    assert cache.get("programs_list:rows") == [1, 2, 3]
+    # A cached falsy value is a hit, not a miss
+    cache.set("unread_notifications:1", 0)
+    assert cache.get("unread_notifications:1", "default") == 0
+    assert cache.get_many(["unread_notifications:1", "unread_notifications:2"]) == {"unread_notifications:1": 0}
+
+    programs = _stats("shared", "programs_list")
+    assert (programs["hits"], programs["misses"], programs["sets"]) == (1, 1, 1)
+    assert programs["set_bytes"] > 0
+    assert sum(programs["get_latency"]) == 2
+    counters = _stats("shared", "unread_notifications")
+    assert (counters["hits"], counters["misses"]) == (2, 1)
+
+
+def test_hot_cache_reports_the_local_tier(db):
+    for _ in range(3):
+        get_or_compute("dashboard_stats", lambda: {"total": 1})
+    local = _stats("local", "dashboard_stats")
+    assert (local["hits"], local["misses"]) == (2, 1)
+    # Only the first lookup reached the shared cache
+    assert _stats("shared", "dashboard_stats")["misses"] == 1
+
+
+def test_counters_from_other_threads_are_aggregated():
+    worker = threading.Thread(target=lambda: [cache.get("view:missing") for _ in range(5)])
+    worker.start()
+    worker.join()
+    cache.get("view:missing")
+    assert _stats("shared", "view")["misses"] == 6
+
+
+def test_finished_threads_are_folded_into_the_process_total():
+    for _ in range(20):
+        worker = threading.Thread(target=lambda: cache.get("view:missing"))
+        worker.start()
+        worker.join()
+    assert _stats("shared", "view")["misses"] == 20
+    # Only live threads keep their own counters
+    assert all(thread.is_alive() for thread, _counters in cache_metrics._all_counters)
+    cache_metrics.reset()
+    assert cache_metrics.snapshot() == {}
+
+
+def test_written_sizes_are_sampled(monkeypatch):
+    measured = []
+    size = cache_metrics._size
+    monkeypatch.setattr(cache_metrics, "_size", lambda value: measured.append(value) or size(value))
+    for number in range(cache_metrics.SIZE_SAMPLE_RATE + 1):
+        cache.set(f"programs_list:{number}", "x" * 100)
+
+    assert len(measured) == 2
+    stats = _stats("shared", "programs_list")
+    assert stats["sets"] == cache_metrics.SIZE_SAMPLE_RATE + 1
+    assert stats["set_bytes"] == 2 * cache_metrics.SIZE_SAMPLE_RATE * size("x" * 100)
+
+
+def test_metrics_endpoint_is_restricted_and_prometheus_formatted(db, client, settings):
+    cache.get("programs_list:rows")
+    url = reverse("metrics")
+    assert client.get(url).status_code == 403
+
+    settings.METRICS_TOKEN = "scrape-me"
+    response = client.get(url, HTTP_AUTHORIZATION="Bearer scrape-me")
+    assert response.status_code == 200
+    body = response.content.decode()
+    assert 'agrostudies_cache_misses_total{tier="shared",namespace="programs_list"} 1' in body
+    assert 'agrostudies_cache_get_seconds_bucket{tier="shared",namespace="programs_list",le="+Inf"} 1' in body
+
+    client.force_login(user_factory(username="staff", is_staff=True))
+    settings.METRICS_TOKEN = ""
+    assert client.get(url).status_code == 200
+
+
+def test_published_snapshots_of_other_workers_are_merged(monkeypatch):
+    cache.get("programs_list:rows")
+    monkeypatch.setattr(cache_metrics, "process_id", lambda: "web-1:100")
+    cache_metrics.publish()
+    monkeypatch.setattr(cache_metrics, "process_id", lambda: "web-2:200")
+    cache_metrics.reset()
+    cache.get("programs_list:rows")
+
+    collected = cache_metrics.collect()
+    assert collected["processes"] == 2
+    assert collected["tiers"]["shared"]["programs_list"]["misses"] == 2
+
+
+def test_health_and_command_report_totals(db, client, capsys):
+    cache.set("dashboard_stats", {"total": 1})
+    cache.get("dashboard_stats")
+    health = client.get(reverse("health_check")).json()
+    assert health["performance"]["cache_metrics"]["shared"]["hits"] >= 1
+
+    call_command("cache_stats", "--tier", "shared")
+    output = capsys.readouterr().out
+    assert "dashboard_stats" in output and "shared:" in output
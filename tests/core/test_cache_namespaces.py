@@ -0,0 +1,112 @@
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.cache_utils import (
+    CANDIDATES,
+    PROGRAMS,
+    bump_generation,
+    cache_view_result,
+    generation_key,
+    get_generations,
+    get_or_set_stats,
+    namespaced_key,
+    program_namespace,
+    user_namespace,
+)
+from tests.factories import candidate_factory, program_factory, registration_factory, user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(db):
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_bump_makes_old_entries_unreachable():
+    key = namespaced_key(PROGRAMS, "programs_list", "all")
+    cache.set(key, ["old"])
+    assert cache.get(namespaced_key(PROGRAMS, "programs_list", "all")) == ["old"]
+
+    bump_generation(PROGRAMS)
+    assert namespaced_key(PROGRAMS, "programs_list", "all") != key
+    assert cache.get(namespaced_key(PROGRAMS, "programs_list", "all")) is None
+
+
+def test_entry_under_several_namespaces_follows_each_of_them():
+    namespaces = (PROGRAMS, program_namespace(1))
+    first = namespaced_key(namespaces, "program_detail", 1)
+
+    bump_generation(program_namespace(2))
+    assert namespaced_key(namespaces, "program_detail", 1) == first
+
+    bump_generation(PROGRAMS)
+    second = namespaced_key(namespaces, "program_detail", 1)
+    assert second != first
+
+    bump_generation(program_namespace(1))
+    assert namespaced_key(namespaces, "program_detail", 1) not in (first, second)
+
+
+def test_evicted_generation_counter_never_reuses_old_keys():
+    before = get_generations([CANDIDATES])[CANDIDATES]
+    cache.delete(generation_key(CANDIDATES))
+    bump_generation(CANDIDATES)
+    assert get_generations([CANDIDATES])[CANDIDATES] > before
+
+
+def test_stats_and_views_are_cached_per_generation():
+    calls = []
+
+    def stats():
+        calls.append(1)
+        return {"total": len(calls)}
+
+    assert get_or_set_stats("candidate_stats", stats, namespaces=[CANDIDATES]) == {"total": 1}
+    assert get_or_set_stats("candidate_stats", stats, namespaces=[CANDIDATES]) == {"total": 1}
+    bump_generation(CANDIDATES)
+    assert get_or_set_stats("candidate_stats", stats, namespaces=[CANDIDATES]) == {"total": 2}
+
+    @cache_view_result("programs", namespaces=(PROGRAMS, "program:{pk}"))
+    def detail(request, pk):
+        calls.append(pk)
+        return HttpResponse(str(len(calls)))
+
+    request = RequestFactory().get("/programs/7/")
+    request.user = type("Anonymous", (), {"is_authenticated": False, "is_staff": False})()
+    body = detail(request, pk=7).content
+    assert detail(request, pk=7).content == body
+    bump_generation(program_namespace(7))
+    assert detail(request, pk=7).content != body
+
+
+def test_signals_bump_the_affected_namespaces(db):
+    user = user_factory(username="applicant")
+    program = program_factory()
+    watched = [PROGRAMS, CANDIDATES, program_namespace(program.pk), user_namespace(user.pk)]
+    before = get_generations(watched)
+
+    candidate_factory(created_by=user, program=program)
+    after = get_generations(watched)
+    assert after[PROGRAMS] == before[PROGRAMS]
+    assert all(after[name] > before[name] for name in watched[1:])
+
+    registration_factory(user=user, program=program)
+    assert get_generations([user_namespace(user.pk)])[user_namespace(user.pk)] > after[user_namespace(user.pk)]
+
+    program.title = "Renamed"
+    program.save()
+    assert get_generations([PROGRAMS])[PROGRAMS] > before[PROGRAMS]
+
+
+def test_program_list_drops_cached_list_when_programs_change(db, client):
+    program_factory(title="First")
+    response = client.get(reverse("program_list"))
+    assert [p.title for p in response.context["page_obj"]] == ["First"]
+
+    program_factory(title="Second")
+    response = client.get(reverse("program_list"))
+    assert {p.title for p in response.context["page_obj"]} == {"First", "Second"}
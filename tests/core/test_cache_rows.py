@@ -0,0 +1,101 @@
+import datetime
+import json
+import pickle
+import time
+import uuid
+import zlib
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template import Context, Template
+from django.utils import timezone
+from django_redis.serializers.json import JSONSerializer
+
+from core.cache_rows import RowSet
+from core.cache_serializers import CompactSerializer
+from core.cache_utils import get_or_compute, local_cache
+from core.models import AgricultureProgram
+from tests.factories import program_factory
+
+serializer = CompactSerializer({})
+
+
+def test_rowset_round_trips_exact_types():
+    moment = timezone.now()
+    rows = RowSet(
+        ("id", "title", "deadline", "start", "fee", "token", "duration"),
+        [
+            (1, "Dairy", moment, datetime.date(2026, 3, 1), Decimal("12.50"), uuid.UUID(int=7), datetime.timedelta(days=2)),
+            (2, "Orchard", None, datetime.date(2026, 4, 1), None, None, None),
+        ],
+    )
+    value = {"value": rows, "expires": 1.5, "nested": [rows]}
+
+    for restored in (serializer.loads(serializer.dumps(value)), pickle.loads(pickle.dumps(value))):
+        assert restored == value
+        first = restored["value"][0]
+        assert (first.title, first.deadline, first.fee) == ("Dairy", moment, Decimal("12.50"))
+        assert restored["value"].column("id") == [1, 2]
+
+
+def test_serializer_still_reads_json_entries():
+    legacy = JSONSerializer({}).dumps({"rows": [[1, "2026-03-01"]], "count": 1})
+    assert serializer.loads(legacy) == {"rows": [[1, "2026-03-01"]], "count": 1}
+    assert serializer.loads(serializer.dumps({"count": 1})) == {"count": 1}
+
+
+def test_rows_render_like_model_instances(db):
+    program = program_factory(title="Greenhouse")
+    rows = RowSet.from_queryset(AgricultureProgram.objects.all(), "id", "title", "start_date")
+    rendered = Template("{% for p in rows %}{{ p.id }}:{{ p.title }}:{{ p.start_date|date:'Y' }}{% endfor %}").render(
+        Context({"rows": rows})
+    )
+    assert rendered == f"{program.pk}:Greenhouse:{program.start_date.year}"
+
+
+def test_hot_cache_serves_rowsets(db, django_assert_num_queries):
+    cache.clear()
+    local_cache.clear()
+    program_factory(title="Vineyard")
+
+    def compute():
+        return RowSet.from_queryset(AgricultureProgram.objects.all(), "id", "title")
+
+    first = get_or_compute("test:rows", compute)
+    local_cache.clear()
+    with django_assert_num_queries(0):
+        assert get_or_compute("test:rows", compute) == first
+    cache.clear()
+
+
+@pytest.mark.slow
+def test_rowset_size_and_decode_benchmark():
+    fields = ("id", "first_name", "last_name", "email", "status", "program_id", "created_at")
+    created = timezone.now()
+    rows = [
+        (i, f"First{i}", f"Last{i % 997}", f"person{i}@example.com", "Validated", i % 40, created)
+        for i in range(5000)
+    ]
+    as_dicts = [dict(zip(fields, row)) for row in rows]
+
+    json_raw = json.dumps(as_dicts, cls=DjangoJSONEncoder).encode()
+    compact_raw = serializer.dumps(RowSet(fields, rows))
+    # Production compresses with zlib after serialising
+    json_bytes, compact_bytes = zlib.compress(json_raw), zlib.compress(compact_raw)
+
+    def decode_time(decode, payload):
+        started = time.perf_counter()
+        for _ in range(20):
+            decode(zlib.decompress(payload))
+        return (time.perf_counter() - started) / 20
+
+    json_decode = decode_time(lambda data: json.loads(data.decode()), json_bytes)
+    compact_decode = decode_time(serializer.loads, compact_bytes)
+    print(
+        f"5000 rows: JSON dicts {len(json_raw)} B raw, {len(json_bytes)} B zlib, {json_decode * 1000:.1f} ms decode; "
+        f"RowSet {len(compact_raw)} B raw, {len(compact_bytes)} B zlib, {compact_decode * 1000:.1f} ms decode"
+    )
+    assert len(compact_raw) < len(json_raw) / 2
+    assert len(compact_bytes) < len(json_bytes)
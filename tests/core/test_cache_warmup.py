@@ -0,0 +1,78 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from core import cache_utils, views
+from core.cache_utils import local_cache, warm_cache
+from core.forms import CandidateForm, university_names
+from core.models import University
+from core.stats import cached_dashboard_stats
+from tests.factories import program_factory, university_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(settings):
+    settings.CACHALOT_ENABLED = False
+    cache.clear()
+    local_cache.clear()
+    yield
+    cache.clear()
+    local_cache.clear()
+
+
+# Warmers run in worker threads, which only see committed rows
+@pytest.mark.django_db(transaction=True)
+def test_warmed_entries_are_served_without_queries(django_assert_num_queries):
+    programs = [program_factory(title=f"Program {number}") for number in range(4)]
+    university_factory(name="Central Luzon State University", code="CLSU")
+
+    report = warm_cache(workers=4)
+    assert {entry["name"] for entry in report} == {"program_list", "index_programs", "dashboard_stats", "universities"}
+    assert all(entry["error"] is None and entry["seconds"] >= 0 for entry in report)
+
+    # A fresh web process finds the entries in the shared cache
+    local_cache.clear()
+    with django_assert_num_queries(0):
+        assert {pk for pk, _deadline in views._program_list_rows()} == {p.pk for p in programs}
+        assert len(views._index_program_ids()) == 4
+        assert university_names() == ["Central Luzon State University"]
+        assert cached_dashboard_stats()["total_programs"] == 4
+
+
+def test_failing_warmer_is_reported_not_raised(db, monkeypatch):
+    def broken():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setitem(cache_utils._warmers, "broken", broken)
+    report = warm_cache(names=["broken", "universities"], workers=1)
+    assert [(entry["name"], entry["error"]) for entry in report] == [
+        ("universities", None),
+        ("broken", "database unavailable"),
+    ]
+
+    with pytest.raises(ValueError):
+        warm_cache(names=["missing"])
+
+
+def test_university_picker_uses_the_cached_names(db, django_assert_num_queries):
+    university_factory(name="Benguet State University", code="BSU")
+    assert university_names() == ["Benguet State University"]
+
+    form = CandidateForm()
+    with django_assert_num_queries(0):
+        options = list(form.fields["university"].choices)
+    assert options == [("", "Select University"), ("Benguet State University", "Benguet State University")]
+    assert 'value="Benguet State University"' in str(form["university"])
+
+    # New universities show up, and submitted values are still checked against the table
+    university_factory(name="Visayas State University", code="VSU")
+    assert "Visayas State University" in dict(CandidateForm().fields["university"].choices)
+    field = CandidateForm().fields["university"]
+    assert field.clean("Visayas State University") == University.objects.get(code="VSU")
+
+
+def test_command_reports_time_per_entry(db, capsys):
+    call_command("warm_cache", "--only", "universities", "--only", "index_programs", "--workers", "1")
+    output = capsys.readouterr().out
+    assert "universities:" in output and "index_programs:" in output
+    assert "Successfully warmed 2 cache entries" in output
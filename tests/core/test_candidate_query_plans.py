@@ -0,0 +1,148 @@
+"""
+Query-plan regression suite for the candidate list.
+
+Every filter combination CandidateSearchForm can produce is sent through
+candidate_list; each SELECT it runs against core_candidate is re-run under
+EXPLAIN and must not fall back to a sequential scan of the table.
+"""
+
+import itertools
+import random
+import re
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import search
+from core.forms import CandidateSearchForm
+from core.models import Candidate
+from tests.factories import program_factory, user_factory
+
+NATIONALITIES = ["Filipino", "Thai", "Vietnamese", "Indonesian", "Nepali"]
+COUNTRIES = ["Philippines", "Thailand", "Vietnam", "Indonesia", "Nepal"]
+SPECIALIZATIONS = ["Agronomy", "Dairy", "Horticulture", "Poultry"]
+
+FILTERS = {
+    "search": "first42",
+    "country": "Thailand",
+    "nationality": "Thai",
+    "gender": "Female",
+    "specialization": "Dairy",
+    "status": Candidate.APPROVED,
+    "start_date": "2025-03-01",
+}
+
+TABLE = Candidate._meta.db_table
+
+
+def _seed(rows):
+    program = program_factory()
+    rng = random.Random(7)
+    # Candidates are spread over many creators, as in production
+    creators = User.objects.bulk_create(User(username=f"creator{i}") for i in range(200))
+    start = timezone.now() - timedelta(days=730)
+    statuses = [value for value, _label in CandidateSearchForm.STATUSES if value]
+    Candidate.objects.bulk_create(
+        (
+            Candidate(
+                passport_number=f"P{i}",
+                first_name=f"First{i}",
+                last_name=f"Last{i % 997}",
+                email=f"person{i}@example.com" if i % 10 else None,
+                date_of_birth=date(1995, 1, 1),
+                country_of_birth=rng.choice(COUNTRIES),
+                nationality=rng.choice(NATIONALITIES),
+                gender=rng.choice(["Male", "Female", "Other"]),
+                passport_issue_date=date(2020, 1, 1),
+                passport_expiry_date=date(2030, 1, 1),
+                university="Not Specified",
+                specialization=rng.choice(SPECIALIZATIONS),
+                status=rng.choice(statuses),
+                program=program,
+                created_by=creators[i % len(creators)],
+                created_at=start + timedelta(minutes=i * 7),
+            )
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+    search.rebuild_index(entities=["candidate"])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def _form_combinations():
+    """Every subset of the filters with the default order, then every sort alone and with one filter."""
+    names = list(FILTERS)
+    for size in range(len(names) + 1):
+        for subset in itertools.combinations(names, size):
+            params = {name: FILTERS[name] for name in subset}
+            if "start_date" in params:
+                params["end_date"] = "2025-06-30"
+            yield params
+    for sort_by, _label in CandidateSearchForm.SORT_CHOICES:
+        yield {"sort_by": sort_by}
+        for name in names:
+            yield {"sort_by": sort_by, name: FILTERS[name]}
+
+
+def _sequential_scans(sql):
+    """Plan lines showing a full scan of core_candidate for one captured query."""
+    if connection.vendor == "postgresql":
+        if " WHERE " not in sql:
+            # An unfiltered COUNT(*) reads every row whichever plan is chosen
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = [row[0] for row in cursor.fetchall()]
+        return [line for line in plan if f"Seq Scan on {TABLE}" in line]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = [row[-1] for row in cursor.fetchall()]
+    # "SCAN core_candidate USING [COVERING] INDEX ..." walks an index and is fine
+    return [line for line in plan if re.fullmatch(rf"SCAN {TABLE}( AS \w+)?", line)]
+
+
+def _assert_indexed_plans(client, combinations):
+    url = reverse("candidate_list")
+    failures = []
+    for params in combinations:
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url, params, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        assert response.status_code == 200
+        for query in captured.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or f'"{TABLE}"' not in sql:
+                continue
+            scans = _sequential_scans(sql)
+            if scans:
+                failures.append(f"{params}: {scans} <- {sql}")
+    assert not failures, "\n".join(failures)
+
+
+def _run_suite(client, rows, settings):
+    settings.CACHALOT_ENABLED = False
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    _seed(rows)
+
+    client.force_login(staff)
+    _assert_indexed_plans(client, _form_combinations())
+
+    # Applicants only see their own rows: Q(created_by=user) | Q(email=user.email)
+    client.force_login(user_factory(username="applicant", email="person42@example.com"))
+    _assert_indexed_plans(client, [{}])
+
+
+def test_candidate_filters_use_indexes(db, client, settings):
+    _run_suite(client, 2_000, settings)
+
+
+@pytest.mark.slow
+def test_candidate_filters_use_indexes_at_100k_rows(db, client, settings):
+    _run_suite(client, 100_000, settings)
@@ -0,0 +1,97 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import search
+from core.candidate_sync import sync_candidates_from_profile
+from core.counters import rebuild_counters
+from core.models import ActivityLog, Candidate, StoredBlob
+from tests.factories import candidate_factory, make_pdf, program_factory, user_factory
+
+
+def _applicant(username, candidates):
+    user = user_factory(username=username, email=f"{username}@example.com")
+    program = program_factory(title=f"{username} program")
+    for number in range(candidates):
+        candidate_factory(created_by=user, program=program, passport_number=f"{username}{number}")
+    return user
+
+
+def _edit_profile(user, phone):
+    profile = user.profile
+    profile._defer_candidate_sync = True
+    profile.phone_number = phone
+    profile.tor = make_pdf("tor.pdf", f"%PDF-1.4 {user.username} transcript".encode())
+    profile.save()
+    return profile
+
+
+def _sync_queries(user, phone):
+    profile = _edit_profile(user, phone)
+    with CaptureQueriesContext(connection) as queries:
+        changed = sync_candidates_from_profile(profile)
+    return len(changed), len(queries)
+
+
+def test_sync_runs_a_constant_number_of_queries(db):
+    # The first status change of the month creates its counter rows
+    _sync_queries(_applicant("warmup", 1), "0917 000 0000")
+
+    one = _sync_queries(_applicant("one", 1), "0917 000 0001")
+    many_user = _applicant("many", 25)
+    many = _sync_queries(many_user, "0917 000 0025")
+    assert one[0] == 1 and many[0] == 25
+    assert one[1] == many[1]
+
+    # Nothing changed: the read is all there is
+    with CaptureQueriesContext(connection) as queries:
+        assert sync_candidates_from_profile(many_user.profile) == []
+    assert len(queries) == 1
+
+
+def test_sync_keeps_signal_maintained_state_in_step(db):
+    user = _applicant("applicant", 3)
+    ActivityLog.objects.all().delete()
+    profile = _edit_profile(user, "0917 123 4567")
+    user.first_name = "Rosa"
+    user.save()
+
+    changed = sync_candidates_from_profile(profile)
+
+    assert len(changed) == 3
+    for candidate in Candidate.objects.all():
+        assert candidate.first_name == "Rosa"
+        assert candidate.phone_number == "0917 123 4567"
+        assert candidate.tor.name == profile.tor.name
+        # Re-validated in memory: documents are still missing
+        assert candidate.status == Candidate.MISSING_DOCS
+        assert candidate.document_deadline is not None
+    assert StoredBlob.objects.get(name=profile.tor.name).refcount == 4
+    assert all(not drift["drift"] for drift in rebuild_counters(dry_run=True).values())
+    assert search.filter_queryset(Candidate.objects.all(), "Rosa").count() == 3
+    logs = ActivityLog.objects.filter(model_name="core.Candidate", action_type=ActivityLog.ACTION_UPDATE)
+    assert logs.count() == 3
+    assert all(log.after_data["phone_number"] == "0917 123 4567" for log in logs)
+
+
+def test_profile_form_syncs_candidates_once(db, client, monkeypatch):
+    user = _applicant("applicant", 2)
+    calls = []
+    original = sync_candidates_from_profile
+    monkeypatch.setattr(
+        "core.candidate_sync.sync_candidates_from_profile",
+        lambda profile, **kwargs: calls.append(kwargs) or original(profile, **kwargs),
+    )
+    client.force_login(user)
+    calls.clear()
+
+    response = client.post(reverse("profile"), {
+        "username": "applicant", "first_name": "Rosa", "last_name": "Cruz",
+        "email": "applicant@example.com", "smokes": "Never",
+    })
+
+    assert response.status_code == 302
+    # The Profile post_save handler deferred to the view's single full sync
+    assert calls == [{}]
+    assert set(Candidate.objects.values_list("first_name", "last_name")) == {("Rosa", "Cruz")}
+    assert set(Candidate.objects.values_list("status", flat=True)) == {Candidate.MISSING_DOCS}
@@ -0,0 +1,185 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import AgricultureProgram, Notification
+from tests.factories import candidate_factory, program_factory, registration_factory, user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(db):
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def applicant(client):
+    user = user_factory(username="applicant")
+    client.force_login(user)
+    return user
+
+
+def _revalidate(client, url, response, **headers):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], **headers)
+
+
+def test_unchanged_notification_poll_is_a_304_without_queries(client, applicant):
+    Notification.add_notification(applicant, "Welcome")
+    url = reverse("api_notifications")
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.has_header("ETag") and first.has_header("Last-Modified")
+
+    # Session and user lookups only: no notification query, nothing serialised
+    with CaptureQueriesContext(connection) as queries:
+        again = _revalidate(client, url, first)
+    assert again.status_code == 304
+    assert not [q for q in queries.captured_queries if "core_notification" in q["sql"]]
+    assert again.content == b""
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 304
+
+    Notification.add_notification(applicant, "Another")
+    changed = _revalidate(client, url, first)
+    assert changed.status_code == 200
+    assert changed.json()["unread_count"] == 2
+
+    client.get(reverse("mark_all_read"))
+    assert _revalidate(client, url, changed).status_code == 200
+
+
+def test_application_poll_follows_registrations_and_program_renames(client, applicant):
+    program = program_factory(title="Dairy")
+    url = reverse("get_user_applications")
+    first = client.get(url)
+    assert first.json()["applications"] == []
+    assert _revalidate(client, url, first).status_code == 304
+
+    registration = registration_factory(user=applicant, program=program)
+    second = _revalidate(client, url, first)
+    assert second.status_code == 200
+    assert second.json()["applications"][0]["program_name"] == "Dairy"
+
+    registration.status = "approved"
+    registration.save()
+    third = _revalidate(client, url, second)
+    assert third.status_code == 200
+
+    program.title = "Dairy Farming"
+    program.save()
+    assert _revalidate(client, url, third).json()["applications"][0]["program_name"] == "Dairy Farming"
+
+
+def test_program_pages_revalidate_per_viewer_and_variant(client, applicant):
+    program = program_factory(title="Orchard")
+    list_url = reverse("program_list")
+    detail_url = reverse("program_detail", args=[program.pk])
+
+    page = client.get(list_url)
+    assert page["Vary"].lower().count("x-requested-with") == 1
+    assert _revalidate(client, list_url, page).status_code == 304
+    # The AJAX partial is a different representation
+    assert _revalidate(client, list_url, page, HTTP_X_REQUESTED_WITH="XMLHttpRequest").status_code == 200
+    # So is another filter or page
+    assert client.get(list_url + "?page=2", HTTP_IF_NONE_MATCH=page["ETag"]).status_code == 200
+
+    detail = client.get(detail_url)
+    assert _revalidate(client, detail_url, detail).status_code == 304
+
+    registration_factory(user=applicant, program=program)
+    assert _revalidate(client, list_url, page).status_code == 200
+    assert _revalidate(client, detail_url, detail).status_code == 200
+
+    # A new unread notification changes the navbar badge
+    page = client.get(list_url)
+    Notification.add_notification(applicant, "Hello")
+    assert _revalidate(client, list_url, page).status_code == 200
+
+    # Another viewer never gets this viewer's page confirmed
+    page = client.get(list_url)
+    client.logout()
+    assert _revalidate(client, list_url, page).status_code == 200
+
+
+def test_program_pages_follow_candidates_owned_by_email(client):
+    applicant = user_factory(username="applicant", email="applicant@example.com")
+    client.force_login(applicant)
+    viewed, applied = program_factory(title="Orchard"), program_factory(title="Dairy")
+    detail_url = reverse("program_detail", args=[viewed.pk])
+    detail = client.get(detail_url)
+    assert _revalidate(client, detail_url, detail).status_code == 304
+
+    # Staff enter a candidate for another program under the applicant's e-mail
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    candidate_factory(created_by=staff, email="applicant@example.com", program=applied)
+
+    # The page now shows the one-application rule
+    assert _revalidate(client, detail_url, detail).status_code == 200
+
+
+def test_program_list_changes_when_a_deadline_passes(client):
+    program = program_factory(title="Vineyard")
+    list_url = reverse("program_list")
+    page = client.get(list_url)
+    assert [p.pk for p in page.context["page_obj"]] == [program.pk]
+
+    # update() bumps nothing, yet the page must change once the deadline passes
+    AgricultureProgram.objects.filter(pk=program.pk).update(registration_deadline=timezone.now() + timedelta(seconds=1))
+    cache.clear()
+    page = client.get(list_url)
+    assert _revalidate(client, list_url, page).status_code == 304
+    time.sleep(1.1)
+    assert _revalidate(client, list_url, page).status_code == 200
+
+
+def test_pages_with_pending_messages_get_no_etag(client, applicant):
+    url = reverse("program_list")
+    page = client.get(url)
+    assert page.has_header("ETag")
+
+    # Queues a flash message for the next page
+    client.get(reverse("mark_all_read"))
+    flashed = client.get(url, HTTP_IF_NONE_MATCH=page["ETag"])
+    assert flashed.status_code == 200
+    assert not flashed.has_header("ETag")
+    assert b"All notifications have been marked as read." in flashed.content
+
+
+def test_staff_candidate_list_revalidates_until_a_candidate_changes(client):
+    staff = user_factory(username="staff", is_staff=True)
+    client.force_login(staff)
+    url = reverse("candidate_list")
+    page = client.get(url)
+    assert _revalidate(client, url, page).status_code == 304
+
+    candidate_factory(created_by=staff, program=program_factory())
+    assert _revalidate(client, url, page).status_code == 200
+
+
+@pytest.mark.slow
+def test_conditional_polls_benchmark(client, applicant, settings):
+    settings.CACHALOT_ENABLED = False
+    Notification.notify_many([applicant], "Status update")
+    for number in range(30):
+        program_factory(title=f"Program {number}")
+
+    def rate(url, etag=None, rounds=200):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        started = time.perf_counter()
+        for _ in range(rounds):
+            client.get(url, **headers)
+        return rounds / (time.perf_counter() - started)
+
+    for name in ("api_notifications", "get_user_applications", "program_list"):
+        url = reverse(name)
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        full, conditional = rate(url), rate(url, etag)
+        print(f"{name}: {full:.0f} req/s full, {conditional:.0f} req/s with If-None-Match")
+        assert conditional > full
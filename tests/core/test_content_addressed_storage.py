@@ -0,0 +1,134 @@
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.models import Candidate, Profile, StoredBlob
+from core.storage import blob_hash, document_storage_instance
+from tests.factories import candidate_factory, make_pdf, user_factory
+
+PDF = b"%PDF-1.4 transcript of records"
+
+
+def _refcount(name):
+    return StoredBlob.objects.get(name=name).refcount
+
+
+def _blob_files():
+    directories, _ = default_storage.listdir("blobs")
+    return [name for directory in directories for name in default_storage.listdir(f"blobs/{directory}")[1]]
+
+
+def test_identical_documents_are_stored_once(db):
+    first, second = user_factory(username="first").profile, user_factory(username="second").profile
+    first.tor = make_pdf("tor.pdf", PDF)
+    first.save()
+    second.diploma = make_pdf("my diploma.PDF", PDF)
+    second.save()
+
+    assert first.tor.name == second.diploma.name
+    assert blob_hash(first.tor.name) == hashlib.sha256(PDF).hexdigest()
+    assert first.tor.name.endswith(".pdf")
+    assert len(_blob_files()) == 1
+    assert _refcount(first.tor.name) == 2
+
+
+def test_profile_documents_reach_candidates_by_reference(db):
+    user = user_factory(username="applicant")
+    candidate = candidate_factory(created_by=user)
+    profile = user.profile
+    profile.tor = make_pdf("tor.pdf", PDF)
+    profile.save()
+
+    candidate = Candidate.objects.get(pk=candidate.pk)
+    assert candidate.tor.name == profile.tor.name
+    assert _refcount(profile.tor.name) == 2
+    assert len(_blob_files()) == 1
+
+
+def test_clearing_documents_drops_only_the_profile_reference(db, client, django_capture_on_commit_callbacks):
+    user = user_factory(username="applicant")
+    profile = user.profile
+    profile.tor = make_pdf("tor.pdf", PDF)
+    profile.save()
+    name = profile.tor.name
+    # Staff copied the document onto a candidate they manage
+    candidate = candidate_factory(created_by=user_factory(username="staff", is_staff=True))
+    candidate.tor = profile.tor
+    candidate.save()
+    assert _refcount(name) == 2
+
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("clear_all_documents"))
+    assert not Profile.objects.get(pk=profile.pk).tor
+    # The candidate still uses the blob
+    assert default_storage.exists(name)
+    assert _refcount(name) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Candidate.objects.get(pk=candidate.pk).delete()
+    assert not default_storage.exists(name)
+    assert not StoredBlob.objects.filter(name=name).exists()
+
+
+def test_upload_racing_a_release_keeps_the_blob(db, django_capture_on_commit_callbacks):
+    first, second = user_factory(username="first").profile, user_factory(username="second").profile
+    first.tor = make_pdf("tor.pdf", PDF)
+    first.save()
+    name = first.tor.name
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        first.tor = None
+        first.save()
+        # Another request stores the same bytes before the release commits
+        assert document_storage_instance.save("tor.pdf", ContentFile(PDF)) == name
+    # The release commits and runs its deletion before that request saves its row
+    for callback in callbacks:
+        callback()
+    second.tor = name
+    second.save()
+
+    assert default_storage.exists(name)
+    assert _refcount(name) == 1
+    # The row's reference replaced the claim: a later release deletes the blob
+    with django_capture_on_commit_callbacks(execute=True):
+        second.tor = None
+        second.save()
+    assert not default_storage.exists(name)
+
+
+def test_dedupe_media_moves_legacy_files_into_blobs(db):
+    first, second = user_factory(username="first").profile, user_factory(username="second").profile
+    legacy = default_storage.save("documents/tor/first.pdf", ContentFile(PDF))
+    copy = default_storage.save("documents/tor/second.pdf", ContentFile(PDF))
+    Profile.objects.filter(pk=first.pk).update(tor=legacy)
+    Profile.objects.filter(pk=second.pk).update(tor=copy)
+
+    call_command("dedupe_media", "--dry-run")
+    assert Profile.objects.get(pk=first.pk).tor.name == legacy
+
+    call_command("dedupe_media")
+    names = {Profile.objects.get(pk=pk).tor.name for pk in (first.pk, second.pk)}
+    assert len(names) == 1
+    name = names.pop()
+    assert blob_hash(name) == hashlib.sha256(PDF).hexdigest()
+    assert _refcount(name) == 2
+    assert not default_storage.exists(legacy) and not default_storage.exists(copy)
+    with default_storage.open(name) as f:
+        assert f.read() == PDF
+
+
+def test_dedupe_media_recounts_and_deletes_unreferenced_blobs(db):
+    profile = user_factory(username="applicant").profile
+    profile.tor = make_pdf("tor.pdf", PDF)
+    profile.save()
+    name = profile.tor.name
+    # A bulk update bypasses the reference signals
+    Profile.objects.filter(pk=profile.pk).update(tor=None)
+
+    call_command("dedupe_media")
+    assert not default_storage.exists(name)
+    assert not StoredBlob.objects.filter(name=name).exists()
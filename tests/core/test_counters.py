@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+
+from core import counters
+from core.models import ActivityLog, Candidate, Registration, StatsCounter
+from tests.factories import candidate_factory, program_factory, registration_factory, user_factory
+
+
+def _candidate_totals():
+    return counters.get_status_counts("candidate")
+
+
+def test_counters_follow_create_status_change_and_delete(db):
+    staff = user_factory(username="staff", is_staff=True)
+    program = program_factory()
+
+    c1 = candidate_factory(created_by=staff, program=program, status=Candidate.DRAFT)
+    candidate_factory(created_by=staff, program=program, passport_number="P2", status=Candidate.DRAFT)
+    assert _candidate_totals() == {Candidate.DRAFT: 2}
+
+    c1.status = Candidate.APPROVED
+    c1.save()
+    assert _candidate_totals() == {Candidate.DRAFT: 1, Candidate.APPROVED: 1}
+
+    # Saving again without a status change leaves counters alone
+    c1.first_name = "Changed"
+    c1.save()
+    assert _candidate_totals() == {Candidate.DRAFT: 1, Candidate.APPROVED: 1}
+
+    # Reloaded instances pick up their loaded state from post_init
+    reloaded = Candidate.objects.get(pk=c1.pk)
+    reloaded.status = Candidate.REJECTED
+    reloaded.save()
+    assert _candidate_totals() == {Candidate.DRAFT: 1, Candidate.APPROVED: 0, Candidate.REJECTED: 1}
+
+    reloaded.delete()
+    assert _candidate_totals()[Candidate.REJECTED] == 0
+
+
+def test_counters_roll_back_with_the_transaction(db):
+    staff = user_factory(username="staff", is_staff=True)
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            candidate_factory(created_by=staff)
+            raise RuntimeError("abort")
+    assert _candidate_totals().get(Candidate.DRAFT, 0) == 0
+
+
+def test_user_and_registration_counters(db):
+    user_factory(username="staff", is_staff=True, email="s@example.com")
+    applicant = user_factory(username="applicant", email="a@example.com")
+    applicant.is_active = False
+    applicant.save()
+    registration_factory(user=applicant, program=program_factory(), status=Registration.PENDING)
+
+    assert counters.user_counts() == {"total": 2, "active": 1, "inactive": 1, "staff": 1}
+    assert counters.get_status_counts("registration") == {Registration.PENDING: 1}
+
+
+def test_activitylog_counters(db):
+    ActivityLog.objects.create(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Database")
+    assert counters.get_status_counts("activitylog")[ActivityLog.ACTION_SYSTEM] == 1
+
+
+def test_rebuild_stats_reconciles_drift(db):
+    staff = user_factory(username="staff", is_staff=True)
+    program = program_factory()
+    for i in range(3):
+        candidate_factory(created_by=staff, program=program, passport_number=f"P{i}")
+
+    # queryset.update() bypasses signals and makes the counters drift
+    Candidate.objects.update(status=Candidate.APPROVED)
+    StatsCounter.objects.filter(entity="program").update(count=99)
+    assert _candidate_totals() == {Candidate.DRAFT: 3}
+
+    dry_out = StringIO()
+    call_command("rebuild_stats", "--dry-run", stdout=dry_out)
+    assert "would be corrected" in dry_out.getvalue()
+    assert _candidate_totals() == {Candidate.DRAFT: 3}
+
+    out = StringIO()
+    call_command("rebuild_stats", "--chunk-size", "2", stdout=out)
+    assert "Reconciled" in out.getvalue()
+    assert _candidate_totals() == {Candidate.APPROVED: 3}
+    assert sum(counters.get_status_counts("program").values()) == 1
+
+    out = StringIO()
+    call_command("rebuild_stats", stdout=out)
+    assert "All counters are in sync" in out.getvalue()
+
+
+def test_manage_pages_read_counters(db, client):
+    staff = user_factory(username="staff", is_staff=True)
+    registration_factory(user=staff, program=program_factory(), status=Registration.APPROVED)
+    client.force_login(staff)
+
+    resp = client.get(reverse("manage_registrations"))
+    assert resp.status_code == 200
+    assert resp.context["total_registrations"] == 1
+    assert resp.context["approved_registrations"] == 1
+
+    resp = client.get(reverse("manage_users"))
+    assert resp.context["total_users"] == 1
+    assert resp.context["staff_users"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import events
+from core.models import Notification
+from tests.factories import user_factory
+
+
+@pytest.fixture(autouse=True)
+def _local_events(settings):
+    settings.EVENTS = {"BACKEND": "local", "HEARTBEAT": 0.05, "STREAM_LIFETIME": 1}
+    events._backend = None
+    yield
+    events._backend = None
+
+
+def _parse(frame):
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_events_published_from_other_threads_reach_the_stream(db):
+    async def listen():
+        subscription = events.subscribe(7)
+        frames = events.stream(subscription)
+        assert (await frames.__anext__()).startswith("retry:")
+
+        # Views run in worker threads; publish() must be safe to call from there
+        sender = threading.Thread(target=events.publish, args=(7, events.APPLICATION, {"status": "Approved"}))
+        sender.start()
+        sender.join()
+        frame = await frames.__anext__()
+        while frame.startswith(":"):
+            frame = await frames.__anext__()
+        await frames.aclose()
+        return frame
+
+    assert _parse(asyncio.run(listen())) == ("application", {"status": "Approved"})
+    assert not events.has_subscribers(7)
+
+
+def test_slow_streams_get_a_resync_instead_of_an_unbounded_backlog(settings):
+    settings.EVENTS = {**settings.EVENTS, "QUEUE_SIZE": 2}
+
+    async def overflow():
+        subscription = events.subscribe(8)
+        for number in range(5):
+            events.dispatch({"user_id": 8, "event": events.NOTIFICATION, "data": {"n": number}})
+        await asyncio.sleep(0)
+        queued = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        subscription.close()
+        return queued
+
+    queued = asyncio.run(overflow())
+    assert len(queued) <= 2
+    assert events.RESYNC in {message["event"] for message in queued}
+
+
+def test_add_notification_publishes_after_commit(db, django_capture_on_commit_callbacks, monkeypatch):
+    sent = []
+    monkeypatch.setattr(events, "has_subscribers", lambda user_id: True)
+    monkeypatch.setattr(events.LocalBackend, "send", lambda self, message: sent.append(message))
+    user = user_factory(username="applicant")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        notification = Notification.add_notification(user, "Approved!", Notification.SUCCESS)
+        assert sent == []
+
+    assert sent == [{
+        "user_id": user.pk,
+        "event": "notification",
+        "data": {
+            "id": notification.pk,
+            "message": "Approved!",
+            "notification_type": "success",
+            "link": None,
+            "unread_count": 1,
+        },
+    }]
+
+
+def test_stream_under_wsgi_tells_the_page_to_poll(db, client):
+    client.force_login(user_factory(username="applicant"))
+    assert client.get(reverse("event_stream")).status_code == 204
+
+
+def test_stream_under_asgi_sends_events_to_the_signed_in_user(db):
+    user = user_factory(username="applicant")
+
+    async def listen():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        response = await client.get(reverse("event_stream"))
+        assert response["Content-Type"] == "text/event-stream"
+        frames = response.streaming_content
+        assert (await frames.__anext__()).decode().startswith("retry:")
+        events.dispatch({"user_id": user.pk, "event": events.APPLICATION, "data": {"id": 1}})
+        frame = (await frames.__anext__()).decode()
+        while frame.startswith(":"):
+            frame = (await frames.__anext__()).decode()
+        await frames.aclose()
+        return frame
+
+    assert _parse(async_to_sync(listen)()) == ("application", {"id": 1})
+
+
+def test_polling_endpoint_reports_the_unread_count(db, client):
+    user = user_factory(username="applicant")
+    Notification.add_notification(user, "Hello")
+    client.force_login(user)
+    assert client.get(reverse("api_notifications")).json()["unread_count"] == 1
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+from core.models import UploadedFile
+from tests.factories import make_pdf, make_png, user_factory
+
+DOCUMENTS = ["license_scan", "passport_scan", "academic_certificate", "tor", "nc2_tesda", "diploma", "good_moral", "nbi_clearance"]
+
+
+@pytest.fixture
+def io(monkeypatch):
+    """Counts storage opens and SHA-256 computations."""
+    counts = {"opens": 0, "hashes": 0}
+    original_open, original_hash = FileSystemStorage._open, UploadedFile.calculate_file_hash
+
+    def counting_open(storage, name, mode="rb"):
+        counts["opens"] += 1
+        return original_open(storage, name, mode)
+
+    def counting_hash(file_obj):
+        counts["hashes"] += 1
+        return original_hash(file_obj)
+
+    monkeypatch.setattr(FileSystemStorage, "_open", counting_open)
+    monkeypatch.setattr(UploadedFile, "calculate_file_hash", staticmethod(counting_hash))
+    return counts
+
+
+def _user_with_documents(fields, username="applicant"):
+    user = user_factory(username=username)
+    profile = user.profile
+    for position, field in enumerate(fields):
+        setattr(profile, field, make_pdf(f"{field}.pdf", f"%PDF-1.4 {field} {position}".encode()))
+    profile.profile_image = make_png("me.png", b"\x89PNG\r\n\x1a\n me")
+    profile.save()
+    return user
+
+
+def _login(user):
+    # What auth does at each login: a fresh User saved with a new last_login, which re-saves its profile
+    user = User.objects.get(pk=user.pk)
+    user.last_login = timezone.now()
+    user.save()
+
+
+def test_uploads_are_hashed_once_and_logins_read_nothing(db, io):
+    user = _user_with_documents(["tor", "diploma"])
+    # Each new file is registered once, under the hash its blob name carries: nothing is read back
+    assert io == {"opens": 0, "hashes": 3}
+    records = UploadedFile.objects.filter(user=user, is_active=True)
+    assert records.count() == 3
+    assert all(record.storage_mtime for record in records)
+
+    for _ in range(3):
+        _login(user)
+    assert io == {"opens": 0, "hashes": 3}
+
+
+def test_replaced_document_is_rehashed_and_old_record_retired(db, io):
+    user = _user_with_documents(["tor"])
+    old = UploadedFile.objects.get(user=user, document_type="tor", is_active=True)
+
+    profile = User.objects.get(pk=user.pk).profile
+    profile.tor = make_pdf("tor-v2.pdf", b"%PDF-1.4 second version")
+    profile.save()
+    assert io["hashes"] == 3
+
+    old.refresh_from_db()
+    assert old.is_active is False
+    current = UploadedFile.objects.get(user=user, document_type="tor", is_active=True)
+    assert current.file_path == profile.tor.name != old.file_path
+
+
+def test_records_without_a_stamp_are_hashed_once_then_trusted(db, io):
+    user = _user_with_documents(["tor", "diploma"])
+    # Records written before stamps existed
+    UploadedFile.objects.update(storage_mtime=None)
+    io.update(opens=0, hashes=0)
+
+    _login(user)
+    assert io == {"opens": 0, "hashes": 3}
+    _login(user)
+    assert io == {"opens": 0, "hashes": 3}
+
+
+@pytest.mark.slow
+def test_login_document_io_benchmark(db, io):
+    user = _user_with_documents(DOCUMENTS)
+    logins = 50
+
+    def run():
+        io.update(opens=0, hashes=0)
+        started = time.perf_counter()
+        for _ in range(logins):
+            _login(user)
+        return dict(io), (time.perf_counter() - started) / logins
+
+    UploadedFile.objects.update(storage_mtime=None)
+    cold, cold_seconds = run()
+    steady, steady_seconds = run()
+    print(
+        f"{logins} logins with 9 documents: first pass {cold['opens']} opens / {cold['hashes']} hashes "
+        f"({cold_seconds * 1000:.1f} ms per login), then {steady['opens']} opens / {steady['hashes']} hashes "
+        f"({steady_seconds * 1000:.1f} ms per login); before change detection: "
+        f"{logins * 9} opens / {logins * 9} hashes"
+    )
+    assert cold == {"opens": 0, "hashes": 9}
+    assert steady == {"opens": 0, "hashes": 0}
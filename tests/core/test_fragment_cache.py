@@ -0,0 +1,144 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.forms import CandidateSearchForm, ProgramSearchForm
+from core.models import AgricultureProgram, Candidate
+from tests.factories import candidate_factory, program_factory, user_factory
+
+
+fragments = caches["template_fragments"]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_fragments():
+    fragments.clear()
+    yield
+    fragments.clear()
+
+
+def _render(rf, template, user, objects, **context):
+    request = rf.get("/")
+    request.user = user
+    page_obj = Paginator(objects, max(len(objects), 1)).get_page(1)
+    return render_to_string(template, {"page_obj": page_obj, **context}, request=request)
+
+
+def _program_cards(rf, user, programs, **context):
+    return _render(rf, "partials/_program_list_partial.html", user, programs, **context)
+
+
+def test_program_cards_are_shared_but_apply_buttons_stay_per_user(db, rf):
+    program = program_factory(title="Dairy")
+    applicant = user_factory(username="applicant")
+    staff = user_factory(username="staff", is_staff=True)
+
+    assert "Apply Now" in _program_cards(rf, applicant, [program], applied_program_ids=set())
+    assert "Applied" in _program_cards(rf, applicant, [program], applied_program_ids={program.pk})
+    staff_view = _program_cards(rf, staff, [program])
+    assert "Apply" not in staff_view and "Dairy" in staff_view
+    assert "Login to Apply" in _program_cards(rf, AnonymousUser(), [program])
+
+    # The card comes from the fragment cache until the program's updated_at changes
+    AgricultureProgram.objects.filter(pk=program.pk).update(title="Renamed quietly")
+    program.refresh_from_db()
+    assert "Dairy" in _program_cards(rf, applicant, [program])
+    program.title = "Dairy Farming"
+    program.save()
+    assert "Dairy Farming" in _program_cards(rf, applicant, [program])
+
+
+def test_capacity_changes_refresh_the_cards(db, rf):
+    program = program_factory(capacity=10)
+    assert "10 spots" in _program_cards(rf, AnonymousUser(), [program])
+    AgricultureProgram.objects.filter(pk=program.pk).update(capacity=9, updated_at=timezone.now())
+    program.refresh_from_db()
+    assert "9 spots" in _program_cards(rf, AnonymousUser(), [program])
+
+
+def test_candidate_rows_follow_candidate_and_program_edits(db, rf):
+    staff = user_factory(username="staff", is_staff=True)
+    program = program_factory(title="Orchard")
+    candidate = candidate_factory(created_by=staff, program=program, first_name="Ana")
+    template = "partials/_candidate_list_partial.html"
+
+    def rows(user):
+        return _render(rf, template, user, list(Candidate.objects.select_related("program")))
+
+    staff_rows = rows(staff)
+    assert "Ana" in staff_rows and f"/candidates/{candidate.pk}/edit/" in staff_rows
+    # Same cached row, without the staff-only actions
+    assert "/edit/" not in rows(user_factory(username="viewer"))
+
+    program.title = "Orchard North"
+    program.save()
+    assert rows(staff).count("Orchard North") == 2
+    candidate.first_name = "Anna"
+    candidate.save()
+    assert "Anna" in rows(staff)
+
+
+@pytest.mark.slow
+def test_list_page_render_benchmark(db, rf, monkeypatch):
+    staff = user_factory(username="staff", is_staff=True)
+    writes = []
+    original_set = fragments.set
+
+    def counting_set(key, *args, **kwargs):
+        writes.append(key)
+        return original_set(key, *args, **kwargs)
+
+    monkeypatch.setattr(fragments, "set", counting_set)
+    now = timezone.now()
+    start = date.today() + timedelta(days=30)
+
+    def programs(count):
+        return [
+            AgricultureProgram(
+                id=i, title=f"Program {i}", description="Hands-on farm work " * 10, country="Israel",
+                location="Arava", start_date=start, capacity=10, updated_at=now,
+            )
+            for i in range(1, count + 1)
+        ]
+
+    def candidates(count):
+        program = programs(1)[0]
+        return [
+            Candidate(
+                id=i, first_name=f"First{i}", last_name="Last", email=f"c{i}@example.com", gender="Female",
+                university="Central Luzon State University", specialization="Agronomy", status=Candidate.VALIDATED,
+                program=program, created_at=now, updated_at=now,
+            )
+            for i in range(1, count + 1)
+        ]
+
+    pages = {
+        "program_list.html": (programs, {"form": ProgramSearchForm(), "applied_program_ids": set()}),
+        "candidate_list.html": (candidates, {"form": CandidateSearchForm()}),
+    }
+    for template, (build, context) in pages.items():
+        for count in (10, 100, 1000):
+            objects = build(count)
+            fragments.clear()
+            writes.clear()
+            started = time.perf_counter()
+            cold_html = _render(rf, template, staff, objects, **context)
+            cold = time.perf_counter() - started
+            cold_writes = len(writes)
+            runs = 5
+            started = time.perf_counter()
+            for _ in range(runs):
+                warm_html = _render(rf, template, staff, objects, **context)
+            warm = (time.perf_counter() - started) / runs
+            # Timings are reported only: wall-clock comparisons are noise on a loaded machine
+            print(f"{template} x{count}: {cold * 1000:.1f} ms cold, {warm * 1000:.1f} ms with cached fragments")
+            assert warm_html == cold_html
+            # Every object's fragment is rendered once, then served from the cache
+            assert cold_writes >= count
+            assert len(writes) == cold_writes
@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache_utils import (
+    LocalLRU,
+    SingleFlightLock,
+    _needs_refresh,
+    get_or_compute,
+    local_cache,
+)
+from tests.factories import program_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(settings):
+    settings.HOT_CACHE = {"LOCK_WAIT": 2.0, "BETA": 0}
+    cache.clear()
+    local_cache.clear()
+    yield
+    cache.clear()
+    local_cache.clear()
+
+
+class Counter:
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        return {"calls": calls}
+
+
+def test_second_read_is_served_from_process_memory():
+    compute = Counter()
+    assert get_or_compute("hot:a", compute, timeout=60) == {"calls": 1}
+    cache.delete("hot:a")  # the local tier still answers
+    assert get_or_compute("hot:a", compute, timeout=60) == {"calls": 1}
+
+    local_cache.clear()
+    assert get_or_compute("hot:a", compute, timeout=60) == {"calls": 2}
+
+
+def test_local_tier_is_bounded_lru():
+    lru = LocalLRU(2)
+    now = time.time()
+    lru.set("a", 1, now + 60)
+    lru.set("b", 2, now + 60)
+    assert lru.get("a", now) == 1  # "b" is now the least recently used
+    lru.set("c", 3, now + 60)
+    assert len(lru) == 2
+    assert lru.get("b", now) is None
+    assert lru.get("a", now) == 1
+    assert lru.get("c", now + 61) is None
+
+
+def test_concurrent_cold_misses_compute_once():
+    compute = Counter(delay=0.3)
+    results = []
+
+    def read():
+        results.append(get_or_compute("hot:cold", compute, timeout=60))
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert compute.calls == 1
+    assert results == [{"calls": 1}] * 8
+
+
+def test_expired_entry_is_served_stale_while_another_worker_refreshes():
+    compute = Counter()
+    get_or_compute("hot:stale", compute, timeout=60)
+    entry = cache.get("hot:stale")
+    entry["expires"] = time.time() - 1
+    cache.set("hot:stale", entry)
+    local_cache.clear()
+
+    lock = SingleFlightLock("hot:stale", timeout=30)
+    assert lock.acquire()
+    try:
+        assert get_or_compute("hot:stale", compute, timeout=60) == {"calls": 1}
+    finally:
+        lock.release()
+    assert compute.calls == 1
+
+    local_cache.clear()
+    assert get_or_compute("hot:stale", compute, timeout=60) == {"calls": 2}
+
+
+def test_early_refresh_grows_with_compute_time():
+    now = time.time()
+    cheap = {"expires": now + 60, "delta": 0.001}
+    slow = {"expires": now + 60, "delta": 1000}
+    assert not _needs_refresh(cheap, now, beta=1.0)
+    assert _needs_refresh(slow, now, beta=1.0)
+    assert not _needs_refresh(slow, now, beta=0)
+    assert _needs_refresh({"expires": now - 1, "delta": 0}, now, beta=0)
+
+
+def test_program_list_hides_closed_programs_from_cached_rows(db, client):
+    open_program = program_factory(title="Open")
+    closing = program_factory(title="Closing")
+    closing.registration_deadline = timezone.now() + timedelta(seconds=1)
+    closing.save()
+
+    response = client.get(reverse("program_list"))
+    assert {p.title for p in response.context["page_obj"]} == {"Open", "Closing"}
+
+    time.sleep(1.1)
+    response = client.get(reverse("program_list"))
+    assert [p.pk for p in response.context["page_obj"]] == [open_program.pk]
@@ -24,7 +24,8 @@ def test_registration_copy_documents_to_candidate_only_if_missing(db):
     reg.copy_documents_to_candidate(cand)
     cand.refresh_from_db()
     # candidate already had tor, should remain unchanged
-    assert cand.tor.name.endswith("existing.pdf")
+    with cand.tor.open("rb") as f:
+        assert f.read() == b"existing"
 
 
 def test_candidate_validate_application_missing_docs_sets_deadline_once(db):
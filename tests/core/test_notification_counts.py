@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core import notification_counts
+from core.context_processors import notification_count
+from core.models import Notification
+from tests.factories import user_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(settings):
+    settings.CACHALOT_ENABLED = False
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def reader(db):
+    return user_factory(username="reader")
+
+
+def _cached(user):
+    return cache.get(notification_counts.cache_key(user.pk))
+
+
+def _context_count(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return notification_count(request)["unread_notifications_count"]
+
+
+# Views run in autocommit in production, which is where counters are adjusted in place
+@pytest.mark.django_db(transaction=True)
+def test_context_processor_reads_the_cached_counter(django_assert_num_queries):
+    reader = user_factory(username="reader")
+    Notification.add_notification(reader, "one")
+    with django_assert_num_queries(1):
+        assert _context_count(reader) == 1
+    with django_assert_num_queries(0):
+        assert _context_count(reader) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counter_follows_every_write_path(client):
+    reader = user_factory(username="reader", password="TestPass123!")
+    client.force_login(reader)
+    first = Notification.add_notification(reader, "first")
+    assert notification_counts.get_count(reader.pk) == 1
+
+    Notification.add_notification(reader, "second")
+    Notification.add_notification(reader, "warning", Notification.WARNING)
+    assert _cached(reader) == 3
+
+    client.get(reverse("mark_notification_read", args=[first.pk]), HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+    assert _cached(reader) == 2
+    # Marking it again changes nothing
+    response = client.get(
+        reverse("mark_notification_read", args=[first.pk]), HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+    )
+    assert response.json()["unread_count"] == 2
+
+    client.get(reverse("mark_all_read"))
+    assert _cached(reader) == 0
+
+    unread = Notification.add_notification(reader, "third")
+    client.get(reverse("delete_notification", args=[unread.pk]))
+    assert _cached(reader) == 0
+
+    Notification.add_notification(reader, "fourth")
+    client.get(reverse("delete_all_notifications"))
+    assert _cached(reader) == 0
+
+    Notification.add_notification(reader, "fifth")
+    assert _cached(reader) == 1
+    client.post(reverse("api_clear_all_notifications"))
+    assert _cached(reader) == 0
+    assert notification_counts.get_count(reader.pk) == Notification.objects.filter(user=reader, read=False).count()
+
+
+def test_rolled_back_notifications_are_not_counted(reader):
+    assert notification_counts.get_count(reader.pk) == 0
+    try:
+        with transaction.atomic():
+            Notification.add_notification(reader, "never sent")
+            assert notification_counts.get_count(reader.pk) == 1
+            raise DatabaseError("rolled back")
+    except DatabaseError:
+        pass
+    assert _cached(reader) is None
+    assert notification_counts.get_count(reader.pk) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_many_rebuilds_misses_with_one_query(django_assert_num_queries):
+    users = [user_factory(username=f"admin{i}", is_staff=True) for i in range(3)]
+    Notification.notify_many(users[:2], "Backup completed")
+    Notification.add_notification(users[0], "Another")
+
+    with django_assert_num_queries(1):
+        counts = notification_counts.get_many([user.pk for user in users])
+    assert counts == {users[0].pk: 2, users[1].pk: 1, users[2].pk: 0}
+    with django_assert_num_queries(0):
+        assert notification_counts.get_many([user.pk for user in users]) == counts
+
+
+def test_admin_bulk_actions_reset_counters(db, admin_client):
+    reader = user_factory(username="reader")
+    Notification.notify_many([reader], "hello")
+    assert notification_counts.get_count(reader.pk) == 1
+
+    response = admin_client.post(
+        reverse("admin:core_notification_changelist"),
+        {"action": "mark_as_read", "_selected_action": list(Notification.objects.values_list("pk", flat=True))},
+    )
+    assert response.status_code == 302
+    assert notification_counts.get_count(reader.pk) == 0
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import ActivityLog, Candidate
+from core.pagination import KeysetPaginator
+from tests.factories import candidate_factory, user_factory
+
+
+def _walk(paginator):
+    """Follow next cursors from the first page and return every page's ids."""
+    pages = []
+    page = paginator.get_page()
+    while True:
+        pages.append([obj.pk for obj in page])
+        if not page.has_next():
+            return pages, page
+        page = paginator.get_page(page.next_cursor)
+
+
+@pytest.fixture
+def candidates(db):
+    owner = user_factory(username="owner")
+    now = timezone.now()
+    rows = []
+    for i in range(11):
+        # Pairs of rows share a created_at and every third one has no email
+        email = None if i % 3 == 0 else f"c{i % 4}@example.com"
+        candidate = candidate_factory(created_by=owner, passport_number=f"P{i}", email=email)
+        Candidate.objects.filter(pk=candidate.pk).update(created_at=now - timedelta(minutes=i // 2))
+        rows.append(candidate.pk)
+    return rows
+
+
+@pytest.mark.parametrize("ordering", [("-created_at", "-id"), ("created_at",), ("email",), ("-email",)])
+def test_forward_and_backward_traversal_match_offset_ordering(candidates, ordering):
+    queryset = Candidate.objects.all()
+    paginator = KeysetPaginator(queryset, 4, ordering=ordering)
+    expected = list(queryset.order_by(*paginator._order_by()).values_list("pk", flat=True))
+
+    pages, last = _walk(paginator)
+    assert [pk for page in pages for pk in page] == expected
+    assert [len(page) for page in pages] == [4, 4, 3]
+    assert (last.number, last.start_index(), last.end_index()) == (3, 9, 11)
+
+    back = []
+    page = last
+    while page.has_previous():
+        page = paginator.get_page(page.previous_cursor)
+        back.append([obj.pk for obj in page])
+    assert back == pages[-2::-1]
+    assert page.number == 1
+
+
+def test_invalid_cursor_falls_back_to_first_page(candidates):
+    paginator = KeysetPaginator(Candidate.objects.all(), 4, ordering=("-created_at",))
+    first = [obj.pk for obj in paginator.get_page()]
+    for cursor in ("garbage", paginator.get_page().next_cursor[:-2] + "xx"):
+        page = paginator.get_page(cursor)
+        assert [obj.pk for obj in page] == first
+        assert not page.has_previous()
+
+
+def test_page_queries_keep_filters_and_drop_page_number(candidates):
+    params = QueryDict("status=Draft&page=3")
+    page = KeysetPaginator(Candidate.objects.all(), 4).get_page(params=params)
+    query = QueryDict(page.next_query)
+    assert query["status"] == "Draft"
+    assert "page" not in query and query["cursor"] == page.next_cursor
+    assert page.first_query == "status=Draft"
+
+
+def test_candidate_list_follows_cursor_links(candidates, client):
+    client.force_login(user_factory(username="staff", is_staff=True))
+    url = reverse("candidate_list")
+
+    seen = []
+    response = client.get(url)
+    while True:
+        page = response.context["page_obj"]
+        seen.extend(obj.pk for obj in page)
+        if not page.has_next():
+            break
+        response = client.get(f"{url}?{page.next_query}", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        assert response.templates[0].name == "partials/_candidate_list_partial.html"
+    assert sorted(seen) == sorted(candidates)
+    assert len(seen) == len(set(seen))
+
+
+def test_deep_activity_log_pages_use_constant_queries(db, client, settings, django_assert_num_queries):
+    settings.CACHALOT_ENABLED = False
+    staff = user_factory(username="staff", is_staff=True)
+    ActivityLog.objects.bulk_create(
+        ActivityLog(action_type=ActivityLog.ACTION_SYSTEM, model_name="core.Candidate", object_id=str(i))
+        for i in range(230)
+    )
+    paginator = KeysetPaginator(ActivityLog.objects.all(), 50, ordering=("-timestamp", "-id"))
+    pages, last = _walk(paginator)
+    assert len(pages) == 5
+
+    client.force_login(staff)
+    url = reverse("manage_activity_logs")
+    client.get(url)
+    with CaptureQueriesContext(connection) as first_page:
+        client.get(url)
+    last_cursor = paginator.get_page(last.previous_cursor).next_cursor
+    with django_assert_num_queries(len(first_page.captured_queries)):
+        response = client.get(url, {"cursor": last_cursor})
+    assert response.context["page_obj"].number == 5
@@ -0,0 +1,122 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import _unmask_cipher_token
+from django.template import RequestContext, Template
+from django.test import Client
+from django.urls import reverse
+
+from core import views
+from core.cache_utils import cache_view_result, invalidate_page_cache, local_cache
+from tests.factories import program_factory, user_factory
+
+TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([a-zA-Z0-9]{64})"')
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(db):
+    cache.clear()
+    local_cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Templates rendered by the views; a cached response renders none."""
+    rendered = []
+    original = views.render
+
+    def render(request, template_name, *args, **kwargs):
+        rendered.append(template_name)
+        return original(request, template_name, *args, **kwargs)
+
+    monkeypatch.setattr(views, "render", render)
+    return rendered
+
+
+def test_replayed_pages_carry_each_visitors_own_csrf_token(rf):
+    rendered = []
+
+    @cache_view_result("static_content")
+    def page(request):
+        rendered.append(request)
+        return HttpResponse(Template("<form>{% csrf_token %}</form>").render(RequestContext(request)))
+
+    def visit():
+        request = rf.get("/form/")
+        request.user = AnonymousUser()
+        response = page(request)
+        return request, response
+
+    first_request, first = visit()
+    second_request, second = visit()
+    assert len(rendered) == 1
+
+    # Nothing of the first visitor is replayed: the form token unmasks to the second one's secret
+    tokens = TOKEN_RE.findall(second.content.decode())
+    assert len(tokens) == 1
+    assert _unmask_cipher_token(tokens[0]) == second_request.META["CSRF_COOKIE"]
+    assert second_request.META["CSRF_COOKIE"] != first_request.META["CSRF_COOKIE"]
+    assert not second.cookies
+
+
+@pytest.mark.parametrize("name", ["help", "contact"])
+def test_static_guest_pages_are_cached(renders, name):
+    url = reverse(name)
+    first = Client().get(url)
+    second = Client().get(url)
+    assert len(renders) == 1
+    assert second.status_code == 200
+    assert len(second.content) == len(first.content)
+
+
+def test_program_pages_follow_writes_and_variants(renders):
+    program = program_factory(title="Dairy")
+    list_url = reverse("program_list")
+    detail_url = reverse("program_detail", args=[program.pk])
+    guest = Client()
+    guest.get(list_url)
+    guest.get(detail_url)
+    guest.get(list_url)
+    guest.get(detail_url)
+    assert renders == ["program_list.html", "program_detail.html"]
+
+    # The AJAX partial varies on X-Requested-With
+    partial = guest.get(list_url, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+    assert renders[-1] == "partials/_program_list_partial.html"
+    assert b"<html" not in partial.content
+    assert guest.get(list_url)["Vary"].lower().count("x-requested-with") == 1
+    assert len(renders) == 3
+
+    program.title = "Dairy Farming"
+    program.save()
+    assert b"Dairy Farming" in guest.get(list_url).content
+    assert b"Dairy Farming" in guest.get(detail_url).content
+    assert len(renders) == 5
+
+    invalidate_page_cache()
+    guest.get(detail_url)
+    assert len(renders) == 6
+
+
+def test_signed_in_users_and_flash_messages_bypass_the_cache(client, renders):
+    program_factory(title="Vineyard")
+    url = reverse("program_list")
+    Client().get(url)
+
+    client.force_login(user_factory(username="applicant"))
+    response = client.get(url)
+    assert len(renders) == 2
+    assert b"applicant" in response.content
+
+    # Logging out leaves a flash message for the landing page: rendered for them, not stored
+    client.get(reverse("logout"))
+    response = client.get(reverse("index"))
+    assert renders[-1] == "guest_landing.html"
+    assert b"You have been logged out." in response.content
+    assert b"You have been logged out." not in Client().get(reverse("index")).content
+    assert renders.count("guest_landing.html") == 2
@@ -0,0 +1,205 @@
+import time
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core import validation
+from core.counters import rebuild_counters
+from core.models import ActivityLog, Candidate
+from core.validation import revalidate
+from tests.factories import candidate_factory, make_pdf, make_png, program_factory, user_factory
+
+DOCUMENTS = ["passport_scan", "tor", "diploma", "good_moral", "nbi_clearance"]
+
+COMPLETE_FIELDS = {
+    "phone_number": "09123456789", "address": "Home", "health_condition": "Excellent", "shirt_size": "M",
+    "shoes_size": "42", "field_of_study": "Agronomy", "graduation_year": 2015, "place_of_issue": "Manila",
+}
+
+
+def _documents():
+    files = {field: make_pdf(f"{field}.pdf", f"%PDF-1.4 {field}".encode()) for field in DOCUMENTS}
+    files["profile_image"] = make_png("me.png")
+    return files
+
+
+def _candidate(owner, program, number, documents=True, **fields):
+    candidate = candidate_factory(
+        created_by=owner, program=program, passport_number=f"P{number}", email=f"c{number}@example.com",
+        **(_documents() if documents else {}), **fields,
+    )
+    candidate.validate_application()
+    return candidate
+
+
+def _expected(candidate):
+    fresh = Candidate.objects.select_related("program").get(pk=candidate.pk)
+    fresh.evaluate_application()
+    return fresh.status, fresh.missing_documents_note
+
+
+def test_batch_outcomes_match_validate_application(db):
+    owner = user_factory(username="staff", is_staff=True)
+    program = program_factory(requires_license=False)
+    candidates = [
+        _candidate(owner, program, 1, **COMPLETE_FIELDS),
+        _candidate(owner, program, 2),
+        _candidate(owner, program, 3, documents=False),
+        _candidate(owner, None, 4, **{**COMPLETE_FIELDS, "graduation_year": 0}),
+        _candidate(owner, program, 5, license_scan=make_pdf("license.pdf", b"%PDF-1.4 license"), **COMPLETE_FIELDS),
+    ]
+    assert [c.status for c in candidates] == [
+        Candidate.APPROVED, Candidate.VALIDATED, Candidate.MISSING_DOCS, Candidate.VALIDATED, Candidate.APPROVED,
+    ]
+    # Rows stored by validate_application are already up to date
+    assert revalidate()["changed"] == 0
+
+    program.requires_license = True
+    program.save()
+    report = revalidate()
+
+    assert report["checked"] == 5 and report["changed"] == 3
+    assert report["transitions"] == {
+        (Candidate.APPROVED, Candidate.MISSING_DOCS): 1,
+        (Candidate.VALIDATED, Candidate.MISSING_DOCS): 1,
+        # Same status, the note now lists the license too
+        (Candidate.MISSING_DOCS, Candidate.MISSING_DOCS): 1,
+    }
+    for candidate in candidates:
+        stored = Candidate.objects.get(pk=candidate.pk)
+        assert (stored.status, stored.missing_documents_note) == _expected(candidate)
+    assert Candidate.objects.get(pk=candidates[4].pk).status == Candidate.APPROVED
+    assert Candidate.objects.get(pk=candidates[0].pk).document_deadline is not None
+
+
+def test_writes_keep_counters_audit_and_rejections(db):
+    owner = user_factory(username="staff", is_staff=True)
+    program = program_factory(requires_license=False)
+    approved = _candidate(owner, program, 1, **COMPLETE_FIELDS)
+    rejected = _candidate(owner, program, 2, **COMPLETE_FIELDS)
+    Candidate.objects.filter(pk=rejected.pk).update(status=Candidate.REJECTED)
+    rebuild_counters()
+    ActivityLog.objects.all().delete()
+    program.requires_license = True
+    program.save()
+
+    assert revalidate()["changed"] == 1
+    assert Candidate.objects.get(pk=rejected.pk).status == Candidate.REJECTED
+    assert all(not result["drift"] for result in rebuild_counters(dry_run=True).values())
+    log = ActivityLog.objects.get(model_name="core.Candidate", object_id=str(approved.pk))
+    assert log.before_data["status"] == Candidate.APPROVED and log.after_data["status"] == Candidate.MISSING_DOCS
+
+
+def test_rows_changed_after_the_read_are_left_alone(db, monkeypatch):
+    owner = user_factory(username="staff", is_staff=True)
+    program = program_factory(requires_license=False)
+    kept, rejected = (_candidate(owner, program, number, **COMPLETE_FIELDS) for number in (1, 2))
+    rebuild_counters()
+    ActivityLog.objects.all().delete()
+    program.requires_license = True
+    program.save()
+
+    original_write = validation._write
+
+    def write_after_rejection(groups, now):
+        # Staff reject a candidate between the read and the write
+        stale = Candidate.objects.get(pk=rejected.pk)
+        stale.status = Candidate.REJECTED
+        stale.save()
+        ActivityLog.objects.all().delete()
+        return original_write(groups, now)
+
+    monkeypatch.setattr(validation, "_write", write_after_rejection)
+    report = revalidate()
+
+    assert report["changed"] == 1
+    assert report["transitions"] == {(Candidate.APPROVED, Candidate.MISSING_DOCS): 1}
+    assert Candidate.objects.get(pk=rejected.pk).status == Candidate.REJECTED
+    assert Candidate.objects.get(pk=kept.pk).status == Candidate.MISSING_DOCS
+    assert all(not result["drift"] for result in rebuild_counters(dry_run=True).values())
+    assert list(ActivityLog.objects.values_list("object_id", flat=True)) == [str(kept.pk)]
+
+
+def test_queries_do_not_grow_with_the_pool(db):
+    owner = user_factory(username="staff", is_staff=True)
+
+    def run(count, tag):
+        program = program_factory(title=f"Program {tag}", requires_license=False)
+        for number in range(count):
+            _candidate(owner, program, f"{tag}{number}", documents=False)
+        # Moves every candidate of the program: the deadline is new
+        Candidate.objects.filter(program=program).update(document_deadline=None)
+        with CaptureQueriesContext(connection) as queries:
+            report = revalidate(Candidate.objects.filter(program=program))
+        assert report["changed"] == count
+        return len(queries)
+
+    assert run(2, "a") == run(20, "b")
+
+
+def test_command_filters_by_program_and_supports_dry_run(db):
+    owner = user_factory(username="staff", is_staff=True)
+    program, other = program_factory(title="Dairy"), program_factory(title="Orchard")
+    candidate = _candidate(owner, program, 1, **COMPLETE_FIELDS)
+    untouched = _candidate(owner, other, 2, **COMPLETE_FIELDS)
+    for p in (program, other):
+        p.requires_license = True
+        p.save()
+
+    out = StringIO()
+    call_command("revalidate_candidates", "--program", str(program.pk), "--dry-run", stdout=out)
+    assert "1 candidate(s) would be updated" in out.getvalue()
+    assert "candidates/s" in out.getvalue()
+    assert Candidate.objects.get(pk=candidate.pk).status == Candidate.APPROVED
+
+    call_command("revalidate_candidates", "--program", str(program.pk), stdout=StringIO())
+    assert Candidate.objects.get(pk=candidate.pk).status == Candidate.MISSING_DOCS
+    assert Candidate.objects.get(pk=untouched.pk).status == Candidate.APPROVED
+
+    with pytest.raises(CommandError):
+        call_command("revalidate_candidates", "--program", "999999")
+
+
+def test_validate_application_skips_unchanged_saves(db):
+    candidate = _candidate(user_factory(username="staff", is_staff=True), program_factory(), 1)
+    stamp = Candidate.objects.get(pk=candidate.pk).updated_at
+    candidate = Candidate.objects.get(pk=candidate.pk)
+    candidate.validate_application()
+    assert Candidate.objects.get(pk=candidate.pk).updated_at == stamp
+
+
+@pytest.mark.slow
+def test_revalidation_throughput_benchmark(db):
+    owner = user_factory(username="staff", is_staff=True)
+    program = program_factory(requires_license=False)
+    count = 2000
+    Candidate.objects.bulk_create([
+        Candidate(
+            created_by=owner, program=program, passport_number=f"P{number}", first_name="First", last_name="Last",
+            email=f"c{number}@example.com", date_of_birth=date(1995, 1, 1), country_of_birth="Philippines",
+            nationality="Filipino", gender="Female", passport_issue_date=date.today(),
+            passport_expiry_date=date.today() + timedelta(days=3650), university="Not Specified",
+            specialization="Agronomy", status=Candidate.DRAFT, **COMPLETE_FIELDS,
+        )
+        for number in range(count)
+    ])
+    sample = list(Candidate.objects.select_related("program")[:200])
+
+    started = time.perf_counter()
+    for candidate in sample:
+        candidate.validate_application()
+    per_instance = (time.perf_counter() - started) / len(sample)
+    Candidate.objects.update(status=Candidate.DRAFT, missing_documents_note="", document_deadline=None)
+
+    report = revalidate()
+    batch = report["seconds"] / report["checked"]
+    print(
+        f"{count} candidates: validate_application {per_instance * 1000:.2f} ms per candidate, "
+        f"revalidate {batch * 1000:.3f} ms per candidate ({report['checked'] / report['seconds']:,.0f}/s)"
+    )
+    assert report["changed"] == count
+    assert batch < per_instance
@@ -0,0 +1,167 @@
+import time
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from core import search
+from core.models import AgricultureProgram, Candidate
+from core.pagination import KeysetPaginator
+from tests.factories import candidate_factory, program_factory, user_factory
+
+
+@pytest.fixture
+def owner(db):
+    return user_factory(username="owner")
+
+
+def _ids(queryset):
+    return set(queryset.values_list("pk", flat=True))
+
+
+def test_sqlite_uses_fts5_shadow_tables(db):
+    assert search.backend() == "sqlite"
+
+
+def test_prefix_terms_match_across_fields(owner):
+    maria = candidate_factory(created_by=owner, first_name="Maria", last_name="Santos", email="maria@farm.ph")
+    candidate_factory(created_by=owner, first_name="Mario", last_name="Reyes", email="reyes@farm.ph")
+
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "mar san")) == {maria.pk}
+    assert len(_ids(search.filter_queryset(Candidate.objects.all(), "Mar"))) == 2
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "  ")) == _ids(Candidate.objects.all())
+
+
+def test_substring_fallback_when_full_text_finds_nothing(owner):
+    candidate = candidate_factory(created_by=owner, first_name="Jonathan", email="jdoe@example.com")
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "nath")) == {candidate.pk}
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "@exam")) == {candidate.pk}
+
+
+def test_substring_hits_are_kept_next_to_prefix_hits(owner):
+    sonia = candidate_factory(created_by=owner, first_name="Sonia", passport_number="P1")
+    johnson = candidate_factory(created_by=owner, last_name="Johnson", passport_number="P2")
+    outside = candidate_factory(created_by=owner, first_name="Sonny", passport_number="P3")
+
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "son")) == {sonia.pk, johnson.pk, outside.pk}
+    ranked = list(search.filter_queryset(Candidate.objects.all(), "son", rank=True))
+    assert ranked[-1].pk == johnson.pk
+    # A full-text hit outside the queryset does not hide the substring hits inside it
+    assert _ids(search.filter_queryset(Candidate.objects.filter(pk=johnson.pk), "son")) == {johnson.pk}
+
+
+def test_postgresql_search_plans_use_the_text_indexes(owner):
+    if connection.vendor != "postgresql":
+        pytest.skip("GIN and pg_trgm indexes are PostgreSQL only")
+    candidate_factory(created_by=owner, first_name="Maria", last_name="Johnson")
+    program_factory(title="Dairy farming")
+    with connection.cursor() as cursor:
+        # Tiny test tables would be scanned anyway; make any scan the planner still picks visible
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for queryset in (Candidate.objects.all(), AgricultureProgram.objects.all(), User.objects.all()):
+            for text in ("son", "mar joh"):
+                sql, params = search.filter_queryset(queryset, text).query.sql_with_params()
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plan = [row[0] for row in cursor.fetchall()]
+                table = queryset.model._meta.db_table
+                assert not [line for line in plan if f"Seq Scan on {table}" in line], "\n".join(plan)
+
+
+def test_signals_keep_shadow_table_current(owner):
+    candidate = candidate_factory(created_by=owner, first_name="Old")
+    candidate.first_name = "Renamed"
+    candidate.save()
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "renamed")) == {candidate.pk}
+    assert not search.filter_queryset(Candidate.objects.all(), "old").exists()
+
+    candidate.delete()
+    with search.connections["default"].cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM core_search_candidate")
+        assert cursor.fetchone()[0] == 0
+
+
+def test_unrelated_update_fields_skip_reindexing(db, django_assert_num_queries, settings):
+    settings.CACHALOT_ENABLED = False
+    user = user_factory(username="farmer")
+    with django_assert_num_queries(0):
+        search.index_instance(user, update_fields=["last_login"])
+
+
+def test_ranking_puts_better_matches_first(db):
+    program_factory(title="Dairy farming", description="Cattle and dairy dairy dairy")
+    program_factory(title="Greenhouse", description="Vegetables, some dairy")
+    ranked = search.filter_queryset(AgricultureProgram.objects.order_by("-start_date"), "dairy", rank=True)
+    assert [program.title for program in ranked] == ["Dairy farming", "Greenhouse"]
+    assert ranked[0].search_rank > ranked[1].search_rank
+
+
+def test_rebuild_command_repopulates_after_bulk_changes(owner):
+    candidate = candidate_factory(created_by=owner, first_name="Before")
+    Candidate.objects.filter(pk=candidate.pk).update(first_name="Bulkupdated")
+    # queryset.update() sends no signals, so the shadow row still has the old name
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "before")) == {candidate.pk}
+
+    out = StringIO()
+    call_command("rebuild_search_index", "--entity", "candidate", stdout=out)
+    assert "candidate: 1 row(s) indexed" in out.getvalue()
+    assert not search.filter_queryset(Candidate.objects.all(), "before").exists()
+    assert _ids(search.filter_queryset(Candidate.objects.all(), "bulkupdated")) == {candidate.pk}
+
+
+def test_list_views_search_through_the_index(owner, client):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    program = program_factory(title="Orchard work")
+    match = candidate_factory(created_by=owner, first_name="Lorna", program=program)
+    candidate_factory(created_by=owner, first_name="Pedro", passport_number="P2")
+    client.force_login(staff)
+
+    response = client.get(reverse("candidate_list"), {"search": "lor"})
+    assert [c.pk for c in response.context["page_obj"]] == [match.pk]
+
+    response = client.get(reverse("manage_users"), {"q": "own"})
+    assert [u.username for u in response.context["users"]] == ["owner"]
+
+    response = client.get(reverse("program_list"), {"query": "orch"})
+    assert [p.pk for p in response.context["page_obj"]] == [program.pk]
+
+
+@pytest.mark.slow
+def test_search_stays_fast_at_100k_candidates(owner, settings):
+    settings.CACHALOT_ENABLED = False
+    program = program_factory()
+    Candidate.objects.bulk_create(
+        Candidate(
+            passport_number=f"P{i}",
+            first_name=f"First{i}",
+            last_name=f"Last{i % 997}",
+            email=f"person{i}@example.com",
+            date_of_birth=date(1995, 1, 1),
+            country_of_birth="Philippines",
+            nationality="Filipino",
+            gender="Male",
+            passport_issue_date=date(2020, 1, 1),
+            passport_expiry_date=date(2030, 1, 1),
+            university="Not Specified",
+            specialization="Agronomy",
+            program=program,
+            created_by=owner,
+        )
+        for i in range(100_000)
+    )
+    search.rebuild_index(entities=["candidate"])
+
+    def timed(text):
+        # What candidate_list does per keystroke: search, then the first keyset page
+        started = time.perf_counter()
+        queryset = search.filter_queryset(Candidate.objects.all(), text)
+        page = KeysetPaginator(queryset, 15, ordering=("-created_at", "-id")).get_page()
+        return time.perf_counter() - started, len(page)
+
+    for text in ("first4242", "last12 first1", "person99999"):
+        elapsed, rows = min(timed(text) for _ in range(5))
+        assert rows >= 1
+        assert elapsed < 0.020, f"{text!r} took {elapsed * 1000:.1f}ms"
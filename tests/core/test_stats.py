@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+
+from core.models import Candidate, Registration
+from core.stats import compute_dashboard_stats
+from tests.factories import candidate_factory, program_factory, registration_factory, user_factory
+
+
+# one StatsCounter read, active-program count, three grouped Candidate queries
+DASHBOARD_STATS_QUERIES = 5
+
+
+@pytest.fixture(autouse=True)
+def _no_orm_cache(settings):
+    # cachalot would otherwise serve some aggregates from cache and hide real queries
+    settings.CACHALOT_ENABLED = False
+
+
+def _seed(n_candidates):
+    staff = user_factory(username="staff", is_staff=True, email="staff@example.com")
+    applicant = user_factory(username="applicant", email="applicant@example.com")
+    program = program_factory(title="Dairy", location="Negev", country="Israel")
+    registration_factory(user=applicant, program=program, status=Registration.APPROVED)
+    statuses = [Candidate.DRAFT, Candidate.MISSING_DOCS, Candidate.VALIDATED, Candidate.APPROVED, Candidate.REJECTED]
+    for i in range(n_candidates):
+        candidate_factory(
+            created_by=staff,
+            program=program,
+            passport_number=f"P{i}",
+            status=statuses[i % len(statuses)],
+            gender="Female" if i % 2 else "Male",
+            university="UPLB",
+        )
+    return staff
+
+
+@pytest.mark.parametrize("n_candidates", [5, 25])
+def test_dashboard_stats_query_count_is_constant(db, django_assert_num_queries, n_candidates):
+    _seed(n_candidates)
+    with django_assert_num_queries(DASHBOARD_STATS_QUERIES):
+        stats = compute_dashboard_stats()
+    assert stats["total_candidates"] == n_candidates
+
+
+def test_dashboard_stats_figures(db):
+    _seed(10)
+    stats = compute_dashboard_stats()
+
+    assert stats["total_users"] == 2
+    assert stats["staff_count"] == 1
+    assert stats["non_staff_users"] == 1
+    assert stats["total_programs"] == 1
+    assert stats["active_programs"] == 1
+    assert stats["total_registrations"] == 1
+    assert stats["approved_registrations"] == 1
+
+    assert stats["candidate_status_counts"][Candidate.APPROVED] == 2
+    assert stats["pending_applications"] == 4
+    assert stats["total_processed"] == 4
+    assert stats["approval_rate"] == 50
+
+    month = int(stats["generated_at"][5:7])
+    assert sum(stats["monthly_applications"]) == 10
+    assert stats["monthly_applications"][month - 1] == 10
+    assert stats["monthly_approved"][month - 1] == 2
+    assert stats["applicants_per_year"] == [{"year": stats["current_year"], "count": 10}]
+    assert stats["deployed_per_program"] == [{"program__title": "Dairy", "count": 2}]
+    assert stats["deployed_per_farm"] == [
+        {"program__location": "Negev", "program__country": "Israel", "count": 2}
+    ]
+    assert stats["deployed_per_suc"] == [{"university": "UPLB", "count": 2}]
+    assert sum(item["count"] for item in stats["deployed_per_sex"]) == stats["total_deployed"] == 2
+
+
+def test_export_dashboard_report_uses_stats_snapshot(db, client):
+    staff = _seed(5)
+    client.force_login(staff)
+    resp = client.get(reverse("export_dashboard_report"), {"format": "csv"})
+    assert resp.status_code == 200
+    body = resp.content.decode()
+    assert "Dairy,1" in body
+    assert "UPLB,1" in body
@@ -0,0 +1,128 @@
+import hashlib
+import os
+
+import pytest
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+
+from django import forms
+from django.forms import MultiWidget
+from django.urls import reverse
+
+from core import models
+from core.forms import ProfileUpdateForm
+from core.models import Candidate, University, UploadedFile
+from core.uploads import MAX_DOCUMENT_SIZE, MAX_IMAGE_SIZE
+from tests.factories import candidate_factory, user_factory
+
+PDF = b"%PDF-1.4 transcript " + b"x" * 4096
+
+
+def _upload(rf, **files):
+    request = rf.post("/profile/", {name: SimpleUploadedFile(f"{name}.pdf", content) for name, content in files.items()})
+    return request.FILES
+
+
+@pytest.fixture
+def sha256_runs(monkeypatch):
+    """Counts SHA-256 computations done by UploadedFile.calculate_file_hash."""
+    runs = []
+
+    class CountingHashlib:
+        @staticmethod
+        def sha256(*args):
+            runs.append(1)
+            return hashlib.sha256(*args)
+
+    monkeypatch.setattr(models, "hashlib", CountingHashlib)
+    return runs
+
+
+def test_uploads_carry_digest_size_and_sniffed_type(rf):
+    upload = _upload(rf, tor=PDF)["tor"]
+    assert upload.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert upload.size == len(PDF)
+    assert upload.sniffed_content_type == "application/pdf"
+    assert upload.read() == PDF
+    assert UploadedFile.calculate_file_hash(upload) == upload.sha256
+
+
+@pytest.mark.parametrize(
+    "field, size",
+    [
+        ("profile_image", MAX_IMAGE_SIZE + 1),  # in memory
+        ("tor", MAX_DOCUMENT_SIZE + 1),  # over FILE_UPLOAD_MAX_MEMORY_SIZE: streamed to a temp file
+    ],
+)
+def test_oversized_files_are_dropped_mid_stream(db, rf, monkeypatch, field, size):
+    temp_files = []
+    original_init = TemporaryUploadedFile.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        temp_files.append(self.temporary_file_path())
+
+    monkeypatch.setattr(TemporaryUploadedFile, "__init__", tracking_init)
+    upload = _upload(rf, **{field: b"\x89PNG\r\n\x1a\n" + b"0" * (size - 8)})[field]
+
+    assert upload.size == size
+    assert upload.read() == b""
+    assert not hasattr(upload, "sha256")
+    assert not any(os.path.exists(path) for path in temp_files)
+    form = ProfileUpdateForm(data={"smokes": "Never"}, files={field: upload}, instance=user_factory().profile)
+    assert field in form.errors
+
+
+def test_profile_update_hashes_each_upload_once(db, rf, sha256_runs, monkeypatch):
+    opens = []
+    original_open = FileSystemStorage._open
+    monkeypatch.setattr(FileSystemStorage, "_open", lambda storage, name, mode="rb": opens.append(name) or original_open(storage, name, mode))
+    user = user_factory(username="applicant")
+    files = _upload(rf, tor=PDF, diploma=b"%PDF-1.4 diploma")
+
+    form = ProfileUpdateForm(data={"smokes": "Never"}, files=files, instance=user.profile)
+    assert form.is_valid(), form.errors
+    form.save()
+
+    # Duplicate checks and registration reuse the upload digests: no hashing, no reads
+    assert sha256_runs == [] and opens == []
+    record = UploadedFile.objects.get(user=user, document_type="tor", is_active=True)
+    assert record.file_hash == hashlib.sha256(PDF).hexdigest()
+    assert record.mime_type == "application/pdf"
+
+
+def test_same_file_in_two_fields_is_still_caught(db, rf):
+    user = user_factory(username="applicant")
+    form = ProfileUpdateForm(data={"smokes": "Never"}, files=_upload(rf, tor=PDF, diploma=PDF), instance=user.profile)
+    assert form.is_valid() is False
+    assert "tor" in form.errors and "diploma" in form.errors
+
+
+def _resubmitted(form):
+    """POST data re-submitting a rendered form's current values, file fields left empty."""
+    data = {}
+    for bound in form:
+        widget = bound.field.widget
+        if isinstance(bound.field, forms.FileField):
+            continue
+        if isinstance(widget, MultiWidget):
+            parts = zip(widget.widgets_names, widget.decompress(bound.value()))
+            data.update({f"{bound.html_name}{suffix}": part for suffix, part in parts if part is not None})
+        elif bound.value() is not None:
+            data[bound.html_name] = bound.value()
+    return data
+
+
+def test_admin_rejects_oversized_upload(db, admin_client):
+    University.objects.create(name="Not Specified", code="NS", country="Philippines")
+    candidate = candidate_factory(created_by=user_factory(username="applicant"))
+    url = reverse("admin:core_candidate_change", args=[candidate.pk])
+    data = _resubmitted(admin_client.get(url).context["adminform"].form)
+    data["passport_scan"] = SimpleUploadedFile("passport.pdf", b"%PDF-1.4 " + b"0" * MAX_DOCUMENT_SIZE)
+
+    response = admin_client.post(url, data)
+
+    # Rejected by the model field's validator, not saved as an empty file
+    assert response.status_code == 200
+    assert set(response.context["adminform"].form.errors) == {"passport_scan"}
+    assert not Candidate.objects.get(pk=candidate.pk).passport_scan
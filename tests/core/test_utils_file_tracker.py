@@ -72,6 +72,8 @@ def test_register_model_files_registers_present_file_fields(monkeypatch, db):
     program = program_factory(title="P1")
     tor = make_pdf("tor.pdf", b"tor bytes")
     reg = registration_factory(user=user, program=program, tor=tor)
+    # Saving already registered it; forget that so the file counts as new
+    UploadedFile.objects.all().delete()
 
     called = {"n": 0}
 